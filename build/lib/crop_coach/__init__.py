@@ -4,4 +4,9 @@ from gym.envs.registration import register
 register(
     id="CropCoach-v0",
     entry_point="crop_coach.envs:WofostEnv"
-)
\ No newline at end of file
+)
+
+register(
+    id="CropCoachDaily-v0",
+    entry_point="crop_coach.envs:WofostDailyEnv"
+)
@@ -0,0 +1,4 @@
+"""Benchmarks for crop_coach, each module can be run as a script :
+
+    python -m crop_coach.benchmarks.<module>
+"""
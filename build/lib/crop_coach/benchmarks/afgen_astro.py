@@ -0,0 +1,125 @@
+"""Microbenchmarks of Afgen, astro and daylength against the reference implementations
+
+    python -m crop_coach.benchmarks.afgen_astro --number 100000
+"""
+# -- Importing dependencies :
+import argparse
+import datetime as dt
+import random
+import timeit
+
+import numpy as np
+
+from crop_coach.envs.pcse import util
+from crop_coach.envs.pcse.util import Afgen, astro, daylength
+from crop_coach.benchmarks.reference_util import ReferenceAfgen, reference_astro, reference_daylength
+
+# -- A typical AFGEN table : the maximum leaf CO2 assimilation rate as function of the DVS
+AMAXTB = [0.0, 35.83, 1.0, 35.83, 1.3, 35.83, 2.0, 4.48]
+
+
+def bench(stmt, number: int) -> float:
+    """Time a statement, best of 3 repeats
+
+    ---------------------------------------------------------------------
+    :param stmt : the callable to time
+    :type stmt : callable
+    :param number : number of calls per repeat
+    :type number : int
+
+    ---------------------------------------------------------------------
+    :return: time per call in microseconds
+    :rtype: float
+    """
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e6
+
+
+def bench_afgen(number: int, batch_size: int = 1000) -> dict:
+    """Time the scalar and batched calls of Afgen against the reference Afgen
+
+    ---------------------------------------------------------------------
+    :param number : number of scalar calls per repeat
+    :type number : int
+    :param batch_size : size of the array for the batched call
+    :type batch_size : int
+
+    ---------------------------------------------------------------------
+    :return: times in microseconds per value
+    :rtype: dict
+    """
+    f, ref = Afgen(AMAXTB), ReferenceAfgen(AMAXTB)
+    x = np.random.default_rng(0).uniform(0., 2., size=batch_size)
+    xs = x.tolist()
+    return {
+        "afgen scalar (reference)": bench(lambda: ref(1.15), number),
+        "afgen scalar": bench(lambda: f(1.15), number),
+        "afgen loop over array (reference)": bench(lambda: [ref(v) for v in xs], max(1, number // batch_size)) / batch_size,
+        "afgen batched array": bench(lambda: f(x), max(1, number // batch_size)) / batch_size,
+    }
+
+
+def bench_astro(number: int) -> dict:
+    """Time astro and daylength against the reference implementations
+
+    The reference implementations memoize every (day, latitude, radiation) in an
+    unbounded dict, so seasons are timed both with empty caches ("first season",
+    e.g. a new year or site) and with the results of the season cached
+    ("repeated season", e.g. the same year simulated again).
+
+    ---------------------------------------------------------------------
+    :param number : number of calls per repeat, rounded to whole seasons of 365 days
+    :type number : int
+
+    ---------------------------------------------------------------------
+    :return: times in microseconds per call
+    :rtype: dict
+    """
+    rng = random.Random(0)
+    days = [dt.date(2019, 1, 1) + dt.timedelta(days=i) for i in range(365)]
+    radiation = [rng.uniform(1e6, 30e6) for _ in days]
+    n_seasons = max(1, number // len(days))
+    reference_caches = [reference_astro.__defaults__[-1], reference_daylength.__defaults__[-1]]
+
+    def clear_caches():
+        for cache in reference_caches:
+            cache.clear()
+        astro.cache_clear()
+        util._astro_rows.cache_clear()
+        util._daylength_rows.cache_clear()
+
+    def first_season(stmt):
+        return min(timeit.repeat(stmt, setup=clear_caches, number=1, repeat=3)) / len(days) * 1e6
+
+    def repeated_season(stmt):
+        stmt()
+        return bench(stmt, n_seasons) / len(days)
+
+    def season(func):
+        return lambda: [func(day, 51.97, rad) for day, rad in zip(days, radiation)]
+
+    def season_daylength(func):
+        return lambda: [func(day, 51.97) for day in days]
+
+    results = {}
+    for name, timer in [("first season", first_season), ("repeated season", repeated_season)]:
+        results["astro, %s (reference)" % name] = timer(season(reference_astro))
+        results["astro, %s" % name] = timer(season(astro))
+        results["daylength, %s (reference)" % name] = timer(season_daylength(reference_daylength))
+        results["daylength, %s" % name] = timer(season_daylength(daylength))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    results = bench_afgen(args.number)
+    results.update(bench_astro(args.number))
+    print("%-45s %14s" % ("benchmark", "us per value"))
+    for name, t in results.items():
+        print("%-45s %14.4f" % (name, t))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Inputs shared by the benchmarks and the tests : a WOFOST season on the parameters in default_data
+and deterministic synthetic weather, which does not depend on remote weather services.
+"""
+# -- Importing dependencies :
+import os
+import json
+import math
+import random
+import datetime as dt
+
+from crop_coach.envs.pcse.base import ParameterProvider, WeatherDataProvider, WeatherDataContainer
+from crop_coach.envs.pcse.fileinput import CABOFileReader
+from crop_coach.envs.pcse.util import reference_ET
+
+default_data_dir = os.path.join(os.path.dirname(__file__), "..", "default_data")
+
+# -- A winter wheat season in 2019, without timed events, and timed events for that season
+campaign_start = dt.date(2019, 1, 1)
+agromanagement = [{campaign_start: {
+    "CropCalendar": {"crop_name": "wheat", "variety_name": "winter-wheat",
+                     "crop_start_date": dt.date(2019, 4, 11), "crop_start_type": "emergence",
+                     "crop_end_date": dt.date(2019, 8, 11), "crop_end_type": "harvest",
+                     "max_duration": 300},
+    "TimedEvents": None,
+    "StateEvents": None}}]
+
+timed_events = [
+    {"event_signal": "irrigate", "name": "Irrigation application table",
+     "comment": "All irrigation amounts in cm",
+     "events_table": [{dt.date(2019, 5, d): {"amount": 2, "efficiency": 0.7}} for d in (10, 20, 30)]},
+    {"event_signal": "apply_npk", "name": "Timed N/P/K application table",
+     "comment": "All fertilizer amounts in kg/ha",
+     "events_table": [{dt.date(2019, 5, 15): {"N_amount": 50, "P_amount": 10, "K_amount": 10,
+                                              "N_recovery": 0.7, "P_recovery": 0.7, "K_recovery": 0.7}}]}]
+
+
+def make_parameters() -> ParameterProvider:
+    """Return the crop, soil and site parameters of default_data
+
+    ---------------------------------------------------------------------
+    :return: the parameters
+    :rtype: ParameterProvider
+    """
+    soil = CABOFileReader(os.path.join(default_data_dir, "soil.cab"))
+    site = CABOFileReader(os.path.join(default_data_dir, "site.cab"))
+    crop = CABOFileReader(os.path.join(default_data_dir, "crop.cab"))
+    return ParameterProvider(sitedata=site, soildata=soil, cropdata=crop)
+
+
+class SyntheticWeatherDataProvider(WeatherDataProvider):
+    """Weather data provider generating a smooth seasonal cycle with pseudo-random rain.
+
+    :param latitude: latitude of the site
+    :param longitude: longitude of the site
+    :param start: first date with weather data
+    :param end: last date with weather data
+    :param seed: seed of the rainfall generator
+    """
+    angstA = 0.29
+    angstB = 0.49
+
+    def __init__(self, latitude=51.97, longitude=5.67, start=dt.date(2018, 1, 1),
+                 end=dt.date(2020, 12, 31), seed=1):
+        WeatherDataProvider.__init__(self)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.elevation = 10.
+        self.description = ["Synthetic weather data"]
+
+        rng = random.Random(seed)
+        day = start
+        while day <= end:
+            s = math.sin(2 * math.pi * (day.timetuple().tm_yday - 100) / 365.)
+            rec = dict(DAY=day, LAT=latitude, LON=longitude, ELEV=self.elevation,
+                       TMIN=5. + 8. * s, TMAX=12. + 10. * s, IRRAD=(10. + 8. * s) * 1e6,
+                       VAP=10. + 5. * s, WIND=3., RAIN=rng.choice([0., 0., 0.2, 0.5, 1.0]))
+            E0, ES0, ET0 = reference_ET(day, latitude, self.elevation, rec["TMIN"], rec["TMAX"],
+                                        rec["IRRAD"], rec["VAP"], rec["WIND"],
+                                        self.angstA, self.angstB, "PM")
+            rec.update(E0=E0/10., ES0=ES0/10., ET0=ET0/10.)
+            self._store_WeatherDataContainer(WeatherDataContainer(**rec), day)
+            day += dt.timedelta(days=1)
+
+
+def write_power_json(wdp, fname):
+    """Writes the weather of `wdp` as a NASA POWER JSON response, in POWER units.
+
+    :param wdp: a weather data provider, e.g. SyntheticWeatherDataProvider
+    :param fname: name of the JSON file
+    """
+    names = ["TOA_SW_DWN", "ALLSKY_SFC_SW_DWN", "T2M", "T2M_MIN", "T2M_MAX", "T2MDEW",
+             "WS2M", "PRECTOTCORR"]
+    parameter = {name: {} for name in names}
+    for (day, _), wdc in wdp.store.items():
+        key = day.strftime("%Y%m%d")
+        parameter["TOA_SW_DWN"][key] = 40.
+        parameter["ALLSKY_SFC_SW_DWN"][key] = wdc.IRRAD / 1e6
+        parameter["T2M"][key] = (wdc.TMIN + wdc.TMAX) / 2.
+        parameter["T2M_MIN"][key] = wdc.TMIN
+        parameter["T2M_MAX"][key] = wdc.TMAX
+        parameter["T2MDEW"][key] = 5.
+        parameter["WS2M"][key] = wdc.WIND
+        parameter["PRECTOTCORR"][key] = wdc.RAIN * 10.
+    powerdata = {"header": {"title": "NASA/POWER test data", "fill_value": -999.},
+                 "geometry": {"coordinates": [wdp.longitude, wdp.latitude, wdp.elevation]},
+                 "properties": {"parameter": parameter}}
+    with open(fname, "w") as fp:
+        json.dump(powerdata, fp)
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""Reference implementations of Afgen, daylength and astro as they were before
+the table based and batched implementations in pcse.util, used for checking
+that the results are equal and for benchmarking.
+"""
+from math import cos, sin, asin, sqrt, pi, radians
+from collections import namedtuple
+from bisect import bisect_left
+
+from crop_coach.envs.pcse.util import doy
+
+
+def reference_daylength(day, latitude, angle=-4, _cache={}):
+    """Calculates the daylength for a given day, altitude and base.
+
+    :param day:         date/datetime object
+    :param latitude:    latitude of location
+    :param angle:       The photoperiodic daylength starts/ends when the sun
+        is `angle` degrees under the horizon. Default is -4 degrees.
+
+    Derived from the WOFOST routine ASTRO.FOR and simplified to include only
+    daylength calculation. Results are being cached for performance
+    """
+    #from unum.units import h
+
+    # Check for range of latitude
+    if abs(latitude) > 90.:
+        msg = "Latitude not between -90 and 90"
+        raise RuntimeError(msg)
+
+    # Calculate day-of-year from date object day
+    IDAY = doy(day)
+
+    # Test if daylength for given (day, latitude, angle) was already calculated
+    # in a previous run. If not (e.g. KeyError) calculate the daylength, store
+    # in cache and return the value.
+    try:
+        return _cache[(IDAY, latitude, angle)]
+    except KeyError:
+        pass
+
+    # constants
+    RAD = radians(1.)
+
+    # calculate daylength
+    ANGLE = angle
+    LAT = latitude
+    DEC = -asin(sin(23.45*RAD)*cos(2.*pi*(float(IDAY)+10.)/365.))
+    SINLD = sin(RAD*LAT)*sin(DEC)
+    COSLD = cos(RAD*LAT)*cos(DEC)
+    AOB = (-sin(ANGLE*RAD)+SINLD)/COSLD
+
+    # daylength
+    if abs(AOB) <= 1.0:
+        DAYLP = 12.0*(1.+2.*asin((-sin(ANGLE*RAD)+SINLD)/COSLD)/pi)
+    elif AOB > 1.0:
+        DAYLP = 24.0
+    else:
+        DAYLP =  0.0
+
+    # store results in cache
+    _cache[(IDAY, latitude, angle)] = DAYLP
+
+    return DAYLP
+
+
+def reference_astro(day, latitude, radiation, _cache={}):
+    """python version of ASTRO routine by Daniel van Kraalingen.
+
+    This subroutine calculates astronomic daylength, diurnal radiation
+    characteristics such as the atmospheric transmission, diffuse radiation etc.
+
+    :param day:         date/datetime object
+    :param latitude:    latitude of location
+    :param radiation:   daily global incoming radiation (J/m2/day)
+
+    output is a `namedtuple` in the following order and tags::
+
+        DAYL      Astronomical daylength (base = 0 degrees)     h
+        DAYLP     Astronomical daylength (base =-4 degrees)     h
+        SINLD     Seasonal offset of sine of solar height       -
+        COSLD     Amplitude of sine of solar height             -
+        DIFPP     Diffuse irradiation perpendicular to
+                  direction of light                         J m-2 s-1
+        ATMTR     Daily atmospheric transmission                -
+        DSINBE    Daily total of effective solar height         s
+        ANGOT     Angot radiation at top of atmosphere       J m-2 d-1
+
+    Authors: Daniel van Kraalingen
+    Date   : April 1991
+
+    Python version
+    Author      : Allard de Wit
+    Date        : January 2011
+    """
+
+    # Check for range of latitude
+    if abs(latitude) > 90.:
+        msg = "Latitude not between -90 and 90"
+        raise RuntimeError(msg)
+    LAT = latitude
+
+    # Determine day-of-year (IDAY) from day
+    IDAY = doy(day)
+
+    # reassign radiation
+    AVRAD = radiation
+
+    # Test if variables for given (day, latitude, radiation) were already calculated
+    # in a previous run. If not (e.g. KeyError) calculate the variables, store
+    # in cache and return the value.
+    try:
+        return _cache[(IDAY, LAT, AVRAD)]
+    except KeyError:
+        pass
+
+    # constants
+    RAD = radians(1.)
+    ANGLE = -4.
+
+    # Declination and solar constant for this day
+    DEC = -asin(sin(23.45*RAD)*cos(2.*pi*(float(IDAY)+10.)/365.))
+    SC  = 1370.*(1.+0.033*cos(2.*pi*float(IDAY)/365.))
+
+    # calculation of daylength from intermediate variables
+    # SINLD, COSLD and AOB
+    SINLD = sin(RAD*LAT)*sin(DEC)
+    COSLD = cos(RAD*LAT)*cos(DEC)
+    AOB = SINLD/COSLD
+
+    # For very high latitudes and days in summer and winter a limit is
+    # inserted to avoid math errors when daylength reaches 24 hours in
+    # summer or 0 hours in winter.
+
+    # Calculate solution for base=0 degrees
+    if abs(AOB) <= 1.0:
+        DAYL  = 12.0*(1.+2.*asin(AOB)/pi)
+        # integrals of sine of solar height
+        DSINB  = 3600.*(DAYL*SINLD+24.*COSLD*sqrt(1.-AOB**2)/pi)
+        DSINBE = 3600.*(DAYL*(SINLD+0.4*(SINLD**2+COSLD**2*0.5))+
+                 12.*COSLD*(2.+3.*0.4*SINLD)*sqrt(1.-AOB**2)/pi)
+    else:
+        if AOB >  1.0: DAYL = 24.0
+        if AOB < -1.0: DAYL = 0.0
+        # integrals of sine of solar height
+        DSINB = 3600.*(DAYL*SINLD)
+        DSINBE = 3600.*(DAYL*(SINLD+0.4*(SINLD**2+COSLD**2*0.5)))
+
+    # Calculate solution for base=-4 (ANGLE) degrees
+    AOB_CORR = (-sin(ANGLE*RAD)+SINLD)/COSLD
+    if abs(AOB_CORR) <= 1.0:
+        DAYLP = 12.0*(1.+2.*asin(AOB_CORR)/pi)
+    elif AOB_CORR > 1.0:
+        DAYLP = 24.0
+    elif AOB_CORR < -1.0:
+        DAYLP = 0.0
+
+    # extraterrestrial radiation and atmospheric transmission
+    ANGOT = SC*DSINB
+    # Check for DAYL=0 as in that case the angot radiation is 0 as well
+    if DAYL > 0.0:
+        ATMTR = AVRAD/ANGOT
+    else:
+        ATMTR = 0.
+
+    # estimate fraction diffuse irradiation
+    if (ATMTR > 0.75):
+        FRDIF = 0.23
+    elif (ATMTR <= 0.75) and (ATMTR > 0.35):
+        FRDIF = 1.33-1.46*ATMTR
+    elif (ATMTR <= 0.35) and (ATMTR > 0.07):
+        FRDIF = 1.-2.3*(ATMTR-0.07)**2
+    else:  # ATMTR <= 0.07
+        FRDIF = 1.
+
+    DIFPP = FRDIF*ATMTR*0.5*SC
+
+    # Pack return values in namedtuple, add to cache and return
+    astro_nt = namedtuple("AstroResults","DAYL, DAYLP, SINLD, COSLD, DIFPP, "
+                                         "ATMTR, DSINBE, ANGOT")
+    retvalue = astro_nt(DAYL, DAYLP, SINLD, COSLD, DIFPP, ATMTR, DSINBE, ANGOT)
+    _cache[(IDAY, LAT, AVRAD)] = retvalue
+
+    return retvalue
+
+
+class ReferenceAfgen(object):
+    """Emulates the AFGEN function in WOFOST.
+
+    :param tbl_xy: List or array of XY value pairs describing the function
+        the X values should be mononically increasing.
+    :param unit: The interpolated values is returned with given
+        `unit <http://pypi.python.org/pypi/Unum/4.1.0>`_ assigned,
+        defaults to None if Unum is not used.
+
+    Returns the interpolated value provided with the
+    absicca value at which the interpolation should take place.
+
+    example::
+
+        >>> tbl_xy = [0,0,1,1,5,10]
+        >>> f =  ReferenceAfgen(tbl_xy)
+        >>> f(0.5)
+        0.5
+        >>> f(1.5)
+        2.125
+        >>> f(5)
+        10.0
+        >>> f(6)
+        10.0
+        >>> f(-1)
+        0.0
+    """
+
+    def _check_x_ascending(self, tbl_xy):
+        """Checks that the x values are strictly ascending.
+
+        Also truncates any trailing (0.,0.) pairs as a results of data coming
+        from a CGMS database.
+        """
+        x_list = tbl_xy[0::2]
+        y_list = tbl_xy[1::2]
+        n = len(x_list)
+
+        # Check if x range is ascending continuously
+        rng = list(range(1, n))
+        x_asc = [True if (x_list[i] > x_list[i-1]) else False for i in rng]
+
+        # Check for breaks in the series where the ascending sequence stops.
+        # Only 0 or 1 breaks are allowed. Use the XOR operator '^' here
+        n = len(x_asc)
+        sum_break = sum([1 if (x0 ^ x1) else 0 for x0,x1 in zip(x_asc, x_asc[1:])])
+        if sum_break == 0:
+            x = x_list
+            y = y_list
+        elif sum_break == 1:
+            x = [x_list[0]]
+            y = [y_list[0]]
+            for i,p in zip(rng, x_asc):
+                if p is True:
+                    x.append(x_list[i])
+                    y.append(y_list[i])
+        else:
+            msg = ("X values for AFGEN input list not strictly ascending: %s"
+                   % x_list)
+            raise ValueError(msg)
+
+        return x, y
+
+    def __init__(self, tbl_xy, unit=None):
+
+        self.unit = unit
+
+        x_list, y_list = self._check_x_ascending(tbl_xy)
+        x_list = self.x_list = list(map(float, x_list))
+        y_list = self.y_list = list(map(float, y_list))
+        intervals = list(zip(x_list, x_list[1:], y_list, y_list[1:]))
+        self.slopes = [(y2 - y1)/(x2 - x1) for x1, x2, y1, y2 in intervals]
+
+    def __call__(self, x):
+
+        if x <= self.x_list[0]:
+            return self.y_list[0]
+        if x >= self.x_list[-1]:
+            return self.y_list[-1]
+
+        i = bisect_left(self.x_list, x) - 1
+        v = self.y_list[i] + self.slopes[i] * (x - self.x_list[i])
+
+        # if a unum unit is defined, multiply with a unit
+        if self.unit is not None:
+            v *= self.unit
+
+        return v
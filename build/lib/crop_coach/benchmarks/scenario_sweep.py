@@ -0,0 +1,114 @@
+"""Throughput of ScenarioSweep (seasons/sec) against serial Wofost.run_wofost calls
+
+    python -m crop_coach.benchmarks.scenario_sweep --workers 1 2 4 8 --chunk-size 16
+
+The grid crosses irrigation and N amounts with irrigation and fertilization frequencies
+for the years of the synthetic weather of crop_coach.benchmarks.fixtures.
+"""
+# -- Importing dependencies :
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from crop_coach.envs.models import Wofost
+from crop_coach.envs.actions import AgroActions
+from crop_coach.envs.sweep import ScenarioSweep, make_scenario_grid
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider
+
+
+def bench_serial(grid, weather_path: str, Agromanager_dict: dict) -> float:
+    """Run the scenarios one by one with Wofost.run_wofost, without the results cache
+
+    ---------------------------------------------------------------------
+    :param grid : the scenarios, see make_scenario_grid
+    :type grid : np.ndarray
+    :param weather_path : columnar weather store
+    :type weather_path : str
+    :param Agromanager_dict : crop calendar description (see WofostEnv)
+    :type Agromanager_dict : dict
+
+    ---------------------------------------------------------------------
+    :return seasons_per_sec : seasons per second
+    :rtype seasons_per_sec : float
+    """
+    params, wdp, config = Wofost.init_wofost(
+        Agromanager_dict["crop_name"], Agromanager_dict["crop_variety"], None, weather_path=weather_path
+    )
+    start = time.perf_counter()
+    for scenario in grid:
+        agromanagement, _ = AgroActions().generate_agromanagement(
+            {"irrigate": int(scenario["irrigation_freq"]), "fertilize": int(scenario["fertilization_freq"])},
+            *[float(scenario[name]) for name in ("irrigation_amount", "N_amount", "P_amount", "K_amount")],
+            year=int(scenario["year"]),
+            Agromanager_dict=Agromanager_dict,
+        )
+        Wofost.run_wofost(agromanagement, params, wdp, config, use_cache=False)
+    return len(grid) / (time.perf_counter() - start)
+
+
+def bench_sweep(grid, weather_path: str, Agromanager_dict: dict, n_workers: int, chunk_size: int) -> float:
+    """Run the scenarios with a ScenarioSweep in a new directory, including the start of the pool
+
+    ---------------------------------------------------------------------
+    :param grid : the scenarios, see make_scenario_grid
+    :type grid : np.ndarray
+    :param weather_path : columnar weather store
+    :type weather_path : str
+    :param Agromanager_dict : crop calendar description (see WofostEnv)
+    :type Agromanager_dict : dict
+    :param n_workers : number of worker processes
+    :type n_workers : int
+    :param chunk_size : number of scenarios per chunk
+    :type chunk_size : int
+
+    ---------------------------------------------------------------------
+    :return seasons_per_sec : seasons per second
+    :rtype seasons_per_sec : float
+    """
+    path = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        sweep = ScenarioSweep(os.path.join(path, "sweep"), grid, sites=[{"weather_path": weather_path}],
+                              Agromanager_dict=Agromanager_dict, chunk_size=chunk_size)
+        sweep.run(n_workers=n_workers)
+        return len(grid) / (time.perf_counter() - start)
+    finally:
+        shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--amounts", type=int, default=4, help="number of irrigation and of N amounts")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = SyntheticWeatherDataProvider().to_columnar(os.path.join(tmp_dir, "weather"))
+        grid = make_scenario_grid(
+            irrigation_amounts=[2. * i for i in range(args.amounts)],
+            N_amounts=[25. * i for i in range(args.amounts)],
+            periods_irrigation=[7, 14],
+            periods_fertilization=[30, 60],
+            years=[2019, 2020],
+        )
+        Agromanager_dict = {
+            "crop_name": "wheat","crop_variety": "Winter_wheat_101","campaign_start_date": "-01-01","crop_start_type":"emergence","emergence_date": "-04-11","crop_end_type": "harvest","harvest_date": "-08-11", "max_duration": 100
+        }
+
+        serial = bench_serial(grid, store, Agromanager_dict)
+        print("%d scenarios" % len(grid))
+        print("%-28s %12s %8s" % ("runner", "seasons/sec", "speedup"))
+        print("%-28s %12.2f %8.2f" % ("serial run_wofost", serial, 1.))
+        for n_workers in args.workers:
+            sps = bench_sweep(grid, store, Agromanager_dict, n_workers, args.chunk_size)
+            print("%-28s %12.2f %8.2f" % ("ScenarioSweep, %i workers" % n_workers, sps, sps / serial))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
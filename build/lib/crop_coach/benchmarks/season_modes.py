@@ -0,0 +1,62 @@
+"""Wall time of a WOFOST season with the traitlets and the fast (slots) state/rate containers
+
+    python -m crop_coach.benchmarks.season_modes --seasons 5
+"""
+# -- Importing dependencies :
+import argparse
+import os
+import time
+
+from crop_coach.envs.pcse.engine import Engine
+from crop_coach.envs.pcse.settings import settings
+from crop_coach.benchmarks.fixtures import (
+    SyntheticWeatherDataProvider, agromanagement, default_data_dir, make_parameters
+)
+
+
+def bench_season(fast: bool, n_seasons: int) -> tuple:
+    """Time complete seasons (Engine set up and run till terminate) in one of both modes
+
+    ---------------------------------------------------------------------
+    :param fast : whether to use the fast state/rate containers (settings.FAST_STATES_RATES)
+    :type fast : bool
+    :param n_seasons : number of seasons to time
+    :type n_seasons : int
+
+    ---------------------------------------------------------------------
+    :return: best wall time of a season in seconds and the output of the last season
+    :rtype: tuple
+    """
+    weather = SyntheticWeatherDataProvider()
+    params = make_parameters()
+    config = os.path.join(default_data_dir, "WLP_NPK.conf")
+    fast_states_rates = settings.FAST_STATES_RATES
+    settings.FAST_STATES_RATES = fast
+    try:
+        times = []
+        # -- The first season warms up the caches (e.g. astro, generated fast classes)
+        for _ in range(n_seasons + 1):
+            start = time.perf_counter()
+            engine = Engine(params, weather, agromanagement, config)
+            engine.run_till_terminate()
+            times.append(time.perf_counter() - start)
+    finally:
+        settings.FAST_STATES_RATES = fast_states_rates
+    return min(times[1:]), engine.get_output()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=5)
+    args = parser.parse_args()
+
+    t_traits, output_traits = bench_season(False, args.seasons)
+    t_fast, output_fast = bench_season(True, args.seasons)
+    print("%-25s %12s %8s" % ("mode", "s/season", "speedup"))
+    print("%-25s %12.4f %8.2f" % ("traitlets", t_traits, 1.))
+    print("%-25s %12.4f %8.2f" % ("FAST_STATES_RATES", t_fast, t_traits / t_fast))
+    print("identical output: %s" % (output_traits == output_fast))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Benchmark suite of the simulation : full seasons, WofostEnv.step throughput, daily decisions and weather loading
+
+    python -m crop_coach.benchmarks.simulation_suite --seasons 5 --steps 20 --json results.json
+
+The seasons use the parameters in default_data and the synthetic weather of crop_coach.benchmarks.fixtures,
+so the numbers do not depend on the NASA POWER server and can be compared between commits.
+"""
+# -- Importing dependencies :
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+from crop_coach.benchmarks.season_modes import bench_season
+from crop_coach.envs.models import Wofost
+from crop_coach.envs.wofost_env import WofostEnv
+from crop_coach.envs.daily_env import WofostDailyEnv
+from crop_coach.envs.pcse.engine import Engine
+from crop_coach.envs.pcse.settings import settings
+from crop_coach.envs.pcse.fileinput import ColumnarWeatherDataProvider
+from crop_coach.envs.pcse.db import NASAPowerFileWeatherDataProvider
+from crop_coach.benchmarks.fixtures import (
+    SyntheticWeatherDataProvider, write_power_json, agromanagement, default_data_dir, make_parameters
+)
+
+
+def bench_seasons(n_seasons: int) -> dict:
+    """Time full seasons with both state/rate container modes
+
+    ---------------------------------------------------------------------
+    :param n_seasons : number of seasons to time per mode
+    :type n_seasons : int
+
+    ---------------------------------------------------------------------
+    :return: best wall time of a season in seconds
+    :rtype: dict
+    """
+    return {
+        "season, traitlets (s)": bench_season(False, n_seasons)[0],
+        "season, FAST_STATES_RATES (s)": bench_season(True, n_seasons)[0],
+    }
+
+
+def bench_env_step(weather_path: str, n_steps: int, seed: int = 0) -> dict:
+    """Time WofostEnv.step with random actions, with and without the results cache of run_wofost
+
+    ---------------------------------------------------------------------
+    :param weather_path : columnar weather store used by the environment
+    :type weather_path : str
+    :param n_steps : number of steps to time
+    :type n_steps : int
+    :param seed : seed of the sampled actions
+    :type seed : int
+
+    ---------------------------------------------------------------------
+    :return: steps per second
+    :rtype: dict
+    """
+    rng = np.random.default_rng(seed)
+    env = WofostEnv(sample_year=False, year=2019, years_count=3 * n_steps + 1, weather_path=weather_path)
+    env.reset()
+    actions = rng.uniform(-1, 1, size=(n_steps, env.n_actions))
+    # -- Warm up : astro tables, generated classes, ...
+    env.step(actions[0])
+
+    start = time.perf_counter()
+    for action in actions:
+        Wofost.results_cache.clear()
+        Wofost.prefix_cache.clear()
+        env.step(action)
+    uncached = n_steps / (time.perf_counter() - start)
+
+    # -- Fill the cache with the results of all actions, then time the same actions again
+    for action in actions:
+        env.step(action)
+    start = time.perf_counter()
+    for action in actions:
+        env.step(action)
+    cached = n_steps / (time.perf_counter() - start)
+    return {
+        "WofostEnv.step, no cache (steps/s)": uncached,
+        "WofostEnv.step, repeated actions (steps/s)": cached,
+    }
+
+
+def bench_daily_env(weather_path: str, step_days=(1, 7), seed: int = 0) -> dict:
+    """Time the steps of a season of WofostDailyEnv with random actions
+
+    ---------------------------------------------------------------------
+    :param weather_path : columnar weather store used by the environment
+    :type weather_path : str
+    :param step_days : numbers of days per step to time
+    :type step_days : tuple
+    :param seed : seed of the sampled actions
+    :type seed : int
+
+    ---------------------------------------------------------------------
+    :return: mean time of a step in milliseconds
+    :rtype: dict
+    """
+    results = {}
+    for days in step_days:
+        rng = np.random.default_rng(seed)
+        env = WofostDailyEnv(step_days=days, sample_year=False, year=2019, weather_path=weather_path)
+        env.reset()
+        n_steps, elapsed, done = 0, 0., False
+        while not done:
+            action = rng.uniform(-1, 1, size=env.n_actions)
+            start = time.perf_counter()
+            _, _, done, _ = env.step(action)
+            elapsed += time.perf_counter() - start
+            n_steps += 1
+        results["WofostDailyEnv.step, step_days=%i (ms)" % days] = elapsed / n_steps * 1e3
+    return results
+
+
+def bench_weather_load(tmp_dir: str, number: int) -> dict:
+    """Time loading the weather of 3 years with the weather data providers
+
+    ---------------------------------------------------------------------
+    :param tmp_dir : directory for the weather files and the meteo cache
+    :type tmp_dir : str
+    :param number : number of loads per repeat
+    :type number : int
+
+    ---------------------------------------------------------------------
+    :return: load times in milliseconds
+    :rtype: dict
+    """
+    wdp = SyntheticWeatherDataProvider()
+    store = wdp.to_columnar(os.path.join(tmp_dir, "weather"))
+    power_json = os.path.join(tmp_dir, "power.json")
+    write_power_json(wdp, power_json)
+    days = [wdp.first_date + dt.timedelta(days=i) for i in range(365)]
+
+    def bench(stmt, setup="pass", n=number):
+        return min(timeit.repeat(stmt, setup=setup, number=n, repeat=3)) / n * 1e3
+
+    def clear_meteo_cache():
+        shutil.rmtree(settings.METEO_CACHE_DIR)
+        os.mkdir(settings.METEO_CACHE_DIR)
+
+    def open_and_read_season():
+        w = ColumnarWeatherDataProvider(store)
+        for day in days:
+            w(day)
+
+    meteo_cache_dir = settings.METEO_CACHE_DIR
+    settings.METEO_CACHE_DIR = os.path.join(tmp_dir, "meteo_cache")
+    try:
+        return {
+            "columnar store, open (ms)": bench(lambda: ColumnarWeatherDataProvider(store)),
+            "columnar store, open and read a season (ms)": bench(open_and_read_season),
+            "NASA POWER json, first load (ms)": bench(lambda: NASAPowerFileWeatherDataProvider(power_json),
+                                                      setup=clear_meteo_cache, n=1),
+            "NASA POWER json, from columnar cache (ms)": bench(lambda: NASAPowerFileWeatherDataProvider(power_json)),
+            "Wofost.init_wofost, default_data (ms)": bench(lambda: Wofost.init_wofost("wheat", "Winter_wheat_101", None,
+                                                                                      weather_path=store)),
+        }
+    finally:
+        settings.METEO_CACHE_DIR = meteo_cache_dir
+
+
+def profile_season() -> dict:
+    """Profile one full season per SimulationObject class and phase
+
+    ---------------------------------------------------------------------
+    :return: the profile, see Engine.get_profile
+    :rtype: dict
+    """
+    engine = Engine(make_parameters(), SyntheticWeatherDataProvider(), agromanagement,
+                    os.path.join(default_data_dir, "WLP_NPK.conf"))
+    engine.enable_profiling()
+    engine.run_till_terminate()
+    return engine.get_profile()
+
+
+def run_suite(n_seasons: int, n_steps: int, number: int) -> dict:
+    """Run all benchmarks of the suite
+
+    ---------------------------------------------------------------------
+    :param n_seasons : number of seasons to time per mode
+    :type n_seasons : int
+    :param n_steps : number of WofostEnv steps to time
+    :type n_steps : int
+    :param number : number of weather loads per repeat
+    :type number : int
+
+    ---------------------------------------------------------------------
+    :return: results by benchmark name
+    :rtype: dict
+    """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        results = bench_seasons(n_seasons)
+        results.update(bench_weather_load(tmp_dir, number))
+        results.update(bench_env_step(os.path.join(tmp_dir, "weather"), n_steps))
+        results.update(bench_daily_env(os.path.join(tmp_dir, "weather")))
+    finally:
+        shutil.rmtree(tmp_dir)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--number", type=int, default=10)
+    parser.add_argument("--json", default=None, help="write the results and the season profile to this file")
+    args = parser.parse_args()
+
+    results = run_suite(args.seasons, args.steps, args.number)
+    print("%-50s %12s" % ("benchmark", "value"))
+    for name, value in results.items():
+        print("%-50s %12.4f" % (name, value))
+
+    if args.json is not None:
+        report = {"python": platform.python_version(), "numpy": np.__version__,
+                  "results": results, "profile": profile_season()}
+        with open(args.json, "w") as fp:
+            json.dump(report, fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
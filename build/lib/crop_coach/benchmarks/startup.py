@@ -0,0 +1,157 @@
+"""Startup time of a cold worker : imports, parsing of the inputs and the first WofostEnv.step
+
+    python -m crop_coach.benchmarks.startup --workers 5
+
+Each worker is a new Python process, as in a process pool. The parameter and configuration files
+are parsed once and then read from the input cache (crop_coach.envs.pcse.input_cache), the
+benchmark starts workers with an empty and with a filled cache.
+"""
+# -- Importing dependencies :
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from crop_coach.envs.pcse import input_cache
+from crop_coach.envs.pcse.fileinput import CABOFileReader
+from crop_coach.envs.pcse.util import ConfigurationLoader
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider, default_data_dir
+
+# -- Code of a worker : prints the times since its start in seconds as json on the last line
+WORKER = """
+import json, sys, time
+start = time.perf_counter()
+from crop_coach.envs.wofost_env import WofostEnv
+imported = time.perf_counter()
+env = WofostEnv(sample_year=False, year=2019, weather_path=sys.argv[1])
+env.reset()
+env.step(env.action_space.sample())
+stepped = time.perf_counter()
+print()
+print(json.dumps({"import": imported - start, "first_step": stepped - start}))
+"""
+
+# -- Code of a worker importing all database packages, which are imported lazily by pcse.db
+WORKER_DB = """
+import json, time
+start = time.perf_counter()
+from crop_coach.envs.pcse.db import pcse, cgms8, cgms12, cgms14, hdf5
+print()
+print(json.dumps({"import": time.perf_counter() - start}))
+"""
+
+
+def run_worker(code: str, *args) -> dict:
+    """Run the code of a worker in a new Python process
+
+    ---------------------------------------------------------------------
+    :param code : code of the worker, printing its results as json on the last line
+    :type code : str
+    :param args : command line arguments of the worker
+
+    ---------------------------------------------------------------------
+    :return: results of the worker, with the wall time of the process under "process"
+    :rtype: dict
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    start = time.perf_counter()
+    output = subprocess.check_output([sys.executable, "-c", code] + list(args), env=env,
+                                     universal_newlines=True)
+    results = json.loads(output.strip().splitlines()[-1])
+    results["process"] = time.perf_counter() - start
+    return results
+
+
+def bench_workers(weather_path: str, n_workers: int) -> dict:
+    """Time cold workers reaching their first step, with an empty and with a filled input cache
+
+    ---------------------------------------------------------------------
+    :param weather_path : columnar weather store used by the workers
+    :type weather_path : str
+    :param n_workers : number of workers started per case
+    :type n_workers : int
+
+    ---------------------------------------------------------------------
+    :return: best times in milliseconds
+    :rtype: dict
+    """
+    cold, warm = [], []
+    for _ in range(n_workers):
+        input_cache.clear(files=True)
+        cold.append(run_worker(WORKER, weather_path))
+        warm.append(run_worker(WORKER, weather_path))
+    db = [run_worker(WORKER_DB) for _ in range(n_workers)]
+
+    def best(results, key):
+        return min(r[key] for r in results) * 1e3
+
+    return {
+        "import crop_coach.envs.wofost_env (ms)": best(warm, "import"),
+        "import pcse.db and all database packages (ms)": best(db, "import"),
+        "first step, empty input cache (ms)": best(cold, "first_step"),
+        "first step, filled input cache (ms)": best(warm, "first_step"),
+        "worker process to first step (ms)": best(warm, "process"),
+    }
+
+
+def bench_inputs(number: int) -> dict:
+    """Time parsing the default_data inputs, with and without the input cache
+
+    ---------------------------------------------------------------------
+    :param number : number of loads per repeat
+    :type number : int
+
+    ---------------------------------------------------------------------
+    :return: load times in milliseconds
+    :rtype: dict
+    """
+    cabo_files = [os.path.join(default_data_dir, f) for f in ("crop.cab", "soil.cab", "site.cab")]
+    config = os.path.abspath(os.path.join(default_data_dir, "WLP_NPK.conf"))
+    reader = CABOFileReader.__new__(CABOFileReader)
+
+    def parse():
+        for fname in cabo_files:
+            reader._parse_file(fname)
+        with open(config) as fp:
+            compile(fp.read(), config, "exec")
+
+    def load():
+        for fname in cabo_files:
+            CABOFileReader(fname)
+        ConfigurationLoader(config)
+
+    def bench(stmt):
+        return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e3
+
+    return {
+        "parse CABO files and compile configuration (ms)": bench(parse),
+        "CABO files and configuration from input cache (ms)": bench(load),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument("--number", type=int, default=100)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = SyntheticWeatherDataProvider().to_columnar(os.path.join(tmp_dir, "weather"))
+        results = bench_inputs(args.number)
+        results.update(bench_workers(store, args.workers))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    print("%-50s %12s" % ("benchmark", "value"))
+    for name, value in results.items():
+        print("%-50s %12.4f" % (name, value))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Throughput of WofostVecEnv (steps/sec) for an increasing number of workers
+
+    python -m crop_coach.benchmarks.vec_env_throughput --workers 1 2 4 8 --steps 5
+
+The environments use the synthetic weather of crop_coach.benchmarks.fixtures, or the
+local weather data given with --weather-path, so the benchmark runs offline.
+"""
+# -- Importing dependencies :
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from crop_coach.envs.vec_env import WofostVecEnv
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider
+
+
+def bench_vec_env(n_workers: int, n_steps: int, weather_path: str, envs_per_worker: int = 1,
+                  seed: int = 0) -> float:
+    """Measure the throughput of WofostVecEnv for a given number of workers
+
+    ---------------------------------------------------------------------
+    :param n_workers : number of worker processes
+    :type n_workers : int
+    :param n_steps : number of (batched) steps to time
+    :type n_steps : int
+    :param weather_path : columnar weather store or NASA POWER JSON file used by the environments
+    :type weather_path : str
+    :param envs_per_worker : number of environments per worker
+    :type envs_per_worker : int
+    :param seed : seed of the sampled actions
+    :type seed : int
+
+    ---------------------------------------------------------------------
+    :return steps_per_sec : environment steps (seasons) per second
+    :rtype steps_per_sec : float
+    """
+    rng = np.random.default_rng(seed)
+    n_envs = n_workers * envs_per_worker
+    with WofostVecEnv(n_envs=n_envs, n_workers=n_workers, sample_year=False, year=2019,
+                      weather_path=weather_path) as env:
+        env.reset()
+        # -- Warm up : make sure that every worker has been initialized
+        env.step(rng.uniform(-1, 1, size=(n_envs, env.n_actions)))
+        start = time.perf_counter()
+        for _ in range(n_steps):
+            env.step(rng.uniform(-1, 1, size=(n_envs, env.n_actions)))
+        elapsed = time.perf_counter() - start
+    return n_steps * n_envs / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--envs-per-worker", type=int, default=1)
+    parser.add_argument("--weather-path", default=None,
+                        help="local weather data (default : the synthetic weather of the fixtures)")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        weather_path = args.weather_path
+        if weather_path is None:
+            weather_path = SyntheticWeatherDataProvider().to_columnar(os.path.join(tmp_dir, "weather"))
+        base = None
+        print("%8s %12s %8s" % ("workers", "steps/sec", "speedup"))
+        for n_workers in args.workers:
+            sps = bench_vec_env(n_workers, args.steps, weather_path, args.envs_per_worker)
+            base = base or sps
+            print("%8i %12.2f %8.2f" % (n_workers, sps, sps / base))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
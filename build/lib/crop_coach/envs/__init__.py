@@ -1 +1,4 @@
-from crop_coach.envs.wofost_env import WofostEnv
\ No newline at end of file
+from crop_coach.envs.wofost_env import WofostEnv
+from crop_coach.envs.vec_env import WofostVecEnv
+from crop_coach.envs.daily_env import WofostDailyEnv
+from crop_coach.envs.sweep import ScenarioSweep, make_scenario_grid, load_sweep
@@ -0,0 +1,209 @@
+# -- Importing dependencies :
+import copy
+from typing import List, Tuple
+
+import gym
+from gym import spaces
+import numpy as np
+
+from crop_coach.envs.models import Wofost
+from crop_coach.envs.actions import AgroActions, return_apr_dict
+from crop_coach.envs.reward import calculate_reward
+from crop_coach.envs.wofost_env import (
+    WofostEnv, OUTPUT_VARS, denormalize_irrigation_action, denormalize_fertilization_action
+)
+from crop_coach.envs.pcse.engine import Engine
+from crop_coach.envs.pcse import signals
+
+
+class WofostDailyEnv(gym.Env):
+    """WofostEnv with daily decisions : each step advances one live wofost engine by `step_days` days
+
+    An episode is one growing season. At every step the agent chooses the irrigation
+    and N/P/K amounts applied on the first day of the next `step_days` days, they are
+    sent to the engine as `irrigate`/`apply_npk` signals (the same as the timed events
+    of the agromanagement, with the same efficiency and recovery fractions) and the
+    observation is read from the kiosk of the engine. A step costs `step_days` days
+    of simulation instead of a whole season.
+
+    The reward of a step is the increase of the yield (TWSO) during the step, at the
+    selling price, minus the costs of the applied amounts (see calculate_reward), so
+    the return of an episode is the gross margin of the season.
+
+    example::
+
+        >>> env = WofostDailyEnv(step_days=7, sample_year=False, year=2019)
+        >>> obs = env.reset()
+        >>> done = False
+        >>> while not done:
+        ...     obs, reward, done, info = env.step(env.action_space.sample())
+    """
+
+    metadata = {"render.modes": ["human"]}
+
+    def __init__(
+        self,
+        step_days: int = 7,
+        files_paths=None,
+        Agromanager_dict={
+            "crop_name": "wheat","crop_variety": "Winter_wheat_101","campaign_start_date": "-01-01","crop_start_type":"emergence","emergence_date": "-04-11","crop_end_type": "harvest","harvest_date": "-08-11", "max_duration": 100
+        },
+        Costs_dict={"Irrigation": 150, "N": 8,
+                    "P": 8.5, "K": 7, "Selling": 2.5},
+        Discount_factors_dict={"Irrigation": 1, "N": 1, "P": 1, "K": 1},
+        year=2019,
+        sample_year=True,
+        latitude: float = 51.97,
+        longitude: float = 5.67,
+        **kwargs
+    ):
+        """
+        Initialization of the env : action and observation space, wofost parameters
+
+        ---------------------------------------------------------------------
+        :param step_days : number of days simulated per step
+        :type step_days : int
+
+        The remaining parameters are the same as for WofostEnv.
+        """
+        super(WofostDailyEnv, self).__init__()
+        if step_days < 1:
+            raise ValueError("step_days should be a positive integer")
+
+        self.step_days = step_days
+        self.Agromanager_dict = Agromanager_dict
+        self.Costs_dict = Costs_dict
+        self.Discount_factors_dict = Discount_factors_dict
+        self.year = year
+        self.sample_year = sample_year
+        self.OUTPUT_VARS = list(OUTPUT_VARS)
+
+        # -- Init wofost once and keep its parameters (for every season)
+        params, wdp, config = Wofost.init_wofost(
+            Agromanager_dict["crop_name"], Agromanager_dict["crop_variety"], files_paths,
+            latitude, longitude, **kwargs
+        )
+        self.wofost_params = [params, wdp, config]
+        # -- Agromanagement without timed events, by year : the actions are sent as signals
+        self._agromanagement = {}
+
+        # -- Irrigation, N, P and K amounts :
+        self.n_actions = 4
+        self.action_space = spaces.Box(
+            low=-1, high=1, shape=(self.n_actions,), dtype="float32"
+        )
+        # -- The day (days since the campaign start) and the output variables :
+        self.observation_space = spaces.Box(
+            low=0.0, high=np.inf, shape=(len(self.OUTPUT_VARS),), dtype="float32"
+        )
+
+        self.engine = None
+        self.state = np.zeros(len(self.OUTPUT_VARS))
+        self.Yield = 0.
+        self.info = {}
+
+    def get_agromanagement(self, year: int) -> List[dict]:
+        """Return the agromanagement of the crop calendar for the given year, without timed events
+
+        The agromanagement is generated once per year and a copy is returned, which the
+        engine of an episode may modify without affecting the next episodes.
+
+        ---------------------------------------------------------------------
+        :param year : the year of the growing season
+        :type year : int
+
+        ---------------------------------------------------------------------
+        :return agromanagement : agromanagement in pcse format
+        :rtype agromanagement : List[dict]
+        """
+        if year not in self._agromanagement:
+            agromanagement, _ = AgroActions().generate_agromanagement(
+                {"irrigate": 0, "fertilize": 0}, 0, 0, 0, 0, year, self.Agromanager_dict
+            )
+            self._agromanagement[year] = agromanagement
+        return copy.deepcopy(self._agromanagement[year])
+
+    def _observe(self) -> np.ndarray:
+        """Read the observations of the current day from the engine (None is observed as 0), as float32 like observation_space"""
+        day = (self.engine.day - self.engine.timer.start_date).days
+        values = self.engine.get_output_variables()
+        return np.array([day] + [0. if v is None else v for v in values], dtype=np.float32)
+
+    def apply_action(self, action) -> Tuple[float, float, float, float]:
+        """Schedule the (normalized) action on the next day of the engine
+
+        ---------------------------------------------------------------------
+        :param action : normalized action, in [-1, 1] (irrigation, N, P, K)
+        :type action : np.ndarray
+
+        ---------------------------------------------------------------------
+        :return amounts : the denormalized irrigation, N, P and K amounts
+        :rtype amounts : tuple
+        """
+        irrigation_amount = denormalize_irrigation_action(action[0])
+        N_amount = denormalize_fertilization_action(action[1])
+        P_amount = denormalize_fertilization_action(action[2])
+        K_amount = denormalize_fertilization_action(action[3])
+
+        # -- The keyword arguments of the signals are those of the timed events :
+        if irrigation_amount > 0:
+            _, event = return_apr_dict("irrigate", irrigation_amount, N_amount, P_amount, K_amount)
+            self.engine.schedule_signal(signals.irrigate, **event)
+        if N_amount > 0 or P_amount > 0 or K_amount > 0:
+            _, event = return_apr_dict("fertilize", irrigation_amount, N_amount, P_amount, K_amount)
+            self.engine.schedule_signal(signals.apply_npk, **event)
+        return irrigation_amount, N_amount, P_amount, K_amount
+
+    def step(self, action):
+        """
+        1. apply the action (irrigation, N, P, K amounts) on the next day
+        2. run wofost for `step_days` days (or until the end of the season)
+        3. observe the state variables, from the kiosk of the engine
+        4. get the reward : increase of the yield minus the costs of the action
+        """
+        if self.engine is None:
+            raise RuntimeError("reset() should be called before step()")
+
+        amounts = self.apply_action(action)
+        self.engine.run(days=self.step_days)
+        self.state = self._observe()
+
+        # -- Yield : TWSO, the last value is kept when the crop is harvested
+        TWSO = self.engine.get_variable("TWSO")
+        Yield = self.Yield if TWSO is None else TWSO
+        reward = calculate_reward(
+            Yield - self.Yield,
+            *amounts,
+            Costs_dict=self.Costs_dict,
+            Discount_factors_dict=self.Discount_factors_dict,
+        )
+        self.Yield = Yield
+
+        done = bool(self.engine.flag_terminate)
+        self.info = {"day": self.engine.day, "yield": self.Yield}
+
+        return self.state, reward, done, self.info
+
+    def reset(self):
+        """
+        1. sample a year (or use the fixed year)
+        2. start a new wofost engine for the growing season
+        """
+        year = WofostEnv.sample_random_year() if self.sample_year else self.year
+        params, wdp, config = self.wofost_params
+        self.engine = Engine(params, wdp, self.get_agromanagement(year), config)
+        self.Yield = 0.
+        self.state = self._observe()
+        return self.state
+
+    def render(self, mode="human", close=False):
+        """
+        Implement a visualization
+        """
+        pass
+
+    def close(self):
+        """
+        Close the env
+        """
+        self.engine = None
@@ -6,13 +6,19 @@ from datetime import datetime
 import random
 from typing import List, Tuple, Dict, Union, Optional
 import time
+import hashlib
+import weakref
+import datetime as dt
+from collections import OrderedDict
+from copy import deepcopy
 import numpy as np
 from pprint import pprint
 import warnings
 
 # -- Importing PCSE dependencies :
 from crop_coach.envs.pcse.fileinput import CABOFileReader # , YAMLCropDataProvider
-from crop_coach.envs.pcse.db import NASAPowerWeatherDataProvider
+from crop_coach.envs.pcse.db import NASAPowerWeatherDataProvider, NASAPowerFileWeatherDataProvider
+from crop_coach.envs.pcse.fileinput import ColumnarWeatherDataProvider
 from crop_coach.envs.pcse.base import ParameterProvider
 from crop_coach.envs.pcse.engine import Engine
 from crop_coach.envs.pcse.fileinput import YAMLCropDataProvider
@@ -59,10 +65,116 @@ def check_file_path(file_path: str) -> bool:
 
 
 
+# -- Canonical hash of (nested) simulation inputs :
+def _canonical(obj):
+    """Convert dicts, lists and values to a nested tuple that does not depend on the ordering of dict keys"""
+    if isinstance(obj, dict):
+        return ("dict", tuple(sorted((repr(k), _canonical(v)) for k, v in obj.items())))
+    if isinstance(obj, (list, tuple)):
+        return ("list", tuple(_canonical(v) for v in obj))
+    return repr(obj)
+
+
+def canonical_hash(*objs) -> str:
+    """Return a hash of the given objects, independent of the ordering of dict keys
+
+    ---------------------------------------------------------------------
+    :param objs : the objects to hash (dicts, lists and values with a stable repr)
+
+    ---------------------------------------------------------------------
+    :return: the hexadecimal sha1 digest
+    :rtype: str
+    """
+    return hashlib.sha1(repr(_canonical(objs)).encode("utf-8")).hexdigest()
+
+
+def parameters_hash(params: ParameterProvider) -> str:
+    """Return a canonical hash of the crop, soil and site parameter set (including overrides)
+
+    The timer data is left out, it is set by the engine from the agromanagement.
+    """
+    return canonical_hash(params._cropdata, params._soildata, params._sitedata, params._override)
+
+
+# -- Content hashes of the in-memory weather data providers : provider -> (number of days, hash)
+_weather_hashes = weakref.WeakKeyDictionary()
+
+
+def weather_key(wdp) -> tuple:
+    """Return a key identifying the weather data of the weather data provider
+
+    The key is built from the weather content, not from the location, so that two providers
+    for the same site with different weather data never share a cache entry :
+    - a columnar weather store (also the cache of the NASA POWER providers) : the generation
+      in its meta.json, a hash of the weather data written by write_columnar_weather,
+    - other providers : a hash of the weather data, computed once per provider.
+
+    ---------------------------------------------------------------------
+    :param wdp : weather data provider
+    :type wdp : pcse.base.WeatherDataProvider
+
+    ---------------------------------------------------------------------
+    :return: the key of the weather data
+    :rtype: tuple
+    """
+    provider = (wdp.__class__.__name__, wdp.ETmodel)
+    if getattr(wdp, "columns", None) is not None and wdp.generation is not None:
+        return provider + ("columnar", wdp.generation)
+
+    cached = _weather_hashes.get(wdp)
+    if cached is None or cached[0] != len(wdp.store):
+        cached = (len(wdp.store), canonical_hash(wdp.export()))
+        _weather_hashes[wdp] = cached
+    return provider + ("data", cached[1])
+
+
+class LRUCache:
+    """A bounded mapping which discards the least recently used item when full
+
+    ---------------------------------------------------------------------
+    :param maxsize : maximum number of items (0 disables the cache)
+    :type maxsize : int
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """Return the item for key (and mark it as recently used), or default"""
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value):
+        """Store value under key, discarding the least recently used items when full"""
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
 # -- Wofost simulator init :
 class Wofost:
+    # -- Bounded caches of this process : results of full seasons, and engines
+    # checkpointed at the end of a season prefix without timed events
+    results_cache = LRUCache(maxsize=256)
+    prefix_cache = LRUCache(maxsize=16)
+
     @staticmethod
-    def init_wofost(crop_name, crop_variety, files_paths : dict,latitude: float = 51.97, longitude: float = 5.67, **kwargs):
+    def init_wofost(crop_name, crop_variety, files_paths : dict,latitude: float = 51.97, longitude: float = 5.67, weather_path: Optional[str] = None, **kwargs):
         """Init wofost simulator, by loading the crop,soil and site parameters, also initializing the weather data provider
 
         ---------------------------------------------------------------------
@@ -70,6 +182,10 @@ class Wofost:
         :type latitude: int
         :param longitude: longitude of the site(range from -180 to 180)
         :type longitude: int
+        :param weather_path: local weather data used instead of the NASA POWER server (offline) :
+            a columnar weather store directory, or a NASA POWER JSON response file
+            (the location is then taken from the weather data)
+        :type weather_path: Optional[str]
 
         ---------------------------------------------------------------------
         :return params : crop,soil and site parameters
@@ -120,8 +236,13 @@ class Wofost:
         # -- Init the ParameterProvider : with crop, soil and site parameters
         params = ParameterProvider(data_["crop"], data_["soil"], data_["site"])
 
-        # -- Init the weather data provider :
-        wdp = NASAPowerWeatherDataProvider(latitude, longitude)
+        # -- Init the weather data provider : (local weather data if given)
+        if weather_path is None:
+            wdp = NASAPowerWeatherDataProvider(latitude, longitude)
+        elif os.path.isdir(weather_path):
+            wdp = ColumnarWeatherDataProvider(weather_path)
+        else:
+            wdp = NASAPowerFileWeatherDataProvider(weather_path)
 
 
         config = os.path.join(os.path.dirname(__file__), "..","default_data", "WLP_NPK.conf")
@@ -131,42 +252,118 @@ class Wofost:
         return params, wdp, config
 
     @staticmethod
-    def run_wofost(agromanagement, params, wdp, config) -> Tuple[np.array, float]:
+    def start_engine(agromanagement, params, wdp, config, key=None) -> Engine:
+        """Start a wofost engine, resuming from a checkpointed season prefix when possible
+
+        The days before the first timed event do not depend on the timed events, so
+        the engine is run once until the day before the first event, checkpointed and
+        forked with the timed events of each agromanagement sharing that prefix.
+
+        ---------------------------------------------------------------------
+        :param agromanagement : contains the actions template withing wofost format
+        :param params : contains the crop,soil and site parameters
+        :param wdp : weather data provider
+        :param config : wofost configuration file
+        :param key : hash of (parameters, weather, config) (computed if not given)
+
+        ---------------------------------------------------------------------
+        :return wofost : engine ready to run the rest of the growing season
+        :rtype wofost : Engine
+        """
+        # -- Only single campaigns with timed events (no state events) can share a prefix :
+        if len(agromanagement) != 1 or len(agromanagement[0]) != 1:
+            return Engine(params, wdp, agromanagement, config)
+        campaign_start, campaign = list(agromanagement[0].items())[0]
+        if not campaign or campaign.get("StateEvents") or not campaign.get("TimedEvents"):
+            return Engine(params, wdp, agromanagement, config)
+
+        timed_events = campaign["TimedEvents"]
+        first_event = min(day for te in timed_events for event in te["events_table"] for day in event)
+        prefix_day = first_event - dt.timedelta(days=1)
+        if prefix_day <= campaign_start:
+            return Engine(params, wdp, agromanagement, config)
+
+        # -- The prefix : the same agromanagement without the timed events
+        prefix = deepcopy(agromanagement)
+        prefix[0][campaign_start]["TimedEvents"] = None
+        if key is None:
+            key = canonical_hash(parameters_hash(params), weather_key(wdp), config)
+        prefix_key = canonical_hash(prefix, key)
+
+        # -- A checkpoint past the day before the first event can not be used :
+        checkpoint = Wofost.prefix_cache.get(prefix_key)
+        if checkpoint is None or checkpoint.day > prefix_day:
+            checkpoint = Engine(params, wdp, prefix, config)
+            Wofost.prefix_cache.put(prefix_key, checkpoint)
+        if checkpoint.day < prefix_day:
+            checkpoint.run_till(prefix_day)
+
+        # -- Without timed events the simulation may have stopped before the first event :
+        if checkpoint.flag_terminate:
+            return Engine(params, wdp, agromanagement, config)
+
+        return checkpoint.fork(timed_events)
+
+    @staticmethod
+    def season_yield(output: np.ndarray) -> float:
+        """Return the yield of a growing season : the TWSO of the last simulated day (0 without crop on that day)
+
+        ---------------------------------------------------------------------
+        :param output : the output of the wofost engine, see Engine.get_output(as_array=True)
+        :type output : np.ndarray
+
+        ---------------------------------------------------------------------
+        :return yield : the yield
+        :rtype yield : float
+        """
+        last_twso = output["TWSO"][-1]
+        return 0 if np.isnan(last_twso) else float(last_twso)
+
+    @staticmethod
+    def run_wofost(agromanagement, params, wdp, config, use_cache=True) -> Tuple[np.array, float]:
         """Run wofost simulator, for a given agromanagement (growing season)
 
+        Results are kept in a bounded LRU cache keyed by a canonical hash of the
+        agromanagement (which includes the year), the parameter set, the weather
+        data provider and the config, and seasons sharing the days before their
+        first timed event resume from a checkpointed engine (see start_engine).
+
         ---------------------------------------------------------------------
         :param agromanagement : contains the actions template withing wofost format
         :param params : contains the crop,soil and site parameters
         :param wdp : weather data provider
         :param config : wofost configuration file
+        :param use_cache : use the results cache and the season prefix checkpoints
 
         ---------------------------------------------------------------------
         :return obs : the observations ndarray
         :return yield : the correspond (yield)
         """
-        # -- Init wofost engine : with the given parameters
-        # wofost = Wofost72_WLP_FD(params, wdp, agromanagement)
-        # config
-        wofost = Engine(params, wdp, agromanagement, config)
+        if use_cache:
+            key = canonical_hash(parameters_hash(params), weather_key(wdp), config)
+            result_key = canonical_hash(agromanagement, key)
+            cached = Wofost.results_cache.get(result_key)
+            if cached is not None:
+                return cached[0].copy(), cached[1]
+            # -- Init wofost engine : resuming from a season prefix when possible
+            wofost = Wofost.start_engine(agromanagement, params, wdp, config, key=key)
+        else:
+            # -- Init wofost engine : with the given parameters
+            wofost = Engine(params, wdp, agromanagement, config)
         # -- Run wofost engine : for the given agromanagement, for growing season
         wofost.run_till_terminate()
-        # -- Get the observations : from the wofost engine, summary of the growing season simulation
-        # r_1 = wofost.get_summary_output()
-        # r_2 = wofost.get_output()
-        r = wofost.get_output()
-        # -- Removing variables that are not needed : (neither none or dates)
-        # print(f"\n----------- summary_output {r_1} ---------------\n")
-        # print(f"\n----------- last output {r[-1]} ---------------\n")
-        # for var_ in ["DOS", "DOE", "DOA", "DOM", "DOH", "DOV"]:
-        #     del r[0][var_]
-        # Remove all none values from r[-1] and replace them with 0
-        r[-1] = {k: 0 if v is None else v for k, v in r[-1].items()}
-        # remove the first element from r[-1] :
-        del r[-1]['day']
-
-        return (
-            # -- Converting the dict to ndarray : (to be used as observations)
-            np.array(list(r[0].values())),
-            # -- Yield is the last variable in the observations array :
-            r[-1]["TWSO"],
+        # -- Get the observations : from the output buffer of the wofost engine (no copy)
+        output = wofost.get_output(as_array=True)
+        # -- Variables without value are NaN in the buffer : the first day is observed with None values
+        first_day = [None if v != v else v for v in output[0].tolist()]
+
+        result = (
+            # -- Converting the first day to ndarray : (to be used as observations)
+            np.array(first_day),
+            # -- Yield is the last value of the TWSO output variable :
+            Wofost.season_yield(output),
         )
+        if use_cache:
+            Wofost.results_cache.put(result_key, (result[0].copy(), result[1]))
+
+        return result
@@ -74,11 +74,21 @@ logging.config.dictConfig(settings.LOG_CONFIG)
 
 from . import db
 from . import fileinput
-from . import tests
 from . import agromanager
 from . import soil
 from . import crop
-from .start_wofost import start_wofost
+
+# The tests and start_wofost (which needs the SQLAlchemy based demo database)
+# are imported on first access.
+def __getattr__(name):
+    if name == "tests":
+        from . import tests
+        return tests
+    if name == "start_wofost":
+        from .start_wofost import start_wofost
+        globals()["start_wofost"] = start_wofost
+        return start_wofost
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 # If no PCSE demo database, build it!
 pcse_db_file = os.path.join(settings.PCSE_USER_HOME, "pcse.db")
@@ -101,4 +111,5 @@ if not __stable__:
 
 def test(dsn=None):
     """Run all available tests for PCSE."""
+    from . import tests
     tests.test_all(dsn)
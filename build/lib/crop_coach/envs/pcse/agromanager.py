@@ -895,6 +895,27 @@ class AgroManager(AncillaryObject):
             r.append(ev_dispatcher)
         return r
 
+    def set_timed_events(self, event_definitions):
+        """Replaces the timed events of the current campaign.
+
+        :param event_definitions: the timed events in the same format as the 'TimedEvents'
+            section of the agromanagement definition, or None to remove all timed events.
+
+        The new events are validated against the current campaign interval and the end date
+        of the agromanagement is derived again. Note that events on days that were already
+        simulated will not be dispatched anymore.
+        """
+        if event_definitions is None:
+            te_dsp = None
+        else:
+            campaign_start = self.campaign_start_dates[self._icampaign]
+            next_campaign = self.campaign_start_dates[self._icampaign+1]
+            te_dsp = self._build_TimedEventDispatchers(self.kiosk, event_definitions)
+            for te in te_dsp:
+                te.validate(campaign_start, next_campaign)
+        self.timed_event_dispatchers[0] = te_dsp
+        self._end_date = None
+
     def __call__(self, day, drv):
         """Calls the AgroManager to execute and crop calendar actions, timed or state events.
 
@@ -96,6 +96,13 @@ class SimulationObject(HasTraits, DispatcherObject):
             msg = "Assignment to non-existing attribute '%s' prevented." % attr
             raise AttributeError(msg)
 
+    def __getstate__(self):
+        # The 'prepare_states' and 'prepare_rates' decorators cache wrapped
+        # functions on the instance which are bound to this instance. Leave
+        # them out, a copy rebuilds them on first use.
+        state = HasTraits.__getstate__(self)
+        return {k: v for k, v in state.items() if type(v) is not types.FunctionType}
+
     def get_variable(self, varname):
         """ Return the value of the specified state or rate variable.
 
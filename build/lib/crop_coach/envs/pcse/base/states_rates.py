@@ -4,9 +4,9 @@
 import logging
 from datetime import date
 
-from ..traitlets import (HasTraits, List, Float, Int, Instance, Dict, Bool, All)
+from ..traitlets import (HasTraits, List, Float, Int, Instance, Dict, Bool, All, Undefined)
 from ..pydispatch import dispatcher
-from ..util import Afgen
+from ..util import Afgen, AfgenTrait
 from .. import exceptions as exc
 from ..settings import settings
 from .variablekiosk import VariableKiosk
@@ -45,8 +45,19 @@ class ParamTemplate(HasTraits):
           File "pcse/base.py", line 205, in __init__
             raise exc.ParameterError(msg)
         pcse.exceptions.ParameterError: Value for parameter C missing.
+
+    With `settings.FAST_STATES_RATES` enabled, the parameters are stored in
+    `__slots__` of a generated subclass instead of traits, see `_fast_class()`.
     """
 
+    # Class the fast-mode class has been generated from, None for normal classes
+    _fast_base = None
+
+    def __new__(cls, *args, **kwargs):
+        if settings.FAST_STATES_RATES and cls._fast_base is None:
+            cls = _fast_class(cls)
+        return HasTraits.__new__(cls, *args, **kwargs)
+
     def __init__(self, parvalues):
 
         HasTraits.__init__(self)
@@ -100,6 +111,21 @@ class StatesRatesCommon(HasTraits):
     _valid_vars = Instance(set)
     _locked = Bool(False)
 
+    # Class the fast-mode class has been generated from, None for normal classes
+    _fast_base = None
+
+    def __new__(cls, *args, **kwargs):
+        """Creates an instance of the fast-mode class when `settings.FAST_STATES_RATES`
+        is enabled. The class depends on the published variables, which are taken
+        from the arguments of __init__. States with implicit rates always use traits.
+        """
+        if settings.FAST_STATES_RATES and cls._fast_base is None and \
+                not issubclass(cls, StatesWithImplicitRatesTemplate):
+            publish = kwargs["publish"] if "publish" in kwargs else \
+                (args[1] if len(args) > 1 else None)
+            cls = _fast_class(cls, frozenset(check_publish(publish)))
+        return HasTraits.__new__(cls, *args, **kwargs)
+
     def __init__(self, kiosk=None, publish=None):
         """Set up the common stuff for the states and rates template
         including variables that have to be published in the kiosk
@@ -152,7 +178,7 @@ class StatesRatesCommon(HasTraits):
                 publish.remove(attr)
                 self._kiosk.register_variable(id(self), attr, type=self._vartype,
                                               publish=True)
-                self.observe(handler=self._update_kiosk, names=attr, type=All)
+                self._connect_kiosk(attr)
             else:
                 self._kiosk.register_variable(id(self), attr, type=self._vartype,
                                               publish=False)
@@ -181,11 +207,29 @@ class StatesRatesCommon(HasTraits):
     #         msg = "Assignment to non-existing attribute '%s' prevented." % attr
     #         raise AttributeError(msg)
 
+    def _connect_kiosk(self, attr):
+        """Set a trigger on published variable attr to update its value in the kiosk.
+        """
+        self.observe(handler=self._update_kiosk, names=attr, type=All)
+
     def _update_kiosk(self, change):
         """Update the variable_kiosk through trait notification.
         """
         self._kiosk.set_variable(id(self), change["name"], change["new"])
 
+    def __setstate__(self, state):
+        """Restores a copied/unpickled object, trait observers are not part of
+        the state so the published variables are connected again to the kiosk.
+        """
+        HasTraits.__setstate__(self, state)
+        if self._vartype == "S":
+            published = self._kiosk.published_states
+        else:
+            published = self._kiosk.published_rates
+        for attr in self._valid_vars:
+            if attr in published:
+                self._connect_kiosk(attr)
+
     def unlock(self):
         "Unlocks the attributes of this class."
         self._locked = False
@@ -422,3 +466,137 @@ class RatesTemplate(StatesRatesCommon):
         or False (Boolean).
         """
         self._trait_values.update(self._rate_vars_zero)
+
+
+# Fast-mode classes: with settings.FAST_STATES_RATES enabled, the templates above
+# are instantiated as a generated subclass that stores the declared variables in
+# __slots__. Reading a variable is then a plain slot lookup instead of a call to
+# the trait descriptor. On assignment, Float values are still coerced to float
+# and published variables are pushed to the kiosk, but the other trait types are
+# not validated.
+_fast_classes = {}
+
+
+def _fast_class(cls, publish=frozenset()):
+    """Returns the fast-mode class of a ParamTemplate, StatesTemplate or
+    RatesTemplate subclass.
+
+    :param cls: the class as defined by the user, with the variables as traits.
+    :param publish: frozenset with the names of the published variables. These
+        are part of the class as the kiosk is updated by its `__setattr__`.
+    """
+    key = (cls, publish)
+    if key in _fast_classes:
+        return _fast_classes[key]
+
+    if issubclass(cls, ParamTemplate):
+        mixin = _FastParamsMixin
+    elif issubclass(cls, RatesTemplate):
+        mixin = _FastRatesMixin
+    else:
+        mixin = _FastStatesRatesMixin
+    # All traits get a slot, including private ones such as _kiosk and _locked
+    traits = cls.class_traits()
+    slots = tuple(name for name in traits if not name.startswith("trait"))
+    ns = {"__slots__": slots,
+          "__module__": cls.__module__,
+          "__qualname__": cls.__qualname__,
+          "__doc__": cls.__doc__,
+          "_fast_base": cls,
+          "_fast_traits": {name: traits[name] for name in slots},
+          "_fast_floats": frozenset(n for n in slots if isinstance(traits[n], Float)),
+          "_fast_afgens": frozenset(n for n in slots if isinstance(traits[n], AfgenTrait)),
+          "_fast_published": publish}
+    fast_cls = type(cls)(cls.__name__, (mixin, cls), ns)
+    _fast_classes[key] = fast_cls
+    return fast_cls
+
+
+def _new_fast_instance(cls, publish):
+    """Creates an uninitialized fast-mode instance of cls for copy and pickle.
+    """
+    fast_cls = _fast_class(cls, publish)
+    return HasTraits.__new__(fast_cls)
+
+
+class _FastSlotsMixin(object):
+    """Methods shared by the fast-mode classes, these come before the
+    user-defined class in the MRO of the generated class.
+    """
+    __slots__ = ()
+
+    def setup_instance(*args, **kwargs):
+        # Called by HasTraits.__new__(), the slots start with the trait defaults
+        self = args[0]
+        HasTraits.setup_instance(*args, **kwargs)
+        for name, trait in self._fast_traits.items():
+            value = trait.default()
+            if value is Undefined:
+                continue
+            if name in self._fast_floats and value is not None:
+                value = float(value)
+            object.__setattr__(self, name, value)
+
+    def trait_names(self, **metadata):
+        # The slots hide the traits of the user-defined class
+        return self._fast_base.class_trait_names(**metadata)
+
+    def traits(self, **metadata):
+        return self._fast_base.class_traits(**metadata)
+
+    def __getstate__(self):
+        state = HasTraits.__getstate__(self)
+        values = {}
+        for name in self._fast_traits:
+            try:
+                values[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        return state, values
+
+    def __setstate__(self, state):
+        state, values = state
+        HasTraits.__setstate__(self, state)
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __reduce_ex__(self, protocol):
+        return _new_fast_instance, (self._fast_base, self._fast_published), self.__getstate__()
+
+
+class _FastParamsMixin(_FastSlotsMixin):
+    __slots__ = ()
+
+    def __setattr__(self, attr, value):
+        if attr in self._fast_floats:
+            if value is not None and type(value) is not float:
+                value = self._fast_traits[attr].validate(self, value)
+        elif attr in self._fast_afgens:
+            value = self._fast_traits[attr].validate(self, value)
+        ParamTemplate.__setattr__(self, attr, value)
+
+
+class _FastStatesRatesMixin(_FastSlotsMixin):
+    __slots__ = ()
+
+    def __setattr__(self, attr, value):
+        if attr in self._fast_floats and value is not None and type(value) is not float:
+            value = self._fast_traits[attr].validate(self, value)
+        object.__setattr__(self, attr, value)
+        if attr in self._fast_published:
+            self._kiosk.set_variable(id(self), attr, value)
+
+    def _connect_kiosk(self, attr):
+        # Published variables are pushed to the kiosk by __setattr__
+        pass
+
+
+class _FastRatesMixin(_FastStatesRatesMixin):
+    __slots__ = ()
+
+    def zerofy(self):
+        """Sets the values of all rate values to zero (Int, Float)
+        or False (Boolean).
+        """
+        for name, value in self._rate_vars_zero.items():
+            object.__setattr__(self, name, value)
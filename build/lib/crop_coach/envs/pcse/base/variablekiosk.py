@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2004-2018 Alterra, Wageningen-UR
 # Allard de Wit (allard.dewit@wur.nl), April 2014
+import copy
+
 from .. import exceptions as exc
 
 
@@ -103,6 +105,34 @@ class VariableKiosk(dict):
         """
         return dict.__getitem__(self, item)
 
+    def __deepcopy__(self, memo):
+        """Copies the kiosk including the values of the published variables.
+
+        Note that the registered variables still refer to the object ids of the
+        original state/rate objects. Use `remap_owners()` once these objects
+        have been copied as well.
+        """
+        kiosk = VariableKiosk()
+        memo[id(self)] = kiosk
+        dict.update(kiosk, copy.deepcopy(dict(self), memo))
+        kiosk.registered_states = dict(self.registered_states)
+        kiosk.registered_rates = dict(self.registered_rates)
+        kiosk.published_states = dict(self.published_states)
+        kiosk.published_rates = dict(self.published_rates)
+        return kiosk
+
+    def remap_owners(self, memo):
+        """Maps the object ids of the registered variables onto the copied objects.
+
+        :param memo: the memo dictionary of a `copy.deepcopy()` call, mapping
+            the id of each original object onto its copy.
+        """
+        for table in (self.registered_states, self.registered_rates,
+                      self.published_states, self.published_rates):
+            for varname, oid in table.items():
+                if oid in memo:
+                    table[varname] = id(memo[oid])
+
     def __str__(self):
         msg = "Contents of VariableKiosk:\n"
         msg += " * Registered state variables: %i\n" % len(self.registered_states)
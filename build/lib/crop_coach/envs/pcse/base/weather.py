@@ -260,6 +260,15 @@ class WeatherDataProvider(object):
 
         self.store.update(store)
 
+    def to_columnar(self, path):
+        """Writes the contents of the WeatherDataProvider as a columnar store in directory `path`.
+
+        The store can be read back (memory-mapped) with the ColumnarWeatherDataProvider,
+        see `pcse.fileinput.columnar_weather`.
+        """
+        from ..fileinput.columnar_weather import write_columnar_weather
+        return write_columnar_weather(self, path)
+
     def export(self):
         """Exports the contents of the WeatherDataProvider as a list of dictionaries.
 
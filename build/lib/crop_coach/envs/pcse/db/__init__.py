@@ -1,12 +1,23 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2004-2014 Alterra, Wageningen-UR
 # Allard de Wit (allard.dewit@wur.nl), April 2014
+import importlib
 
-from . import pcse
-from . import cgms8
-from . import cgms12
-from . import cgms14
-from .nasapower import NASAPowerWeatherDataProvider
-from . import hdf5
+from .nasapower import NASAPowerWeatherDataProvider, NASAPowerFileWeatherDataProvider
 from . import wofost_parameters
 
+# The database packages depend on SQLAlchemy (and HDF5 on PyTables), they are
+# imported on first access, e.g. `db.pcse` or `from pcse.db import cgms14`.
+_lazy_subpackages = ("pcse", "cgms8", "cgms12", "cgms14", "hdf5")
+
+
+def __getattr__(name):
+    if name in _lazy_subpackages:
+        module = importlib.import_module("." + name, __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy_subpackages))
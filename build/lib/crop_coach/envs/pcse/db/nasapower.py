@@ -2,15 +2,18 @@
 # Copyright (c) 2004-2018 Alterra, Wageningen-UR
 # Allard de Wit (allard.dewit@wur.nl), July 2018
 import os
+import json
+import hashlib
 import datetime as dt
 
 import numpy as np
-import pandas as pd
-import requests
+# pandas and requests are imported where used: they are only needed when the
+# weather is not yet in the cache, and importing them slows down startup.
 
-from crop_coach.envs.pcse.base import WeatherDataProvider, WeatherDataContainer
+from crop_coach.envs.pcse.base import WeatherDataContainer
+from crop_coach.envs.pcse.fileinput.columnar_weather import ColumnarWeatherDataProvider
 from crop_coach.envs.pcse.util import ea_from_tdew, reference_ET, check_angstromAB
-from crop_coach.envs.pcse.exceptions import PCSEError
+from crop_coach.envs.pcse.exceptions import PCSEError, WeatherDataProviderError
 from crop_coach.envs.pcse.settings import settings
 
 # Define some lambdas to take care of unit conversions.
@@ -22,7 +25,7 @@ def tdew_to_hpa(x): return ea_from_tdew(x) * 10.
 def to_date(d): return d.date()
 
 
-class NASAPowerWeatherDataProvider(WeatherDataProvider):
+class NASAPowerWeatherDataProvider(ColumnarWeatherDataProvider):
     """WeatherDataProvider for using the NASA POWER database with PCSE
 
     :param latitude: latitude to request weather data for
@@ -50,9 +53,11 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
     The `NASAPowerWeatherDataProvider` retrieves the weather from the
     th NASA POWER API and does the necessary conversions to be compatible
     with PCSE. After the data has been retrieved and stored, the contents
-    are dumped to a binary cache file. If another request is made for the
-    same location, the cache file is loaded instead of a full request to the
-    NASA Power server.
+    are written to a columnar cache store (see `pcse.fileinput.columnar_weather`)
+    which is memory-mapped, so worker processes share a single copy of the
+    weather data. If another request is made for the same location, the cache
+    store is opened instead of a full request to the NASA Power server. Binary
+    cache files of earlier versions are converted to a columnar store on first use.
 
     Cache files are used until they are older then 90 days. After 90 days
     the NASAPowerWeatherDataProvider will make a new request to obtain
@@ -80,7 +85,7 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
 
     def __init__(self, latitude, longitude, force_update=False, ETmodel="PM"):
 
-        WeatherDataProvider.__init__(self)
+        ColumnarWeatherDataProvider.__init__(self)
 
         if latitude < -90 or latitude > 90:
             msg = "Latitude should be between -90 and 90 degrees."
@@ -91,7 +96,7 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
 
         self.latitude = float(latitude)
         self.longitude = float(longitude)
-        self.ETmodel = ETmodel
+        self.ETmodel = self._requested_ETmodel = ETmodel
         msg = "Retrieving weather data from NASA Power for lat/lon: (%f, %f)."
         self.logger.info(msg % (self.latitude, self.longitude))
 
@@ -106,7 +111,7 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
 
         # get age of cache file, if age < 90 days then try to load it. If loading fails retrieve data
         # from the NASA server .
-        r = os.stat(cache_file)
+        r = os.stat(os.path.join(cache_file, "meta.json") if os.path.isdir(cache_file) else cache_file)
         cache_file_date = dt.date.fromtimestamp(r.st_mtime)
         age = (dt.date.today() - cache_file_date).days
         if age < 90:
@@ -158,9 +163,8 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
         # Start building the weather data containers
         self._make_WeatherDataContainers(df_pcse.to_dict(orient="records"))
 
-        # dump contents to a cache file
-        cache_filename = self._get_cache_filename(latitude, longitude)
-        self._dump(cache_filename)
+        # write contents to a columnar cache store
+        self._write_cache_file()
 
     def _estimate_AngstAB(self, df_power):
         """Determine Angstrom A/B parameters from Top-of-Atmosphere (ALLSKY_TOA_SW_DWN) (-- In v2 : 'TOA_SW_DWN' --)and
@@ -251,6 +255,7 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
         # req = requests.get(server, params=payload)
         api_request_url = f"{server}?parameters={payload['parameters']}&community={payload['community']}&longitude={payload['lon']}&latitude={payload['lat']}&start={payload['startDate']}&end={payload['endDate']}&format={payload['format']}"
 
+        import requests
         response = requests.get(url=api_request_url,
                                 verify=True, timeout=30.00)
 
@@ -276,53 +281,66 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
         # return json.load(open("nasapower.json"))
 
     def _find_cache_file(self, latitude, longitude):
-        """Try to find a cache file for given latitude/longitude.
+        """Try to find a cache store (or a binary cache file) for given latitude/longitude.
 
-        Returns None if the cache file does not exist, else it returns the full path
-        to the cache file.
+        Returns None if the cache does not exist, else it returns the full path
+        to the cache store or cache file.
         """
         cache_filename = self._get_cache_filename(latitude, longitude)
-        if os.path.exists(cache_filename):
-            return cache_filename
-        else:
-            return None
+        for fname in (cache_filename, cache_filename.replace(".columnar", ".cache")):
+            if os.path.exists(fname):
+                return fname
+        return None
 
     def _get_cache_filename(self, latitude, longitude):
         """Constructs the filename used for cache files given latitude and longitude
 
         The latitude and longitude is coded into the filename by truncating on
-        0.1 degree. So the cache filename for a point with lat/lon 52.56/-124.78 will be:
-        NASAPowerWeatherDataProvider_LAT00525_LON-1247.cache
+        0.1 degree. So the cache store for a point with lat/lon 52.56/-124.78 will be:
+        NASAPowerWeatherDataProvider_LAT00525_LON-1247.columnar
         """
 
-        fname = "%s_LAT%05i_LON%05i.cache" % (self.__class__.__name__,
+        fname = "%s_LAT%05i_LON%05i.columnar" % (self.__class__.__name__,
                                               int(latitude*10), int(longitude*10))
         cache_filename = os.path.join(settings.METEO_CACHE_DIR, fname)
         return cache_filename
 
     def _write_cache_file(self):
-        """Writes the meteo data from NASA Power to a cache file.
+        """Writes the meteo data from NASA Power to a columnar cache store and opens it.
         """
         cache_filename = self._get_cache_filename(
             self.latitude, self.longitude)
         try:
-            self._dump(cache_filename)
+            self.to_columnar(cache_filename)
+            self._open_columnar(cache_filename)
         except (IOError, EnvironmentError) as e:
             msg = "Failed to write cache to file '%s' due to: %s" % (
                 cache_filename, e)
             self.logger.warning(msg)
 
     def _load_cache_file(self):
-        """Loads the data from the cache file. Return True if successful.
+        """Loads the data from the cache store (or binary cache file). Return True if successful.
         """
-        cache_filename = self._get_cache_filename(
+        cache_filename = self._find_cache_file(
             self.latitude, self.longitude)
         try:
-            self._load(cache_filename)
+            if cache_filename is None:
+                raise IOError("no cache store found")
+            if os.path.isdir(cache_filename):
+                self._open_columnar(cache_filename)
+                # Check if the reference ET from the cache store is calculated with the
+                # same model as specified by the user.
+                if self.ETmodel != self._requested_ETmodel:
+                    msg = "Mismatch in reference ET from cache file."
+                    raise PCSEError(msg)
+            else:
+                # Binary cache file of an earlier version, convert to a columnar store
+                self._load(cache_filename)
+                self._write_cache_file()
             msg = "Cache file successfully loaded."
             self.logger.debug(msg)
             return True
-        except (IOError, EnvironmentError, EOFError) as e:
+        except (IOError, EnvironmentError, EOFError, WeatherDataProviderError) as e:
             msg = "Failed to load cache from file '%s' due to: %s" % (
                 cache_filename, e)
             self.logger.warning(msg)
@@ -355,6 +373,7 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
     def _process_POWER_records(self, powerdata):
         """Process the meteorological records returned by NASA POWER
         """
+        import pandas as pd
         msg = "Start parsing of POWER records from URL retrieval."
         self.logger.debug(msg)
 
@@ -365,7 +384,7 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
             # s = pd.Series(powerdata["features"][0]
             #               ["properties"]["parameter"][varname])
             s = pd.Series(powerdata["properties"]["parameter"][varname])
-            s[s == fill_value] = np.NaN
+            s[s == fill_value] = np.nan
             df_power[varname] = s
         df_power = pd.DataFrame(df_power)
         df_power["DAY"] = pd.to_datetime(df_power.index, format="%Y%m%d")
@@ -378,6 +397,7 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
         return df_power
 
     def _POWER_to_PCSE(self, df_power):
+        import pandas as pd
 
         # Convert POWER data to a dataframe with PCSE compatible inputs
         df_pcse = pd.DataFrame({"TMAX": df_power.T2M_MAX,
@@ -393,3 +413,72 @@ class NASAPowerWeatherDataProvider(WeatherDataProvider):
                                 "ELEV": self.elevation})
 
         return df_pcse
+
+
+class NASAPowerFileWeatherDataProvider(NASAPowerWeatherDataProvider):
+    """WeatherDataProvider reading a NASA POWER response stored in a local file
+
+    :param fname: JSON file with the response of the NASA POWER daily point API
+    :keyword force_reload: Ignore the cache store and reload from the JSON file.
+    :keyword ETmodel: "PM"|"P" for selecting penman-monteith or Penman
+        method for reference evapotranspiration. Defaults to "PM".
+
+    This is a stand-in for the `NASAPowerWeatherDataProvider` that does not need
+    a connection to the NASA POWER server, e.g. for running simulations offline
+    or on compute nodes without internet access. The JSON file can be saved from
+    the POWER API with the same parameters as used by the
+    `NASAPowerWeatherDataProvider`, e.g.::
+
+        https://power.larc.nasa.gov/api/temporal/daily/point?parameters=TOA_SW_DWN,
+        ALLSKY_SFC_SW_DWN,T2M,T2M_MIN,T2M_MAX,T2MDEW,WS2M,PRECTOTCORR&community=RE&
+        longitude=5.67&latitude=51.97&start=20150101&end=20221231&format=JSON
+
+    The location is taken from the file. The processed weather data are written
+    to a columnar cache store which is used as long as it is more recent than
+    the JSON file.
+    """
+
+    def __init__(self, fname, force_reload=False, ETmodel="PM"):
+
+        ColumnarWeatherDataProvider.__init__(self)
+
+        self.fname = os.path.abspath(fname)
+        if not os.path.exists(self.fname):
+            msg = "Cannot find NASA POWER file: %s" % self.fname
+            raise PCSEError(msg)
+        self.ETmodel = self._requested_ETmodel = ETmodel
+
+        cache_filename = self._get_cache_filename(None, None)
+        if not force_reload and os.path.isdir(cache_filename) and \
+                os.stat(os.path.join(cache_filename, "meta.json")).st_mtime > os.stat(self.fname).st_mtime:
+            if self._load_cache_file():
+                return
+
+        msg = "Reading NASA Power weather data from file: %s" % self.fname
+        self.logger.info(msg)
+        with open(self.fname) as fp:
+            self._powerdata = json.load(fp)
+        longitude, latitude = self._powerdata["geometry"]["coordinates"][:2]
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self._get_and_process_NASAPower(self.latitude, self.longitude)
+        del self._powerdata
+
+    def _query_NASAPower_server(self, latitude, longitude):
+        """Returns the NASA Power response read from the file instead of querying the server
+        """
+        return self._powerdata
+
+    def _find_cache_file(self, latitude, longitude):
+        cache_filename = self._get_cache_filename(latitude, longitude)
+        return cache_filename if os.path.exists(cache_filename) else None
+
+    def _get_cache_filename(self, latitude, longitude):
+        """Constructs the name of the cache store, which is named after the JSON file
+        and a hash of its absolute path (files with the same name may be found in
+        different directories).
+        """
+        path_hash = hashlib.sha1(self.fname.encode("utf-8")).hexdigest()[:16]
+        fname = "%s_%s_%s.columnar" % (self.__class__.__name__,
+                                       os.path.splitext(os.path.basename(self.fname))[0], path_hash)
+        return os.path.join(settings.METEO_CACHE_DIR, fname)
@@ -15,8 +15,12 @@ This kind of functionality cannot be implemented in the Engine because
 the model details are not known beforehand.
 """
 import os, sys
+import copy
 import datetime
 import gc
+import types
+
+import numpy as np
 
 from .traitlets import Instance, Bool, List, Dict
 from .base import (VariableKiosk, WeatherDataProvider,
@@ -24,6 +28,8 @@ from .base import (VariableKiosk, WeatherDataProvider,
                            BaseEngine, ParameterProvider)
 from .util import ConfigurationLoader, check_date
 from .timer import Timer
+from .profiler import EngineProfiler
+from .pydispatch import dispatcher
 from . import signals
 from . import exceptions as exc
 from .settings import settings
@@ -110,6 +116,18 @@ class Engine(BaseEngine):
     _saved_summary_output = List()
     _saved_terminal_output = Dict()
 
+    # Daily output is stored in a preallocated structured array, see _save_output()
+    _output_buffer = None
+    _output_count = 0
+    _output_index = None
+    _output_index_key = None
+
+    # EngineProfiler when profiling is enabled, see enable_profiling()
+    _profiler = None
+
+    # Signals to send with the agromanagement of the next day, see schedule_signal()
+    _scheduled_signals = None
+
     def __init__(self, parameterprovider, weatherdataprovider, agromanagement, config=None):
 
         BaseEngine.__init__(self)
@@ -151,7 +169,7 @@ class Engine(BaseEngine):
             self.soil = self.mconf.SOIL(self.day, self.kiosk, parameterprovider)
 
         # Call AgroManagement module for management actions at initialization
-        self.agromanager(self.day, self.drv)
+        self._run_agromanager(self.day, self.drv)
 
         # Calculate initial rates
         self.calc_rates(self.day, self.drv)
@@ -205,7 +223,7 @@ class Engine(BaseEngine):
         self.drv = self._get_driving_variables(self.day)
 
         # Agromanagement decisions
-        self.agromanager(self.day, self.drv)
+        self._run_agromanager(self.day, self.drv)
 
         # Rate calculation
         self.calc_rates(self.day, self.drv)
@@ -213,6 +231,16 @@ class Engine(BaseEngine):
         if self.flag_terminate is True:
             self._terminate_simulation(self.day)
 
+    def _run_agromanager(self, day, drv):
+        """Calls the AgroManager, as a method of the engine so that it can be timed
+        by the profiler, and sends the signals scheduled for this day.
+        """
+        self.agromanager(day, drv)
+        if self._scheduled_signals:
+            scheduled, self._scheduled_signals = self._scheduled_signals, None
+            for signal, kwargs in scheduled:
+                self._send_signal(signal=signal, **kwargs)
+
     def run(self, days=1):
         """Advances the system state with given number of days"""
 
@@ -245,6 +273,113 @@ class Engine(BaseEngine):
         while self.flag_terminate is False and self.day < rday:
             self._run()
 
+    def enable_profiling(self):
+        """Starts recording wall time and call counts per SimulationObject class and
+        phase, and the number of signals sent. Returns the `EngineProfiler`.
+
+        Profiling costs nothing when it is not enabled: the methods are only wrapped
+        by timers when calling this method, see the `pcse.profiler` module.
+        """
+        if self._profiler is None:
+            self._profiler = EngineProfiler(self)
+            self._profiler.start()
+        return self._profiler
+
+    def disable_profiling(self):
+        """Stops profiling and returns the `EngineProfiler` with the profile recorded
+        so far, or None if profiling was not enabled.
+        """
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.stop()
+            self._profiler = None
+        return profiler
+
+    def get_profile(self, as_json=False):
+        """Returns the profile recorded since profiling was enabled, as a dict or
+        as a JSON string. See `EngineProfiler.as_dict()` for its contents.
+        """
+        if self._profiler is None:
+            msg = "Profiling is not enabled, call enable_profiling() first."
+            raise exc.PCSEError(msg)
+        if as_json:
+            return self._profiler.to_json()
+        return self._profiler.as_dict()
+
+    def __getstate__(self):
+        # Copies are not profiled: leave out the profiler and the timed methods
+        state = BaseEngine.__getstate__(self)
+        return {k: v for k, v in state.items()
+                if k != "_profiler" and type(v) is not types.FunctionType}
+
+    def snapshot(self):
+        """Returns an independent copy of the engine at the current day.
+
+        The crop, soil, kiosk, agromanager, timer and the output saved so far are
+        deep-copied, so the copy can be run forward without affecting this engine
+        and vice versa. The weather data provider and the model configuration are
+        not modified during a simulation and are shared with the copy.
+        """
+        memo = {id(self.weatherdataprovider): self.weatherdataprovider,
+                id(self.mconf): self.mconf}
+        clone = copy.deepcopy(self, memo)
+
+        # The kiosk knows the owners of variables by their object id
+        clone.kiosk.remap_owners(memo)
+
+        # Signal connections are stored in the dispatcher, not on the objects
+        # themselves. Connect the handlers of the copies to the new kiosk in
+        # the original order.
+        for signal, receivers in list(dispatcher.connections.get(id(self.kiosk), {}).items()):
+            for receiver in dispatcher.liveReceivers(receivers):
+                owner = getattr(receiver, "__self__", None)
+                if owner is None or id(owner) not in memo:
+                    continue
+                handler = getattr(memo[id(owner)], receiver.__name__)
+                dispatcher.connect(handler, signal, sender=clone.kiosk)
+
+        return clone
+
+    def fork(self, timed_events):
+        """Returns a snapshot of the engine which continues with other timed events.
+
+        :param timed_events: the timed events for the current campaign in the same
+            format as the 'TimedEvents' section of the agromanagement, or None to
+            continue without timed events.
+
+        This is useful when many simulations share the same prefix: the engine
+        can be run until the day before the first timed event and then be forked
+        for each events table. Events on days that were already simulated are
+        not dispatched.
+        """
+        clone = self.snapshot()
+        clone.agromanager.set_timed_events(timed_events)
+        clone.timer.end_date = clone.agromanager.end_date
+        return clone
+
+    def schedule_signal(self, signal, **kwargs):
+        """Sends `signal` on the next simulation day, as a timed event on that day would.
+
+        :param signal: the signal to send, e.g. `signals.irrigate`
+        :param kwargs: the keyword arguments of the signal, e.g. `amount` and
+            `efficiency` for `signals.irrigate`.
+
+        This allows to take management decisions while running the engine, for
+        example::
+
+            >>> engine.run(days=7)
+            >>> engine.schedule_signal(signals.irrigate, amount=2., efficiency=0.7)
+            >>> engine.run(days=7)
+
+        The signals are sent after the agromanagement actions of the next day
+        and before the rates of that day are calculated. Sending the signal
+        directly after `run()` is too late for rates that are used on the same
+        day, e.g. the fertilizer supply set by `signals.apply_npk`.
+        """
+        if self._scheduled_signals is None:
+            self._scheduled_signals = []
+        self._scheduled_signals.append((signal, kwargs))
+
     def _on_CROP_FINISH(self, day, crop_delete=False):
         """Sets the variable 'flag_crop_finish' to True when the signal
         CROP_FINISH is received.
@@ -278,6 +413,9 @@ class Engine(BaseEngine):
         self.parameterprovider.set_active_crop(crop_name, variety_name, crop_start_type,
                                                crop_end_type)
         self.crop = self.mconf.CROP(day, self.kiosk, self.parameterprovider)
+        self._invalidate_output_index()
+        if self._profiler is not None:
+            self._profiler.instrument(self.crop)
 
     def _on_TERMINATE(self):
         """Sets the variable 'flag_terminate' to True when the signal TERMINATE
@@ -314,6 +452,7 @@ class Engine(BaseEngine):
             self.flag_crop_delete = False
             self.crop._delete()
             self.crop = None
+            self._invalidate_output_index()
             # Run a dedicated garbage collection, because it was demonstrated
             # that the standard python GC did not garbage collect the crop
             # simulation object. This caused signals to be received by crop simulation
@@ -344,17 +483,115 @@ class Engine(BaseEngine):
 
         return drv
 
+    def _find_variable_owners(self, varname):
+        """Returns the states/rates objects holding `varname` in the order in
+        which `get_variable()` searches the hierarchy of SimulationObjects.
+        """
+        owners = []
+
+        def search(simobj):
+            if hasattr(simobj.states, varname):
+                owners.append(simobj.states)
+            elif hasattr(simobj.rates, varname):
+                owners.append(simobj.rates)
+            else:
+                for sub in simobj.subSimObjects:
+                    search(sub)
+
+        for simobj in self.subSimObjects:
+            search(simobj)
+        return tuple(owners)
+
+    def _invalidate_output_index(self):
+        """Drops the index of OUTPUT_VARS and the references to the components it holds.
+        """
+        self._output_index = None
+        self._output_index_key = None
+
+    def _get_output_index(self):
+        """Returns the index of OUTPUT_VARS resolved to the states/rates objects
+        holding them, as a list of (varname, attribute name, owners) tuples.
+
+        The index is dropped at crop start and when the crop is deleted, and
+        rebuilt when the crop or soil component is another object or when
+        variables are (de)registered in the kiosk. The components are compared
+        by identity (`is`) on the objects themselves: an id() can be reused by a
+        new object once the old one is freed.
+        """
+        key = (self.crop, self.soil, len(self.kiosk.registered_states),
+               len(self.kiosk.registered_rates))
+        cached = self._output_index_key
+        if self._output_index is None or cached[0] is not key[0] or cached[1] is not key[1] \
+                or cached[2:] != key[2:]:
+            index = []
+            for var in self.mconf.OUTPUT_VARS:
+                if self.kiosk.variable_exists(var):
+                    index.append((var, var, self._find_variable_owners(var)))
+                elif self.kiosk.variable_exists(var.upper()):
+                    index.append((var, var.upper(), self._find_variable_owners(var.upper())))
+                else:
+                    index.append((var, None, ()))
+            self._output_index = index
+            self._output_index_key = key
+        return self._output_index
+
+    def _allocate_output_buffer(self, size, dtypes=None):
+        """(Re)allocates the output buffer with room for `size` days, keeping the
+        output saved so far. Output variables are float64 (None is stored as NaN)
+        unless `dtypes` specifies otherwise.
+        """
+        if dtypes is None:
+            dtypes = {}
+            if self._output_buffer is not None:
+                dtypes = {name: self._output_buffer.dtype[name] for name in self._output_buffer.dtype.names}
+        dtype = [("day", "datetime64[D]")] + \
+                [(var, dtypes.get(var, np.float64)) for var in self.mconf.OUTPUT_VARS]
+        buffer = np.empty(size, dtype=dtype)
+        if self._output_buffer is not None:
+            n = self._output_count
+            for name in buffer.dtype.names:
+                buffer[name][:n] = self._output_buffer[name][:n]
+        self._output_buffer = buffer
+
     def _save_output(self, day):
-        """Appends selected model variables to self._saved_output for this day.
+        """Stores selected model variables in the output buffer for this day.
         """
         # Switch off the flag for generating output
         self.flag_output = False
 
+        if self._output_buffer is None:
+            try:
+                size = (self.timer.end_date - self.timer.start_date).days + 1
+            except TypeError:
+                size = 366
+            self._allocate_output_buffer(max(size, 1))
+        elif self._output_count == len(self._output_buffer):
+            self._allocate_output_buffer(2 * len(self._output_buffer))
+
         # find current value of variables to are to be saved
-        states = {"day":day}
-        for var in self.mconf.OUTPUT_VARS:
-            states[var] = self.get_variable(var)
-        self._saved_output.append(states)
+        # find current value of variables to are to be saved, None is stored as NaN
+        row = [day]
+        for var, varname, owners in self._get_output_index():
+            value = None
+            for owner in owners:
+                value = getattr(owner, varname)
+                if value is not None:
+                    break
+            row.append(np.nan if value is None else value)
+
+        try:
+            self._output_buffer[self._output_count] = tuple(row)
+        except (TypeError, ValueError):
+            # Variable(s) that are not numbers (e.g. dates), store them as objects
+            dtypes = {}
+            for var, value in zip(self.mconf.OUTPUT_VARS, row[1:]):
+                if not isinstance(value, (int, float, np.number)):
+                    dtypes[var] = object
+            for name in self._output_buffer.dtype.names:
+                dtypes.setdefault(name, self._output_buffer.dtype[name])
+            self._allocate_output_buffer(len(self._output_buffer), dtypes)
+            self._output_buffer[self._output_count] = tuple(row)
+        self._output_count += 1
 
     def _save_summary_output(self):
         """Appends selected model variables to self._saved_summary_output.
@@ -406,13 +643,53 @@ class Engine(BaseEngine):
 
         return increments
 
-    def get_output(self):
+    def get_output_variables(self):
+        """Returns the current values of the OUTPUT_VARS as a list, in the order of
+        the model configuration, with None for variables that do not exist.
+
+        Published variables are read from the kiosk, the others from the
+        states/rates objects holding them. Unlike `get_variable()` the hierarchy of
+        SimulationObjects is not searched on each call, which makes this cheap
+        enough to observe the model after every day.
+        """
+        kiosk = self.kiosk
+        values = []
+        for var, varname, owners in self._get_output_index():
+            if varname in kiosk:
+                values.append(kiosk[varname])
+                continue
+            value = None
+            for owner in owners:
+                value = getattr(owner, varname)
+                if value is not None:
+                    break
+            values.append(value)
+        return values
+
+    def get_output(self, as_array=False):
         """Returns the variables have have been stored during the simulation.
 
         If no output is stored an empty list is returned. Otherwise, the output is
         returned as a list of dictionaries in chronological order. Each dictionary is
-        a set of stored model variables for a certain date. """
+        a set of stored model variables for a certain date.
 
+        :param as_array: return the output as a NumPy structured array with a
+            field "day" (datetime64) and one field for each of the OUTPUT_VARS,
+            variables without value are NaN. The array is a view on the output
+            buffer of the engine (no copy is made).
+        """
+        if as_array:
+            if self._output_buffer is None:
+                self._allocate_output_buffer(0)
+            return self._output_buffer[:self._output_count]
+
+        # Convert the rows not yet converted to dictionaries
+        n = len(self._saved_output)
+        if n < self._output_count:
+            names = self._output_buffer.dtype.names
+            for row in self._output_buffer[n:self._output_count].tolist():
+                self._saved_output.append({name: (None if value != value else value)
+                                           for name, value in zip(names, row)})
         return self._saved_output
 
     def get_summary_output(self):
@@ -498,7 +775,7 @@ class CGMSEngine(Engine):
             self.drv = self._get_driving_variables(self.day)
 
             # Agromanagement decisions
-            self.agromanager(self.day, self.drv)
+            self._run_agromanager(self.day, self.drv)
 
             # Rate calculation
             self.calc_rates(self.day, self.drv)
@@ -10,6 +10,10 @@ For reading files in the CABO formats used by crop simulation models in FORTRAN
 For reading the new PCSE format use:
 - PCSEFileReader reads parameters files in the PCSE format
 
+For sharing weather data between processes:
+- ColumnarWeatherDataProvider reads memory-mapped columnar weather stores
+  which can be written by any WeatherDataProvider with `to_columnar()`.
+
 """
 
 from .cabo_reader import CABOFileReader
@@ -18,4 +22,5 @@ from .pcsefilereader import PCSEFileReader
 from .xlsweatherdataprovider import ExcelWeatherDataProvider
 from .yaml_agro_loader import YAMLAgroManagementReader
 from .csvweatherdataprovider import CSVWeatherDataProvider
-from .yaml_cropdataprovider import YAMLCropDataProvider
\ No newline at end of file
+from .yaml_cropdataprovider import YAMLCropDataProvider
+from .columnar_weather import ColumnarWeatherDataProvider, write_columnar_weather
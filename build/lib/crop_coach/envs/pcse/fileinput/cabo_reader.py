@@ -4,6 +4,7 @@
 import re
 
 from ..exceptions import PCSEError
+from ..input_cache import load_cached
 
 class XYPairsError(PCSEError):
     pass
@@ -166,6 +167,14 @@ class CABOFileReader(dict):
         return par_definitions
         
     def __init__(self, fname):
+        # Parsed contents are cached, re-parsing only when the file has changed
+        self.header, parameters = load_cached(fname, "cabo", self._parse_file)
+        self.update(parameters)
+
+    def _parse_file(self, fname):
+        """Parses CABO file `fname` and returns the header and a dict of parameters.
+        """
+        parameters = {}
         with open(fname) as fp:
             filecontents = fp.readlines()
         filecontents = self._remove_empty_lines(filecontents)
@@ -176,7 +185,7 @@ class CABOFileReader(dict):
             raise PCSEError(msg)
 
         # Split between file header and parameters
-        self.header, filecontents = self._find_header(filecontents)
+        header, filecontents = self._find_header(filecontents)
 
         # Find parameter sections using string methods
         scalars, strings, tables = self._find_parameter_sections(filecontents)
@@ -195,7 +204,7 @@ class CABOFileReader(dict):
                     value = float(valuestr)
                 else:
                     value = int(valuestr)
-                self[parname] = value
+                parameters[parname] = value
             except (ValueError) as exc:
                 msg = "Failed to parse parameter, value: %s, %s" 
                 raise PCSEError(msg % (parstr, valuestr))
@@ -205,7 +214,7 @@ class CABOFileReader(dict):
                 parname, valuestr = parstr.split("=", 1)
                 parname = parname.strip()
                 value = (valuestr.replace("'","")).replace('"','')
-                self[parname] = value
+                parameters[parname] = value
             except (ValueError) as exc:
                 msg = "Failed to parse parameter, value: %s, %s" 
                 raise PCSEError(msg % (parstr, valuestr))
@@ -215,7 +224,7 @@ class CABOFileReader(dict):
             parname = parname.strip()
             try:
                 value = self._parse_table_values(valuestr)
-                self[parname] = value
+                parameters[parname] = value
             except (ValueError) as exc:
                 msg = "Failed to parse table parameter %s: %s" % (parname, valuestr)
                 raise PCSEError(msg)
@@ -229,6 +238,8 @@ class CABOFileReader(dict):
                 msg += "Parameter should be have even number of positions."
                 raise XYPairsError(msg)
 
+        return header, parameters
+
     def __str__(self):
         msg = ""
         for line in self.header:
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""Columnar, memory-mapped storage of weather data.
+
+A columnar weather store is a directory holding one NumPy array (``.npy``) per
+weather variable, indexed by the day offset from the first date, together with
+a ``meta.json`` file describing the site and the period. Days without weather
+data are flagged in the ``VALID.npy`` mask.
+
+The arrays are kept in a subdirectory named after the generation of the store,
+a hash of its weather data, which is referenced from ``meta.json``. A store is
+replaced by writing the arrays of the new generation next to the current one and
+then replacing ``meta.json`` atomically, so readers always find a complete store.
+
+Because the arrays are opened with ``numpy.load(..., mmap_mode="r")``, the
+pages of a store are shared by all processes reading it, instead of each
+worker process unpickling its own copy of the weather data.
+
+Any WeatherDataProvider can write a store with `write_columnar_weather()` (or
+`WeatherDataProvider.to_columnar()`) which can then be read back with the
+`ColumnarWeatherDataProvider`.
+"""
+import os
+import json
+import errno
+import hashlib
+import shutil
+import time
+import uuid
+import datetime as dt
+
+import numpy as np
+
+from ..base import WeatherDataProvider, WeatherDataContainer
+from ..exceptions import WeatherDataProviderError
+
+FORMAT_VERSION = 2
+# Stores of version 1 hold the arrays next to meta.json, they can still be read.
+READ_FORMAT_VERSIONS = (1, FORMAT_VERSION)
+META_FILE = "meta.json"
+VALID_MASK = "VALID"
+# Generations which are no longer referenced are removed when they are older than
+# this (seconds), a concurrent writer may be about to reference a new generation.
+STALE_GENERATION_AGE = 60.
+
+
+def _content_hash(meta, columns, valid):
+    """Returns a hash of the description and the arrays of a store, which identifies its weather data.
+    """
+    h = hashlib.sha1(json.dumps(meta, sort_keys=True).encode("utf-8"))
+    for v in meta["variables"]:
+        h.update(columns[v].tobytes())
+    h.update(valid.tobytes())
+    return h.hexdigest()[:20]
+
+
+def write_columnar_weather(wdp, path):
+    """Writes the weather data of WeatherDataProvider `wdp` as a columnar store in directory `path`.
+
+    :param wdp: a WeatherDataProvider holding its data in `wdp.store`
+    :param path: the directory of the columnar store, will be replaced if it exists.
+    :return: the path of the columnar store
+
+    The arrays are first written to a temporary directory which is moved in place
+    as a new generation when complete, after which meta.json is replaced by one
+    referencing it. Readers thus always find a complete store. When several
+    processes write the store concurrently, the last meta.json written is kept.
+    Temporary files are always removed, older generations once they are stale.
+    """
+    if wdp.supports_ensembles:
+        msg = "Writing ensemble weather to a columnar store is not supported."
+        raise WeatherDataProviderError(msg)
+    if not wdp.store:
+        msg = "No weather data to write to columnar store '%s'." % path
+        raise WeatherDataProviderError(msg)
+
+    days = sorted(day for (day, member_id) in wdp.store)
+    first_date, last_date = days[0], days[-1]
+    ndays = (last_date - first_date).days + 1
+
+    # Variables present on any day, in the order of WeatherDataContainer
+    variables = [v for v in WeatherDataContainer.required + WeatherDataContainer.optional
+                 if any(hasattr(wdc, v) for wdc in wdp.store.values())]
+    columns = {v: np.full(ndays, np.nan, dtype=np.float64) for v in variables}
+    valid = np.zeros(ndays, dtype=bool)
+    for day in days:
+        wdc = wdp.store[(day, 0)]
+        i = (day - first_date).days
+        valid[i] = True
+        for v in variables:
+            value = getattr(wdc, v, None)
+            if value is not None:
+                columns[v][i] = value
+
+    wdc = wdp.store[(first_date, 0)]
+    meta = {"format_version": FORMAT_VERSION,
+            "provider": wdp.__class__.__name__,
+            "first_date": first_date.isoformat(),
+            "ndays": ndays,
+            "variables": variables,
+            "latitude": float(wdc.LAT),
+            "longitude": float(wdc.LON),
+            "elevation": float(wdc.ELEV),
+            "description": wdp.description if isinstance(wdp.description, list) else [wdp.description],
+            "angstA": wdp.angstA,
+            "angstB": wdp.angstB,
+            "ETmodel": wdp.ETmodel}
+    meta["generation"] = _content_hash(meta, columns, valid)
+
+    path = os.path.abspath(path)
+    generation = meta["generation"]
+    # Unique per writer, also for threads of the same process
+    tmp_suffix = ".tmp%i_%s" % (os.getpid(), uuid.uuid4().hex[:8])
+    tmp_path = os.path.join(path, generation + tmp_suffix)
+    try:
+        os.makedirs(path, exist_ok=True)
+        generation_path = os.path.join(path, generation)
+        if not os.path.isdir(generation_path):
+            os.makedirs(tmp_path)
+            for v, column in columns.items():
+                np.save(os.path.join(tmp_path, v + ".npy"), column)
+            np.save(os.path.join(tmp_path, VALID_MASK + ".npy"), valid)
+            # When another writer has put the same generation in place, that one is kept.
+            _move_store(tmp_path, generation_path)
+
+        # Switch the store to the new generation
+        with open(os.path.join(path, META_FILE + tmp_suffix), "w") as fp:
+            json.dump(meta, fp, indent=1)
+        os.replace(os.path.join(path, META_FILE + tmp_suffix), os.path.join(path, META_FILE))
+    finally:
+        for p in (tmp_path, os.path.join(path, META_FILE + tmp_suffix)):
+            if os.path.isdir(p):
+                shutil.rmtree(p, ignore_errors=True)
+            elif os.path.exists(p):
+                os.remove(p)
+    _remove_stale_generations(path)
+    return path
+
+
+def _move_store(src, dst):
+    """Renames directory `src` to `dst`, returns False if `dst` already exists.
+    """
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno in (errno.ENOTEMPTY, errno.EEXIST):
+            return False
+        raise
+    return True
+
+
+def _remove_stale_generations(path):
+    """Removes the arrays of store `path` which are not referenced by its meta.json.
+
+    Readers which have read an older meta.json retry with the current one when
+    the arrays of their generation are gone (see `ColumnarWeatherDataProvider`).
+    """
+    try:
+        with open(os.path.join(path, META_FILE)) as fp:
+            current = json.load(fp).get("generation")
+    except (IOError, ValueError):
+        return
+    now = time.time()
+    for name in os.listdir(path):
+        p = os.path.join(path, name)
+        try:
+            if name.endswith(".npy"):
+                # Arrays of a store of version 1
+                os.remove(p)
+            elif os.path.isdir(p) and name != current and now - os.stat(p).st_mtime > STALE_GENERATION_AGE:
+                shutil.rmtree(p, ignore_errors=True)
+        except OSError:
+            pass
+
+
+class ColumnarWeatherDataProvider(WeatherDataProvider):
+    """Reads weather data from a columnar store written by `write_columnar_weather()`.
+
+    :param path: the directory of the columnar store, or None to start empty
+        (subclasses can open a store later on with `_open_columnar()`).
+    :param mmap_mode: mode for memory mapping the arrays, see `numpy.load`. Use
+        None to read the arrays into memory.
+
+    Retrieving the weather for a day is an index into the arrays, the
+    WeatherDataContainers are built on first use and kept for later calls.
+    Arrays for a period can be retrieved at once with `get_range()`::
+
+        >>> wdp = ColumnarWeatherDataProvider("weather_store")
+        >>> wdc = wdp(dt.date(2019, 5, 1))
+        >>> columns = wdp.get_range(dt.date(2019, 5, 1), dt.date(2019, 5, 31))
+        >>> columns["RAIN"].sum()
+
+    When no store is opened, the provider behaves as a plain WeatherDataProvider.
+    """
+    columns = None
+    generation = None
+
+    def __init__(self, path=None, mmap_mode="r"):
+        WeatherDataProvider.__init__(self)
+        if path is not None:
+            self._open_columnar(path, mmap_mode)
+
+    def _open_columnar(self, path, mmap_mode="r"):
+        """Opens the columnar store in directory `path` and clears the dict store.
+        """
+        # The store may be replaced while it is opened: its generation is then
+        # removed and the current meta.json references the new one.
+        for attempt in range(3):
+            meta = self._read_meta(path)
+            if meta.get("format_version") == 1:
+                arrays_path = path
+            else:
+                arrays_path = os.path.join(path, meta["generation"])
+            try:
+                columns = {v: np.load(os.path.join(arrays_path, v + ".npy"), mmap_mode=mmap_mode)
+                           for v in meta["variables"]}
+                valid = np.load(os.path.join(arrays_path, VALID_MASK + ".npy"), mmap_mode=mmap_mode)
+                break
+            except (IOError, OSError) as e:
+                error = e
+        else:
+            msg = "Failed reading columnar weather store '%s': %s" % (path, error)
+            raise WeatherDataProviderError(msg)
+
+        self.valid = valid
+        self.columns = columns
+        self.columnar_path = path
+        # Hash of the weather data, None for stores written by older versions
+        self.generation = meta.get("generation")
+        self.latitude = meta["latitude"]
+        self.longitude = meta["longitude"]
+        self.elevation = meta["elevation"]
+        self.description = meta["description"]
+        self.angstA = meta["angstA"]
+        self.angstB = meta["angstB"]
+        self.ETmodel = meta["ETmodel"]
+        self._first_date = dt.date.fromisoformat(meta["first_date"])
+        self._ndays = meta["ndays"]
+        self._last_date = self._first_date + dt.timedelta(days=self._ndays - 1)
+        self._containers = [None] * self._ndays
+        self.store = {}
+
+    @staticmethod
+    def _read_meta(path):
+        """Returns the contents of the meta.json of store `path`.
+        """
+        try:
+            with open(os.path.join(path, META_FILE)) as fp:
+                meta = json.load(fp)
+        except (IOError, ValueError) as e:
+            msg = "Failed reading columnar weather store '%s': %s" % (path, e)
+            raise WeatherDataProviderError(msg)
+        if meta.get("format_version") not in READ_FORMAT_VERSIONS:
+            msg = "Unsupported format version of columnar weather store '%s'." % path
+            raise WeatherDataProviderError(msg)
+        return meta
+
+    def _offset(self, day):
+        """Returns the index of `day` in the arrays, raises WeatherDataProviderError if out of range.
+        """
+        keydate = day if type(day) is dt.date else self.check_keydate(day)
+        i = (keydate - self._first_date).days
+        if not 0 <= i < self._ndays:
+            msg = "No weather data for %s." % keydate
+            raise WeatherDataProviderError(msg)
+        return i
+
+    def __call__(self, day, member_id=0):
+        if self.columns is None:
+            return WeatherDataProvider.__call__(self, day, member_id)
+        if member_id != 0:
+            msg = "Retrieving ensemble weather is not supported by %s" % self.__class__.__name__
+            raise WeatherDataProviderError(msg)
+
+        i = self._offset(day)
+        wdc = self._containers[i]
+        if wdc is None:
+            if not self.valid[i]:
+                msg = "No weather data for %s." % (self._first_date + dt.timedelta(days=i))
+                raise WeatherDataProviderError(msg)
+            values = {}
+            for v, column in self.columns.items():
+                value = float(column[i])
+                if value == value:  # skip NaN, e.g. optional variables not available that day
+                    values[v] = value
+            wdc = WeatherDataContainer(LAT=self.latitude, LON=self.longitude, ELEV=self.elevation,
+                                       DAY=self._first_date + dt.timedelta(days=i), **values)
+            self._containers[i] = wdc
+        return wdc
+
+    def get_range(self, start, end):
+        """Returns the weather data from `start` up to and including `end` as arrays.
+
+        :param start: first day of the period
+        :param end: last day of the period
+        :return: a dict with a read-only array for each variable, an array
+            "DAY" with the dates (numpy.datetime64) and "VALID" flagging the days
+            with weather data.
+        """
+        if self.columns is None:
+            msg = "Bulk retrieval of weather data requires a columnar store."
+            raise WeatherDataProviderError(msg)
+        i, j = self._offset(start), self._offset(end) + 1
+        if j <= i:
+            msg = "End date (%s) before start date (%s)." % (end, start)
+            raise WeatherDataProviderError(msg)
+        r = {v: column[i:j] for v, column in self.columns.items()}
+        r[VALID_MASK] = self.valid[i:j]
+        r["DAY"] = np.datetime64(self._first_date, "D") + np.arange(i, j)
+        return r
+
+    @property
+    def first_date(self):
+        if self.columns is None:
+            return WeatherDataProvider.first_date.fget(self)
+        return self._first_date
+
+    @property
+    def last_date(self):
+        if self.columns is None:
+            return WeatherDataProvider.last_date.fget(self)
+        return self._last_date
+
+    @property
+    def missing(self):
+        if self.columns is None:
+            return WeatherDataProvider.missing.fget(self)
+        return int(self._ndays - np.count_nonzero(self.valid))
+
+    def export(self):
+        if self.columns is None:
+            return WeatherDataProvider.export(self)
+        weather_data = []
+        for i in np.flatnonzero(self.valid):
+            wdc = self(self._first_date + dt.timedelta(days=int(i)))
+            weather_data.append({key: getattr(wdc, key) for key in wdc.__slots__ if hasattr(wdc, key)})
+        return weather_data
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Cache of parsed input files, validated on the modification time of the file.
+
+Parsing a CABO parameter file with the regular expressions of the
+`CABOFileReader` and compiling a model configuration file for the
+`ConfigurationLoader` is repeated for every model that is started. This module
+keeps the parsed result in serialized form, both in memory and as a file in
+the INPUT_CACHE_DIR of the user, so that a new process does not need to parse
+the input again::
+
+    >>> header, parameters = load_cached(fname, "cabo", parse_cabo)
+
+The cached result is used as long as the modification time and the size of
+the input file are unchanged, otherwise the file is parsed again and the cache
+is updated. As the result is deserialized on each call, callers never share
+mutable objects. When the cache file cannot be written, the input is parsed
+again by the next process.
+"""
+import os
+import pickle
+import hashlib
+import logging
+import tempfile
+from importlib.util import MAGIC_NUMBER
+
+# Serialized results are only valid for the Python version that created them,
+# code objects in particular.
+CACHE_VERSION = (1, MAGIC_NUMBER)
+
+# (kind, absolute file name) -> (stamp, serialized result)
+_memory = {}
+
+
+def _logger():
+    return logging.getLogger("pcse.input_cache")
+
+
+def _stamp(fname):
+    st = os.stat(fname)
+    return st.st_mtime_ns, st.st_size
+
+
+def _cache_fname(kind, fname):
+    # Imported here as the settings module imports pcse.util, which uses this module
+    from .settings import settings
+    key = hashlib.sha1(fname.encode("utf-8")).hexdigest()[:20]
+    return os.path.join(settings.INPUT_CACHE_DIR, "input_%s_%s.pkl" % (kind, key))
+
+
+def _load_from_file(cache_fname, stamp):
+    try:
+        with open(cache_fname, "rb") as fp:
+            version, cached_stamp, data = pickle.load(fp)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        _logger().debug("Failed to load input cache file %s: %s", cache_fname, e)
+        return None
+    if version != CACHE_VERSION or tuple(cached_stamp) != stamp:
+        return None
+    return data
+
+
+def _write_to_file(cache_fname, stamp, data):
+    """Writes the cache file through a temporary file, so that concurrent
+    processes never read a partially written file.
+    """
+    try:
+        os.makedirs(os.path.dirname(cache_fname), exist_ok=True)
+        fd, tmp_fname = tempfile.mkstemp(dir=os.path.dirname(cache_fname), suffix=".tmp")
+        with os.fdopen(fd, "wb") as fp:
+            pickle.dump((CACHE_VERSION, stamp, data), fp, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_fname, cache_fname)
+    except Exception as e:
+        _logger().debug("Failed to write input cache file %s: %s", cache_fname, e)
+
+
+def load_cached(fname, kind, parse, dumps=pickle.dumps, loads=pickle.loads):
+    """Returns the parsed contents of input file `fname`, from the cache if possible.
+
+    :param fname: name of the input file
+    :param kind: short name of the type of input, e.g. 'cabo' or 'conf', used
+        to tell apart different parsers of the same file.
+    :param parse: function called with the absolute file name to parse the
+        file when it is not cached, or has changed.
+    :param dumps: serializes the result of `parse` to bytes, defaults to pickle.
+    :param loads: deserializes the result of `dumps`, defaults to pickle.
+    :return: the result of `parse`, or a copy of it retrieved from the cache.
+
+    Errors raised by `parse` are passed on, nothing is cached in that case.
+    """
+    fname = os.path.abspath(fname)
+    stamp = _stamp(fname)
+    key = (kind, fname)
+
+    cached = _memory.get(key)
+    if cached is not None and cached[0] == stamp:
+        return loads(cached[1])
+
+    cache_fname = _cache_fname(kind, fname)
+    data = _load_from_file(cache_fname, stamp)
+    if data is None:
+        data = dumps(parse(fname))
+        _write_to_file(cache_fname, stamp, data)
+    _memory[key] = (stamp, data)
+    return loads(data)
+
+
+def clear(files=False):
+    """Clears the cache in memory and, if `files=True`, the cache files as well.
+    """
+    _memory.clear()
+    if files:
+        from .settings import settings
+        try:
+            fnames = os.listdir(settings.INPUT_CACHE_DIR)
+        except OSError:
+            return
+        for fname in fnames:
+            if fname.startswith("input_") and fname.endswith((".pkl", ".tmp")):
+                try:
+                    os.remove(os.path.join(settings.INPUT_CACHE_DIR, fname))
+                except OSError:
+                    pass
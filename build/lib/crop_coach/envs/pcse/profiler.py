@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Opt-in profiling of the PCSE Engine.
+
+The `EngineProfiler` records the cumulative wall time and the number of calls
+for each phase (`calc_rates`, `integrate`, `finalize`) of each SimulationObject
+class, for the phases of the Engine itself (driving variables, agromanagement,
+output) and counts the signals sent within the Engine. Profiling is enabled
+with `Engine.enable_profiling()`::
+
+    >>> engine = Engine(parameters, weather, agromanagement, config)
+    >>> profiler = engine.enable_profiling()
+    >>> engine.run_till_terminate()
+    >>> print(profiler.to_json())
+
+The phases are timed by wrapping the bound methods on the instances, nothing is
+wrapped when profiling is disabled. For each phase the total time including
+the time spent in sub-SimulationObjects is given, as well as the time spent in
+the phase itself ('self_time'), excluding the timed phases called from it.
+"""
+import json
+import weakref
+from time import perf_counter
+
+from .pydispatch import dispatcher
+
+# Phases of SimulationObjects that are timed
+SIMOBJ_PHASES = ("calc_rates", "integrate", "finalize")
+
+# Methods of the Engine that are timed, with their names in the profile
+ENGINE_PHASES = (("_run", "run"),
+                 ("integrate", "integrate"),
+                 ("_get_driving_variables", "driving_variables"),
+                 ("_run_agromanager", "agromanager"),
+                 ("calc_rates", "calc_rates"),
+                 ("_save_output", "output"),
+                 ("_finish_cropsimulation", "finish_crop"),
+                 ("_terminate_simulation", "terminate"))
+
+_missing = object()
+
+
+class EngineProfiler(object):
+    """Records wall time and call counts per component and phase of an Engine.
+
+    :param engine: The Engine to profile.
+
+    Normally the profiler is not created directly but by `Engine.enable_profiling()`,
+    which also instruments the crop simulation objects that are created during the
+    simulation.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        # (component, phase) -> [calls, total time, self time]
+        self.records = {}
+        # signal -> [times sent, number of receivers called]
+        self.signals = {}
+        # Time spent in timed phases called from the currently running phases
+        self._stack = [0.]
+        # (weak reference to object, attribute name, original value in the
+        # instance __dict__). Weak references, otherwise a deleted crop would be
+        # kept alive and keep receiving signals.
+        self._wrapped = []
+        self._receiver = None
+
+    def start(self):
+        """Instruments the Engine and its SimulationObjects and starts counting signals.
+        """
+        engine = self.engine
+        for name, phase in ENGINE_PHASES:
+            self._wrap(engine, name, engine.__class__.__name__, phase)
+        for simobj in engine.subSimObjects:
+            self.instrument(simobj)
+
+        signals = self.signals
+        kiosk = engine.kiosk
+
+        def count_signal(signal=None, sender=None, *args, **kwargs):
+            record = signals.setdefault(str(signal), [0, 0])
+            record[0] += 1
+            # Do not count the profiler as receiver
+            record[1] += len(list(dispatcher.getAllReceivers(sender, signal))) - 1
+
+        # The dispatcher keeps a weak reference, the profiler keeps the function alive
+        self._receiver = count_signal
+        dispatcher.connect(count_signal, dispatcher.Any, sender=kiosk)
+
+    def stop(self):
+        """Removes the instrumentation, the recorded profile is kept.
+        """
+        while self._wrapped:
+            ref, name, original = self._wrapped.pop()
+            obj = ref()
+            if obj is None:
+                continue
+            if original is _missing:
+                obj.__dict__.pop(name, None)
+            else:
+                obj.__dict__[name] = original
+        if self._receiver is not None:
+            dispatcher.disconnect(self._receiver, dispatcher.Any, sender=self.engine.kiosk)
+            self._receiver = None
+
+    def instrument(self, simobj):
+        """Times the phases of a SimulationObject and its sub-SimulationObjects.
+
+        :param simobj: The SimulationObject to instrument, e.g. a crop simulation
+            object that has just been started.
+        """
+        component = simobj.__class__.__name__
+        for phase in SIMOBJ_PHASES:
+            self._wrap(simobj, phase, component, phase)
+        for sub in simobj.subSimObjects:
+            self.instrument(sub)
+
+    def _wrap(self, obj, name, component, phase):
+        """Replaces method `name` on instance `obj` by a wrapper recording its time.
+        """
+        # Methods decorated with prepare_rates/prepare_states put their wrapper in
+        # the instance __dict__ on first access, getattr() takes care of this.
+        method = getattr(obj, name)
+        original = obj.__dict__.get(name, _missing)
+        record = self.records.setdefault((component, phase), [0, 0., 0.])
+        stack = self._stack
+
+        def timed(*args, **kwargs):
+            stack.append(0.)
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                children = stack.pop()
+                stack[-1] += elapsed
+                record[0] += 1
+                record[1] += elapsed
+                record[2] += elapsed - children
+
+        obj.__dict__[name] = timed
+        self._wrapped.append((weakref.ref(obj), name, original))
+
+    def reset(self):
+        """Sets all recorded times and counts to zero.
+        """
+        for record in self.records.values():
+            record[:] = [0, 0., 0.]
+        self.signals.clear()
+
+    def as_dict(self):
+        """Returns the profile as a dictionary.
+
+        The 'phases' are sorted by decreasing total time, each with the keys
+        'component', 'phase', 'calls', 'total_time' and 'self_time' (seconds).
+        The 'signals' map the name of each signal onto the number of times it
+        was sent ('sent') and the number of handlers it was delivered to
+        ('receivers').
+        """
+        phases = [{"component": component, "phase": phase, "calls": calls,
+                   "total_time": total, "self_time": self_time}
+                  for (component, phase), (calls, total, self_time) in self.records.items()
+                  if calls > 0]
+        phases.sort(key=lambda r: r["total_time"], reverse=True)
+        signals = {name: {"sent": sent, "receivers": receivers}
+                   for name, (sent, receivers) in self.signals.items()}
+        return {"phases": phases, "signals": signals}
+
+    def to_json(self, fname=None, indent=2):
+        """Returns the profile as a JSON string and optionally writes it to file `fname`.
+        """
+        s = json.dumps(self.as_dict(), indent=indent)
+        if fname is not None:
+            with open(fname, "w") as fp:
+                fp.write(s)
+        return s
+
+    def __str__(self):
+        msg = "%-28s %-18s %8s %10s %10s\n" % ("component", "phase", "calls", "total (s)", "self (s)")
+        for r in self.as_dict()["phases"]:
+            msg += "%-28s %-18s %8i %10.4f %10.4f\n" % (r["component"], r["phase"], r["calls"],
+                                                       r["total_time"], r["self_time"])
+        for name, (sent, receivers) in sorted(self.signals.items()):
+            msg += "signal %-21s sent %8i times to %8i receivers\n" % (name, sent, receivers)
+        return msg
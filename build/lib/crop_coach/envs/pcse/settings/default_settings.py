@@ -32,6 +32,10 @@ PCSE_USER_HOME = _os.path.join(_os.path.dirname(_os.path.abspath(__file__)), "..
 # Location for meteo cache files
 METEO_CACHE_DIR = _os.path.join(PCSE_USER_HOME, "meteo_cache")
 
+# Location for the cache files of parsed parameter and model configuration files,
+# created on first use. The cache is per user, as the files are not shareable.
+INPUT_CACHE_DIR = _os.path.join(_util.get_user_home(), ".pcse", "input_cache")
+
 # Do range checks for meteo variables
 METEO_RANGE_CHECKS = True
 
@@ -39,6 +43,15 @@ METEO_RANGE_CHECKS = True
 # You can disable this behaviour for increased performance.
 ZEROFY = True
 
+# PCSE stores the values of parameters, states and rates in traits, which validate
+# each assignment and update published variables in the VariableKiosk through trait
+# notification. For increased performance the values can be stored in __slots__
+# instead, with the same variables, publishing and lock/unlock behaviour. In this
+# mode only Float values are validated (coerced to float) on assignment. States
+# derived from StatesWithImplicitRatesTemplate are not supported and always use
+# traits, also when FAST_STATES_RATES is enabled.
+FAST_STATES_RATES = False
+
 # Configuration of logging
 # The logging system of PCSE consists of two log handlers. One that sends log messages
 # to the screen ('console') and one that sends message to a file. The location and name of
@@ -14,6 +14,14 @@ from . import test_penmanmonteith
 from . import test_agromanager
 from . import test_wofost_npk
 from . import test_lintul3
+from . import test_engine_snapshot
+from . import test_columnar_weather
+from . import test_engine_output
+from . import test_util
+from . import test_states_rates
+from . import test_engine_profiler
+from . import test_input_cache
+from . import test_engine_schedule
 
 def make_test_suite(dsn=None):
     """Assemble test suite and return it
@@ -27,7 +35,15 @@ def make_test_suite(dsn=None):
                                    test_agromanager.suite(),
                                    test_wofost.suite(dsn),
                                    test_lintul3.suite(),
-                                   test_wofost_npk.suite()])
+                                   test_wofost_npk.suite(),
+                                   test_engine_snapshot.suite(),
+                                   test_columnar_weather.suite(),
+                                   test_engine_output.suite(),
+                                   test_util.suite(),
+                                   test_states_rates.suite(),
+                                   test_engine_profiler.suite(),
+                                   test_input_cache.suite(),
+                                   test_engine_schedule.suite()])
     return allsuites
 
 def test_all(dsn=None):
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for the columnar weather store and the NASA POWER file stand-in.
+"""
+import os
+import json
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from ..settings import settings
+from ..exceptions import WeatherDataProviderError
+from ..fileinput import ColumnarWeatherDataProvider
+from ..db import NASAPowerFileWeatherDataProvider
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider, write_power_json
+
+
+def _wdc_values(wdc):
+    return {key: getattr(wdc, key) for key in wdc.__slots__ if hasattr(wdc, key)}
+
+
+def _generation(path):
+    return ColumnarWeatherDataProvider._read_meta(path)["generation"]
+
+
+class TestColumnarWeatherStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.reference = SyntheticWeatherDataProvider(start=dt.date(2019, 1, 1), end=dt.date(2019, 12, 31))
+        # Remove a day to check the handling of missing data
+        self.missing_day = dt.date(2019, 3, 1)
+        del self.reference.store[(self.missing_day, 0)]
+        self.path = self.reference.to_columnar(os.path.join(self.tmp_dir, "weather"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip(self):
+        wdp = ColumnarWeatherDataProvider(self.path)
+        self.assertEqual(wdp.first_date, self.reference.first_date)
+        self.assertEqual(wdp.last_date, self.reference.last_date)
+        self.assertEqual(wdp.missing, 1)
+        self.assertEqual((wdp.latitude, wdp.longitude, wdp.elevation),
+                         (self.reference.latitude, self.reference.longitude, self.reference.elevation))
+        for (day, _), wdc in self.reference.store.items():
+            self.assertEqual(_wdc_values(wdp(day)), _wdc_values(wdc))
+        self.assertEqual(wdp.export(), self.reference.export())
+        # Other representations of the date are supported as well
+        self.assertIs(wdp("20190501"), wdp(dt.date(2019, 5, 1)))
+
+    def test_missing_and_out_of_range(self):
+        wdp = ColumnarWeatherDataProvider(self.path)
+        for day in (self.missing_day, dt.date(2018, 12, 31), dt.date(2020, 1, 1)):
+            self.assertRaises(WeatherDataProviderError, wdp, day)
+
+    def test_get_range(self):
+        wdp = ColumnarWeatherDataProvider(self.path, mmap_mode=None)
+        start, end = dt.date(2019, 5, 1), dt.date(2019, 5, 31)
+        r = wdp.get_range(start, end)
+        self.assertEqual(len(r["DAY"]), 31)
+        self.assertEqual(r["DAY"][0], np.datetime64(start))
+        self.assertTrue(r["VALID"].all())
+        rain = [self.reference(start + dt.timedelta(days=i)).RAIN for i in range(31)]
+        np.testing.assert_array_equal(r["RAIN"], rain)
+        r = wdp.get_range(dt.date(2019, 2, 28), dt.date(2019, 3, 2))
+        np.testing.assert_array_equal(r["VALID"], [True, False, True])
+        self.assertRaises(WeatherDataProviderError, wdp.get_range, end, start)
+
+    def test_replace_store(self):
+        other = SyntheticWeatherDataProvider(start=dt.date(2019, 1, 1), end=dt.date(2019, 12, 31), seed=2)
+        generation = ColumnarWeatherDataProvider(self.path).generation
+        self.assertEqual(other.to_columnar(self.path), self.path)
+        self.assertEqual(ColumnarWeatherDataProvider(self.path).export(), other.export())
+        # The generation is a hash of the weather data
+        self.assertNotEqual(ColumnarWeatherDataProvider(self.path).generation, generation)
+        self.reference.to_columnar(os.path.join(self.tmp_dir, "copy"))
+        self.assertEqual(ColumnarWeatherDataProvider(os.path.join(self.tmp_dir, "copy")).generation, generation)
+        shutil.rmtree(os.path.join(self.tmp_dir, "copy"))
+        # A failing write leaves the existing store and no temporary directory behind
+        with mock.patch("json.dump", side_effect=IOError("disk full")):
+            self.assertRaises(IOError, self.reference.to_columnar, self.path)
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ["weather"])
+        self.assertEqual(ColumnarWeatherDataProvider(self.path).export(), other.export())
+
+    def test_concurrent_writers(self):
+        # Another writer replacing the store between the move of the arrays and that of meta.json
+        other = SyntheticWeatherDataProvider(start=dt.date(2019, 1, 1), end=dt.date(2019, 12, 31), seed=2)
+        shutil.rmtree(self.path)
+        replace = os.replace
+        writers = [other]
+
+        def race_and_replace(src, dst):
+            if writers:
+                writers.pop().to_columnar(self.path)
+            replace(src, dst)
+
+        with mock.patch("os.replace", side_effect=race_and_replace):
+            self.assertEqual(self.reference.to_columnar(self.path), self.path)
+        # The store of the last writer is kept, the generations of both are complete
+        self.assertEqual(ColumnarWeatherDataProvider(self.path).export(), self.reference.export())
+        self.assertEqual(len(os.listdir(self.path)), 3)
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ["weather"])
+
+    def test_reader_during_replace(self):
+        # A reader which read meta.json just before the store was replaced and its arrays removed
+        other = SyntheticWeatherDataProvider(start=dt.date(2019, 1, 1), end=dt.date(2019, 12, 31), seed=2)
+        old_meta = ColumnarWeatherDataProvider._read_meta(self.path)
+        with mock.patch("crop_coach.envs.pcse.fileinput.columnar_weather.STALE_GENERATION_AGE", -1.):
+            other.to_columnar(self.path)
+        self.assertEqual(sorted(os.listdir(self.path)), sorted(["meta.json", _generation(self.path)]))
+        read_meta = ColumnarWeatherDataProvider._read_meta
+        metas = [old_meta]
+        with mock.patch.object(ColumnarWeatherDataProvider, "_read_meta",
+                               side_effect=lambda path: metas.pop() if metas else read_meta(path)):
+            wdp = ColumnarWeatherDataProvider(self.path)
+        self.assertEqual(wdp.export(), other.export())
+
+    def test_format_version_1(self):
+        # Stores written by older versions hold the arrays next to meta.json
+        generation = ColumnarWeatherDataProvider(self.path).generation
+        for fname in os.listdir(os.path.join(self.path, generation)):
+            os.rename(os.path.join(self.path, generation, fname), os.path.join(self.path, fname))
+        os.rmdir(os.path.join(self.path, generation))
+        meta = ColumnarWeatherDataProvider._read_meta(self.path)
+        meta["format_version"] = 1
+        del meta["generation"]
+        with open(os.path.join(self.path, "meta.json"), "w") as fp:
+            json.dump(meta, fp)
+        wdp = ColumnarWeatherDataProvider(self.path)
+        self.assertIsNone(wdp.generation)
+        self.assertEqual(wdp.export(), self.reference.export())
+        # Rewriting it removes the arrays of version 1
+        self.reference.to_columnar(self.path)
+        self.assertEqual(sorted(os.listdir(self.path)), sorted(["meta.json", generation]))
+
+
+class TestNASAPowerFileWeatherDataProvider(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.meteo_cache_dir = settings.METEO_CACHE_DIR
+        settings.METEO_CACHE_DIR = os.path.join(self.tmp_dir, "meteo_cache")
+
+        # A NASA POWER response for the synthetic weather, in POWER units
+        wdp = SyntheticWeatherDataProvider(start=dt.date(2019, 1, 1), end=dt.date(2019, 12, 31))
+        self.fname = os.path.join(self.tmp_dir, "power_wageningen.json")
+        write_power_json(wdp, self.fname)
+
+    def tearDown(self):
+        settings.METEO_CACHE_DIR = self.meteo_cache_dir
+        shutil.rmtree(self.tmp_dir)
+
+    def runTest(self):
+        wdp = NASAPowerFileWeatherDataProvider(self.fname)
+        self.assertEqual((wdp.latitude, wdp.longitude, wdp.elevation), (51.97, 5.67, 10.))
+        self.assertEqual(wdp.first_date, dt.date(2019, 1, 1))
+        self.assertEqual(wdp.last_date, dt.date(2019, 12, 31))
+        self.assertIsNotNone(wdp.columns)
+        self.assertAlmostEqual(wdp(dt.date(2019, 6, 1)).TMAX, 12. + 10. * np.sin(2 * np.pi * 52 / 365.))
+
+        # Second time the data come from the columnar cache store
+        self.assertTrue(os.path.isdir(wdp.columnar_path))
+        wdp2 = NASAPowerFileWeatherDataProvider(self.fname)
+        self.assertEqual(wdp2.columnar_path, wdp.columnar_path)
+        self.assertEqual(wdp2.export(), wdp.export())
+
+        # A file with the same name in another directory has its own cache store
+        other_dir = os.path.join(self.tmp_dir, "other")
+        os.mkdir(other_dir)
+        other = SyntheticWeatherDataProvider(latitude=33., longitude=9., start=dt.date(2019, 1, 1),
+                                             end=dt.date(2019, 12, 31))
+        write_power_json(other, os.path.join(other_dir, os.path.basename(self.fname)))
+        wdp3 = NASAPowerFileWeatherDataProvider(os.path.join(other_dir, os.path.basename(self.fname)))
+        self.assertNotEqual(wdp3.columnar_path, wdp.columnar_path)
+        self.assertEqual((wdp3.latitude, wdp3.longitude), (33., 9.))
+        self.assertEqual(NASAPowerFileWeatherDataProvider(self.fname).latitude, 51.97)
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestColumnarWeatherStore("test_roundtrip"))
+    suite.addTest(TestColumnarWeatherStore("test_missing_and_out_of_range"))
+    suite.addTest(TestColumnarWeatherStore("test_get_range"))
+    suite.addTest(TestColumnarWeatherStore("test_replace_store"))
+    suite.addTest(TestColumnarWeatherStore("test_concurrent_writers"))
+    suite.addTest(TestNASAPowerFileWeatherDataProvider())
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
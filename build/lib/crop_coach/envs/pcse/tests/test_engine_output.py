@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for the output buffer of the Engine.
+"""
+import os
+import copy
+import datetime as dt
+import unittest
+
+import numpy as np
+
+from ..engine import Engine
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider
+from crop_coach.benchmarks.fixtures import agromanagement, campaign_start, default_data_dir, make_parameters
+
+
+class ReferenceOutputEngine(Engine):
+    """Engine saving output by searching each variable in the hierarchy with get_variable()
+    """
+    def _save_output(self, day):
+        self.flag_output = False
+        states = {"day": day}
+        for var in self.mconf.OUTPUT_VARS:
+            states[var] = self.get_variable(var)
+        self._saved_output.append(states)
+
+    def get_output(self):
+        return self._saved_output
+
+
+class TestEngineOutput(unittest.TestCase):
+
+    def setUp(self):
+        weather = SyntheticWeatherDataProvider()
+        config = os.path.join(default_data_dir, "WLP_NPK.conf")
+        self.engine = Engine(make_parameters(), weather, agromanagement, config)
+        self.engine.run_till_terminate()
+        reference = ReferenceOutputEngine(make_parameters(), weather, agromanagement, config)
+        reference.run_till_terminate()
+        self.reference = reference.get_output()
+
+    def test_output_as_dicts(self):
+        self.assertEqual(self.engine.get_output(), self.reference)
+
+    def test_output_as_array(self):
+        output = self.engine.get_output(as_array=True)
+        self.assertEqual(output.dtype.names, ("day",) + tuple(self.engine.mconf.OUTPUT_VARS))
+        self.assertEqual(len(output), len(self.reference))
+        self.assertTrue(np.shares_memory(output, self.engine._output_buffer))
+        self.assertEqual(output["day"][0], np.datetime64(self.reference[0]["day"]))
+        for var in self.engine.mconf.OUTPUT_VARS:
+            ref = np.array([np.nan if r[var] is None else r[var] for r in self.reference], dtype=np.float64)
+            np.testing.assert_array_equal(output[var], ref, err_msg=var)
+
+    def test_output_successive_crops(self):
+        # The crop of the first campaign is deleted at harvest and a new crop is started
+        # in the second campaign : the index of the output variables follows the new crop
+        second = copy.deepcopy(agromanagement[0][campaign_start])
+        for key in ("crop_start_date", "crop_end_date"):
+            second["CropCalendar"][key] = second["CropCalendar"][key].replace(year=2020)
+        agro = [agromanagement[0], {dt.date(2020, 1, 1): second}]
+        weather = SyntheticWeatherDataProvider()
+        config = os.path.join(default_data_dir, "WLP_NPK.conf")
+        engine = Engine(make_parameters(), weather, agro, config)
+        crops = []
+        while not engine.flag_terminate:
+            engine.run(days=1)
+            if engine.crop is not None and (not crops or crops[-1] is not engine.crop):
+                crops.append(engine.crop)
+            if engine._output_index is not None:
+                self.assertIs(engine._output_index_key[0], engine.crop)
+        self.assertEqual(len(crops), 2)
+        reference = ReferenceOutputEngine(make_parameters(), weather, agro, config)
+        reference.run_till_terminate()
+        self.assertEqual(engine.get_output(), reference.get_output())
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestEngineOutput("test_output_as_dicts"))
+    suite.addTest(TestEngineOutput("test_output_as_array"))
+    suite.addTest(TestEngineOutput("test_output_successive_crops"))
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for the profiling of the Engine.
+"""
+import os
+import json
+import unittest
+
+from ..engine import Engine
+from .. import exceptions as exc
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider
+from crop_coach.benchmarks.fixtures import agromanagement, default_data_dir, make_parameters
+
+
+class TestEngineProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.weather = SyntheticWeatherDataProvider()
+        self.config = os.path.join(default_data_dir, "WLP_NPK.conf")
+        reference = Engine(make_parameters(), self.weather, agromanagement, self.config)
+        reference.run_till_terminate()
+        self.reference = reference.get_output()
+
+    def _records(self, profile):
+        return {(r["component"], r["phase"]): r for r in profile["phases"]}
+
+    def test_profile(self):
+        engine = Engine(make_parameters(), self.weather, agromanagement, self.config)
+        self.assertRaises(exc.PCSEError, engine.get_profile)
+        profiler = engine.enable_profiling()
+        self.assertIs(engine.enable_profiling(), profiler)
+        engine.run_till_terminate()
+        self.assertEqual(engine.get_output(), self.reference)
+
+        profile = engine.get_profile()
+        self.assertEqual(json.loads(engine.get_profile(as_json=True)), profile)
+        records = self._records(profile)
+        n_days = len(self.reference) - 1
+        self.assertEqual(records[("Engine", "run")]["calls"], n_days)
+        self.assertEqual(records[("WaterbalanceFD", "integrate")]["calls"], n_days)
+        for component in ["WofostNPK", "DVS_Phenology", "WOFOST_Leaf_Dynamics_NPK", "NPK_Demand_Uptake"]:
+            self.assertGreater(records[(component, "calc_rates")]["calls"], 0)
+            self.assertGreater(records[(component, "integrate")]["calls"], 0)
+        for r in profile["phases"]:
+            self.assertLessEqual(r["self_time"], r["total_time"])
+        self.assertEqual(profile["signals"]["OUTPUT"]["sent"], n_days)
+        self.assertEqual(profile["signals"]["CROP_START"]["sent"], 1)
+
+        # Profiling stops without changing the profile
+        self.assertIs(engine.disable_profiling(), profiler)
+        self.assertNotIn("integrate", engine.__dict__)
+        self.assertEqual(profiler.as_dict(), profile)
+        self.assertIsNone(engine.disable_profiling())
+
+    def test_snapshot_not_profiled(self):
+        engine = Engine(make_parameters(), self.weather, agromanagement, self.config)
+        profiler = engine.enable_profiling()
+        engine.run(days=100)
+        clone = engine.snapshot()
+        self.assertIsNone(clone._profiler)
+        self.assertNotIn("integrate", clone.__dict__)
+        calls = self._records(profiler.as_dict())[("Engine", "run")]["calls"]
+        clone.run_till_terminate()
+        self.assertEqual(clone.get_output(), self.reference)
+        self.assertEqual(self._records(profiler.as_dict())[("Engine", "run")]["calls"], calls)
+        engine.run_till_terminate()
+        self.assertEqual(engine.get_output(), self.reference)
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestEngineProfiler("test_profile"))
+    suite.addTest(TestEngineProfiler("test_snapshot_not_profiled"))
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
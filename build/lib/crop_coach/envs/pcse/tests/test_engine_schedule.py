@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for Engine.schedule_signal() and
+Engine.get_output_variables().
+"""
+import os
+import copy
+import datetime as dt
+import unittest
+
+from ..engine import Engine
+from .. import signals
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider
+from crop_coach.benchmarks.fixtures import agromanagement, timed_events, default_data_dir, make_parameters
+
+
+class TestEngineSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.weather = SyntheticWeatherDataProvider()
+        self.config = os.path.join(default_data_dir, "WLP_NPK.conf")
+
+    def test_schedule_signal(self):
+        agro = copy.deepcopy(agromanagement)
+        agro[0][dt.date(2019, 1, 1)]["TimedEvents"] = timed_events
+        reference = Engine(make_parameters(), self.weather, agro, self.config)
+        reference.run_till_terminate()
+
+        # The same events, sent as signals while running the engine day by day
+        events = {}
+        for te in timed_events:
+            signal = getattr(signals, te["event_signal"])
+            for event in te["events_table"]:
+                for day, kwargs in event.items():
+                    events.setdefault(day, []).append((signal, kwargs))
+        engine = Engine(make_parameters(), self.weather, agromanagement, self.config)
+        while not engine.flag_terminate:
+            for signal, kwargs in events.get(engine.day + dt.timedelta(days=1), []):
+                engine.schedule_signal(signal, **kwargs)
+            engine.run(days=1)
+        self.assertIsNone(engine._scheduled_signals)
+        self.assertEqual(engine.get_output(), reference.get_output())
+        self.assertEqual(engine.get_summary_output(), reference.get_summary_output())
+
+    def test_get_output_variables(self):
+        engine = Engine(make_parameters(), self.weather, agromanagement, self.config)
+        for days in (0, 100, 50):
+            engine.run(days=days)
+            self.assertEqual(engine.get_output_variables(),
+                             [engine.get_variable(var) for var in engine.mconf.OUTPUT_VARS])
+        self.assertIsNotNone(engine.get_output_variables()[engine.mconf.OUTPUT_VARS.index("TWSO")])
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestEngineSchedule("test_schedule_signal"))
+    suite.addTest(TestEngineSchedule("test_get_output_variables"))
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
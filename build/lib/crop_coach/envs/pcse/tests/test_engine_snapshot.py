@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for Engine.snapshot() and Engine.fork().
+"""
+import os
+import copy
+import datetime as dt
+import unittest
+
+from ..engine import Engine
+from crop_coach.benchmarks.fixtures import (
+    SyntheticWeatherDataProvider, agromanagement, campaign_start, timed_events, default_data_dir, make_parameters
+)
+
+
+class TestEngineSnapshotFork(unittest.TestCase):
+
+    def setUp(self):
+        self.weather = SyntheticWeatherDataProvider()
+        self.config = os.path.join(default_data_dir, "WLP_NPK.conf")
+
+    def _run_fresh(self, agro):
+        engine = Engine(make_parameters(), self.weather, agro, self.config)
+        engine.run_till_terminate()
+        return engine
+
+    def test_snapshot_is_independent(self):
+        reference = self._run_fresh(agromanagement)
+
+        engine = Engine(make_parameters(), self.weather, agromanagement, self.config)
+        engine.run_till(dt.date(2019, 5, 1))
+        clone = engine.snapshot()
+        clone.run_till_terminate()
+        self.assertEqual(clone.get_output(), reference.get_output())
+        # The original engine is not affected by running the snapshot
+        self.assertEqual(engine.day, dt.date(2019, 5, 1))
+        engine.run_till_terminate()
+        self.assertEqual(engine.get_output(), reference.get_output())
+        self.assertEqual(engine.get_summary_output(), reference.get_summary_output())
+
+    def test_fork_matches_fresh_run(self):
+        agro = copy.deepcopy(agromanagement)
+        agro[0][campaign_start]["TimedEvents"] = timed_events
+        reference = self._run_fresh(agro)
+
+        engine = Engine(make_parameters(), self.weather, agromanagement, self.config)
+        engine.run_till(dt.date(2019, 5, 1))
+        forked = engine.fork(timed_events)
+        forked.run_till_terminate()
+        self.assertEqual(forked.get_output(), reference.get_output())
+        self.assertEqual(forked.get_summary_output(), reference.get_summary_output())
+        self.assertEqual(forked.get_terminal_output(), reference.get_terminal_output())
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestEngineSnapshotFork("test_snapshot_is_independent"))
+    suite.addTest(TestEngineSnapshotFork("test_fork_matches_fresh_run"))
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for the cache of parsed input files and the lazy
+import of the database packages.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from ..settings import settings
+from ..fileinput import CABOFileReader
+from ..util import ConfigurationLoader
+from .. import input_cache
+from crop_coach.benchmarks.fixtures import default_data_dir
+
+cabo_contents = """** Test site file
+SSMAX = 0.   ! Maximum surface storage [cm]
+WAV = %s
+CO2 = 360.
+"""
+
+
+class InputCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.input_cache_dir = settings.INPUT_CACHE_DIR
+        settings.INPUT_CACHE_DIR = os.path.join(self.tmp_dir, "cache")
+        input_cache.clear()
+
+    def tearDown(self):
+        settings.INPUT_CACHE_DIR = self.input_cache_dir
+        input_cache.clear()
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, fname, contents, mtime):
+        with open(fname, "w") as fp:
+            fp.write(contents)
+        os.utime(fname, (mtime, mtime))
+
+
+class TestInputCache(InputCacheTestCase):
+
+    def test_cabo(self):
+        fname = os.path.join(self.tmp_dir, "site.cab")
+        self._write(fname, cabo_contents % "50", 1e9)
+        params = CABOFileReader(fname)
+        self.assertEqual(params, {"SSMAX": 0., "WAV": 50, "CO2": 360.})
+        self.assertEqual(params.header, ["** Test site file"])
+        self.assertEqual(len(os.listdir(settings.INPUT_CACHE_DIR)), 1)
+
+        # Results are copies
+        params["WAV"] = 10
+        self.assertEqual(CABOFileReader(fname)["WAV"], 50)
+
+        # A changed file is parsed again
+        self._write(fname, cabo_contents % "60", 1e9 + 1)
+        self.assertEqual(CABOFileReader(fname)["WAV"], 60)
+
+        # Same results as without cache for the default data
+        for name in ["crop.cab", "soil.cab", "site.cab"]:
+            fname = os.path.join(default_data_dir, name)
+            reader = CABOFileReader(fname)
+            header, parameters = reader._parse_file(fname)
+            self.assertEqual(reader, parameters)
+            self.assertEqual(reader.header, header)
+
+    def test_cache_files(self):
+        calls = []
+
+        def parse(fname):
+            calls.append(fname)
+            with open(fname) as fp:
+                return fp.read()
+
+        fname = os.path.join(self.tmp_dir, "input.txt")
+        self._write(fname, "first", 1e9)
+        self.assertEqual(input_cache.load_cached(fname, "text", parse), "first")
+        self.assertEqual(input_cache.load_cached(fname, "text", parse), "first")
+        self.assertEqual(len(calls), 1)
+
+        # A new process reads the cache file
+        input_cache.clear()
+        self.assertEqual(input_cache.load_cached(fname, "text", parse), "first")
+        self.assertEqual(len(calls), 1)
+
+        # Modification time and size are checked
+        self._write(fname, "second", 1e9)
+        self.assertEqual(input_cache.load_cached(fname, "text", parse), "second")
+        self._write(fname, "thirds", 1e9 + 1)
+        input_cache.clear()
+        self.assertEqual(input_cache.load_cached(fname, "text", parse), "thirds")
+        self.assertEqual(len(calls), 3)
+
+        input_cache.clear(files=True)
+        self.assertEqual(os.listdir(settings.INPUT_CACHE_DIR), [])
+
+    def test_unwritable_cache(self):
+        # The cache directory cannot be created below a file: the input is parsed every time
+        fname = os.path.join(self.tmp_dir, "input.txt")
+        self._write(fname, "first", 1e9)
+        settings.INPUT_CACHE_DIR = os.path.join(fname, "cache")
+        calls = []
+
+        def parse(fname):
+            calls.append(fname)
+            return "parsed"
+
+        for _ in range(2):
+            input_cache.clear()
+            self.assertEqual(input_cache.load_cached(fname, "text", parse), "parsed")
+        self.assertEqual(len(calls), 2)
+        input_cache.clear(files=True)
+
+    def test_configuration(self):
+        fname = os.path.join(self.tmp_dir, "test.conf")
+        with open(os.path.join(default_data_dir, "WLP_NPK.conf")) as fp:
+            contents = fp.read()
+        self._write(fname, contents, 1e9)
+        config = ConfigurationLoader(fname)
+        self.assertEqual(len(config.defined_attr), len(set(config.defined_attr)))
+
+        self._write(fname, contents + "\nOUTPUT_VARS = ['DVS']\n", 1e9 + 1)
+        input_cache.clear()
+        config2 = ConfigurationLoader(fname)
+        self.assertEqual(config2.OUTPUT_VARS, ["DVS"])
+        self.assertNotEqual(config.OUTPUT_VARS, config2.OUTPUT_VARS)
+        self.assertEqual(config2.defined_attr, config.defined_attr)
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def runTest(self):
+        code = ("import sys\n"
+                "from crop_coach.envs.pcse import db\n"
+                "print(sorted(m for m in ['sqlalchemy', 'pandas', 'crop_coach.envs.pcse.tests',\n"
+                "                         'crop_coach.envs.pcse.db.pcse', 'crop_coach.envs.pcse.db.cgms14']\n"
+                "             if m in sys.modules))\n"
+                "print(db.cgms14.__name__)\n")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+        output = subprocess.check_output([sys.executable, "-c", code], env=env, universal_newlines=True)
+        lines = output.splitlines()
+        # The last lines, pcse may print a message about the demo database first
+        self.assertTrue(lines[-2].endswith("[]"), lines[-2])
+        self.assertEqual(lines[-1], "crop_coach.envs.pcse.db.cgms14")
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestInputCache("test_cabo"))
+    suite.addTest(TestInputCache("test_cache_files"))
+    suite.addTest(TestInputCache("test_configuration"))
+    suite.addTest(TestLazyImports())
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for the slots-based (fast mode) states, rates and
+parameters, comparing with the traitlets-based ones.
+"""
+import os
+import copy
+import unittest
+from datetime import date
+
+import numpy as np
+
+from ..engine import Engine
+from ..settings import settings
+from ..traitlets import Float, Int, Bool, Instance
+from ..util import Afgen, AfgenTrait
+from .. import exceptions as exc
+from ..base import VariableKiosk, StatesTemplate, RatesTemplate, ParamTemplate
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider
+from crop_coach.benchmarks.fixtures import agromanagement, default_data_dir, make_parameters
+
+
+class Parameters(ParamTemplate):
+    A = Float()
+    B = Int()
+    C = AfgenTrait()
+
+
+class StateVariables(StatesTemplate):
+    SA = Float()
+    SB = Int()
+    SC = Instance(date)
+
+
+class RateVariables(RatesTemplate):
+    RA = Float()
+    RB = Bool()
+
+
+class FastModeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.fast_states_rates = settings.FAST_STATES_RATES
+        settings.FAST_STATES_RATES = True
+
+    def tearDown(self):
+        settings.FAST_STATES_RATES = self.fast_states_rates
+
+
+class TestFastContainers(FastModeTestCase):
+
+    def test_params(self):
+        params = Parameters({"A": 1, "B": 2, "C": [0., 0., 1., 1.]})
+        self.assertIsInstance(params, Parameters)
+        self.assertNotIn("A", params.__dict__)
+        self.assertEqual(params.A, 1.)
+        self.assertIs(type(params.A), float)
+        self.assertIsInstance(params.C, Afgen)
+        self.assertEqual(params.C(0.5), 0.5)
+        params.C = [0., 1., 1., 1.]
+        self.assertIsInstance(params.C, Afgen)
+        self.assertRaises(AttributeError, setattr, params, "D", 1.)
+        self.assertRaises(exc.ParameterError, Parameters, {"A": 1, "B": 2})
+
+    def test_states(self):
+        kiosk = VariableKiosk()
+        states = StateVariables(kiosk, publish=["SA", "SC"], SA=1, SB=2, SC=date(2000, 1, 1))
+        self.assertIsInstance(states, StateVariables)
+        self.assertIs(type(states.SA), float)
+        self.assertEqual(kiosk["SA"], 1.)
+        self.assertEqual(kiosk["SC"], date(2000, 1, 1))
+        self.assertNotIn("SB", kiosk)
+        self.assertIn("SB", kiosk.registered_states)
+        self.assertTrue(states._locked)
+        states.unlock()
+        self.assertFalse(states._locked)
+        states.SA = np.float64(2.5)
+        self.assertIs(type(states.SA), float)
+        self.assertEqual(kiosk["SA"], 2.5)
+        states.lock()
+        kiosk.flush_states()
+        self.assertNotIn("SA", kiosk)
+        states.touch()
+        self.assertEqual(kiosk["SA"], 2.5)
+        self.assertRaises(exc.PCSEError, StateVariables, VariableKiosk(), SA=1., SB=2)
+        self.assertRaises(exc.PCSEError, StateVariables, VariableKiosk(), publish="XX",
+                          SA=1., SB=2, SC=None)
+        # A second object can not register the same variables
+        self.assertRaises(exc.VariableKioskError, StateVariables, kiosk, SA=1., SB=2, SC=None)
+        states._delete()
+        self.assertFalse(kiosk.variable_exists("SA"))
+
+    def test_rates(self):
+        kiosk = VariableKiosk()
+        rates = RateVariables(kiosk, publish="RA")
+        self.assertEqual((rates.RA, rates.RB), (0., False))
+        # Zerofy does not publish, as with traits
+        self.assertNotIn("RA", kiosk)
+        rates.RA = 3
+        rates.RB = True
+        self.assertEqual(kiosk["RA"], 3.)
+        rates.zerofy()
+        self.assertEqual((rates.RA, rates.RB), (0., False))
+        self.assertEqual(kiosk["RA"], 3.)
+
+    def test_deepcopy(self):
+        kiosk = VariableKiosk()
+        states = StateVariables(kiosk, publish="SA", SA=1., SB=2, SC=None)
+        memo = {}
+        kiosk2 = copy.deepcopy(kiosk, memo)
+        states2 = copy.deepcopy(states, memo)
+        kiosk2.remap_owners(memo)
+        self.assertIs(type(states2), type(states))
+        self.assertIs(states2._kiosk, kiosk2)
+        self.assertEqual((states2.SA, states2.SB, states2.SC), (1., 2, None))
+        states2.SA = 5.
+        self.assertEqual(kiosk2["SA"], 5.)
+        self.assertEqual(kiosk["SA"], 1.)
+
+
+class TestFastModeSeason(unittest.TestCase):
+
+    def _run(self, fast):
+        fast_states_rates = settings.FAST_STATES_RATES
+        settings.FAST_STATES_RATES = fast
+        try:
+            engine = Engine(make_parameters(), SyntheticWeatherDataProvider(), agromanagement,
+                            os.path.join(default_data_dir, "WLP_NPK.conf"))
+            engine.run_till_terminate()
+        finally:
+            settings.FAST_STATES_RATES = fast_states_rates
+        return engine
+
+    def runTest(self):
+        reference = self._run(False)
+        engine = self._run(True)
+        self.assertIsNot(type(engine.soil.states), type(reference.soil.states))
+        self.assertEqual(engine.get_output(), reference.get_output())
+        self.assertEqual(engine.get_summary_output(), reference.get_summary_output())
+        self.assertEqual(engine.get_terminal_output(), reference.get_terminal_output())
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestFastContainers("test_params"))
+    suite.addTest(TestFastContainers("test_states"))
+    suite.addTest(TestFastContainers("test_rates"))
+    suite.addTest(TestFastContainers("test_deepcopy"))
+    suite.addTest(TestFastModeSeason())
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
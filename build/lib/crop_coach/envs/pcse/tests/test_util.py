@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for the Afgen, astro and daylength utilities,
+comparing with the reference implementations.
+"""
+import random
+import datetime as dt
+import unittest
+
+import numpy as np
+
+from .. import util
+from ..util import Afgen, astro, daylength
+from crop_coach.benchmarks.reference_util import ReferenceAfgen, reference_astro, reference_daylength
+
+tables = [[0, 0, 1, 1, 5, 10],
+          [-10., 0., 0., 0.5, 10., 1., 20., 0.8, 30., 0.],
+          [0.0, 0.3, 1.0, 0.3, 2.0, 0.0],
+          # trailing (0, 0) pairs as coming from a CGMS database
+          [0., 1., 0.5, 2., 1., 3., 0., 0., 0., 0.],
+          [5., 2.]]
+
+
+class TestAfgen(unittest.TestCase):
+
+    def runTest(self):
+        rng = random.Random(0)
+        for tbl_xy in tables:
+            f, ref = Afgen(tbl_xy), ReferenceAfgen(tbl_xy)
+            x_knots = ref.x_list
+            x = [rng.uniform(x_knots[0] - 5., x_knots[-1] + 5.) for _ in range(1000)] + \
+                x_knots + [x_knots[0] - 1., x_knots[-1] + 1.]
+            for v in x:
+                self.assertEqual(f(v), ref(v))
+            batched = f(np.array(x))
+            self.assertIsInstance(batched, np.ndarray)
+            np.testing.assert_array_equal(batched, [ref(v) for v in x])
+            # Multi-dimensional arrays keep their shape
+            np.testing.assert_array_equal(f(np.array(x[:1000]).reshape(-1, 4)),
+                                          batched[:1000].reshape(-1, 4))
+
+
+class TestAstroDaylength(unittest.TestCase):
+
+    def runTest(self):
+        rng = random.Random(0)
+        # Include a leap year and polar latitudes with 0 and 24 hour days
+        days = [dt.date(2020, 1, 1) + dt.timedelta(days=i) for i in range(366)]
+        for latitude in [-89.5, -66.6, -23.4, 0., 5.2, 51.97, 66.6, 70., 89.5, 90.]:
+            for day in days:
+                radiation = rng.uniform(0., 30e6)
+                self.assertEqual(astro(day, latitude, radiation),
+                                 reference_astro(day, latitude, radiation))
+                self.assertEqual(daylength(day, latitude), reference_daylength(day, latitude))
+                self.assertEqual(daylength(day, latitude, -6), reference_daylength(day, latitude, -6))
+        self.assertRaises(RuntimeError, astro, days[0], 91., 1e6)
+        self.assertRaises(RuntimeError, daylength, days[0], -91.)
+
+        # The tables are kept for a bounded number of latitudes
+        for i in range(2 * util.ASTRO_TABLES_MAXSIZE):
+            astro(days[0], i / 10., 1e6)
+        self.assertLessEqual(util._astro_rows.cache_info().currsize, util.ASTRO_TABLES_MAXSIZE)
+        table = util.astro_table(51.97)
+        self.assertEqual(table.DAYL.shape, (366,))
+        self.assertEqual(table.DAYL[31], astro(dt.date(2019, 2, 1), 51.97, 1e6).DAYL)
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestAfgen())
+    suite.addTest(TestAstroDaylength())
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
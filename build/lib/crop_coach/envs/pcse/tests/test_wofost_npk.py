@@ -9,6 +9,7 @@ import csv
 import yaml
 
 from ..engine import Engine
+from ..settings import settings
 from ..base import ParameterProvider
 from ..fileinput import CABOFileReader, CABOWeatherDataProvider
 
@@ -63,11 +64,28 @@ class TestWOFOSTNPK_WinterWheat(unittest.TestCase):
         self.assertEqual(ntests, 216, msg)
 
 
+@unittest.skipUnless(all(os.path.exists(os.path.join(test_data_dir, fname))
+                         for fname in ("wofost_npk.agro", "wofost_npk_reference_results.csv")),
+                     "Input and reference data of WOFOST NPK not available, the equality "
+                     "of both modes is tested in test_states_rates.")
+class TestWOFOSTNPK_WinterWheat_FastStatesRates(TestWOFOSTNPK_WinterWheat):
+    """Same test with the slots-based states, rates and parameters.
+    """
+
+    def setUp(self):
+        fast_states_rates = settings.FAST_STATES_RATES
+        settings.FAST_STATES_RATES = True
+        try:
+            TestWOFOSTNPK_WinterWheat.setUp(self)
+        finally:
+            settings.FAST_STATES_RATES = fast_states_rates
+
 
 def suite():
     """ This defines all the tests of a module"""
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(TestWOFOSTNPK_WinterWheat))
+    suite.addTest(unittest.makeSuite(TestWOFOSTNPK_WinterWheat_FastStatesRates))
     return suite
 
 if __name__ == '__main__':
@@ -12,13 +12,18 @@ import logging
 from math import log10, cos, sin, asin, sqrt, exp, pi, radians
 from collections import namedtuple
 from bisect import bisect_left
+from functools import lru_cache
 import textwrap
+import marshal
 import sqlite3
 from collections.abc import Iterable
 
+import numpy as np
+
 # from . import exceptions as exc
 import crop_coach.envs.pcse.exceptions as exc
 from .traitlets import TraitType
+from .input_cache import load_cached
 
 Celsius2Kelvin = lambda x: x + 273.16
 hPa2kPa = lambda x: x/10.
@@ -403,7 +408,7 @@ def doy(day):
     """
     # Check if day is a date or datetime object
     if isinstance(day, (datetime.date, datetime.datetime)):
-        return day.timetuple().tm_yday
+        return day.toordinal() - datetime.date(day.year, 1, 1).toordinal() + 1
     else:
         msg = "Parameter day is not a date or datetime object."
         raise RuntimeError(msg)
@@ -424,7 +429,67 @@ def limit(min, max, v):
         return max
 
 
-def daylength(day, latitude, angle=-4, _cache={}):
+# Number of latitudes (and angles) for which the daylength and astro tables
+# are kept, the least recently used tables are discarded. Like the number of
+# recent (day, latitude, radiation) results kept by astro(), these are the
+# fixed sizes of the caches created when this module is imported, they are
+# not settings: changing them afterwards has no effect.
+ASTRO_TABLES_MAXSIZE = 64
+ASTRO_RESULTS_MAXSIZE = 4096
+
+AstroResults = namedtuple("AstroResults", "DAYL, DAYLP, SINLD, COSLD, DIFPP, "
+                                          "ATMTR, DSINBE, ANGOT")
+AstroTable = namedtuple("AstroTable", "DAYL, DAYLP, SINLD, COSLD, DSINBE, ANGOT, SC")
+
+
+@lru_cache(maxsize=ASTRO_TABLES_MAXSIZE)
+def _daylength_rows(latitude, angle):
+    """Returns the daylength for day-of-year 1 to 366 at given latitude and
+    angle as a list of floats for fast scalar lookups.
+    """
+    # constants
+    RAD = radians(1.)
+
+    # calculate daylength
+    ANGLE = angle
+    LAT = latitude
+    rows = []
+    for IDAY in range(1, 367):
+        DEC = -asin(sin(23.45*RAD)*cos(2.*pi*(float(IDAY)+10.)/365.))
+        SINLD = sin(RAD*LAT)*sin(DEC)
+        COSLD = cos(RAD*LAT)*cos(DEC)
+        AOB = (-sin(ANGLE*RAD)+SINLD)/COSLD
+
+        # daylength
+        if abs(AOB) <= 1.0:
+            DAYLP = 12.0*(1.+2.*asin((-sin(ANGLE*RAD)+SINLD)/COSLD)/pi)
+        elif AOB > 1.0:
+            DAYLP = 24.0
+        else:
+            DAYLP =  0.0
+        rows.append(DAYLP)
+    return rows
+
+
+@lru_cache(maxsize=ASTRO_TABLES_MAXSIZE)
+def daylength_table(latitude, angle=-4):
+    """Returns the daylength for day-of-year 1 to 366 at given latitude and angle.
+
+    :param latitude:    latitude of location
+    :param angle:       The photoperiodic daylength starts/ends when the sun
+        is `angle` degrees under the horizon. Default is -4 degrees.
+    :return: read-only array with the daylength (h) where index 0 is for
+        day-of-year 1.
+
+    The table does not depend on the year, so a single table serves all years
+    at a location. The last `ASTRO_TABLES_MAXSIZE` tables are kept.
+    """
+    table = np.array(_daylength_rows(latitude, angle), dtype=np.float64)
+    table.flags.writeable = False
+    return table
+
+
+def daylength(day, latitude, angle=-4):
     """Calculates the daylength for a given day, altitude and base.
 
     :param day:         date/datetime object
@@ -433,7 +498,9 @@ def daylength(day, latitude, angle=-4, _cache={}):
         is `angle` degrees under the horizon. Default is -4 degrees.
 
     Derived from the WOFOST routine ASTRO.FOR and simplified to include only
-    daylength calculation. Results are being cached for performance
+    daylength calculation. The daylength is looked up in a table for the
+    location which is computed on first use, see `daylength_table()`. The
+    last `ASTRO_TABLES_MAXSIZE` tables are kept.
     """
     #from unum.units import h
 
@@ -445,40 +512,89 @@ def daylength(day, latitude, angle=-4, _cache={}):
     # Calculate day-of-year from date object day
     IDAY = doy(day)
 
-    # Test if daylength for given (day, latitude, angle) was already calculated
-    # in a previous run. If not (e.g. KeyError) calculate the daylength, store
-    # in cache and return the value.
-    try:
-        return _cache[(IDAY, latitude, angle)]
-    except KeyError:
-        pass
+    return _daylength_rows(latitude, angle)[IDAY-1]
+
 
+@lru_cache(maxsize=ASTRO_TABLES_MAXSIZE)
+def _astro_rows(latitude):
+    """Returns the radiation independent results of `astro()` for day-of-year 1
+    to 366 at given latitude, as a list of tuples (DAYL, DAYLP, SINLD, COSLD,
+    DSINBE, ANGOT, SC) for fast scalar lookups.
+    """
     # constants
     RAD = radians(1.)
-
-    # calculate daylength
-    ANGLE = angle
+    ANGLE = -4.
     LAT = latitude
-    DEC = -asin(sin(23.45*RAD)*cos(2.*pi*(float(IDAY)+10.)/365.))
-    SINLD = sin(RAD*LAT)*sin(DEC)
-    COSLD = cos(RAD*LAT)*cos(DEC)
-    AOB = (-sin(ANGLE*RAD)+SINLD)/COSLD
-
-    # daylength
-    if abs(AOB) <= 1.0:
-        DAYLP = 12.0*(1.+2.*asin((-sin(ANGLE*RAD)+SINLD)/COSLD)/pi)
-    elif AOB > 1.0:
-        DAYLP = 24.0
-    else:
-        DAYLP =  0.0
 
-    # store results in cache
-    _cache[(IDAY, latitude, angle)] = DAYLP
+    rows = []
+    for IDAY in range(1, 367):
+        # Declination and solar constant for this day
+        DEC = -asin(sin(23.45*RAD)*cos(2.*pi*(float(IDAY)+10.)/365.))
+        SC  = 1370.*(1.+0.033*cos(2.*pi*float(IDAY)/365.))
+
+        # calculation of daylength from intermediate variables
+        # SINLD, COSLD and AOB
+        SINLD = sin(RAD*LAT)*sin(DEC)
+        COSLD = cos(RAD*LAT)*cos(DEC)
+        AOB = SINLD/COSLD
+
+        # For very high latitudes and days in summer and winter a limit is
+        # inserted to avoid math errors when daylength reaches 24 hours in
+        # summer or 0 hours in winter.
+
+        # Calculate solution for base=0 degrees
+        if abs(AOB) <= 1.0:
+            DAYL  = 12.0*(1.+2.*asin(AOB)/pi)
+            # integrals of sine of solar height
+            DSINB  = 3600.*(DAYL*SINLD+24.*COSLD*sqrt(1.-AOB**2)/pi)
+            DSINBE = 3600.*(DAYL*(SINLD+0.4*(SINLD**2+COSLD**2*0.5))+
+                     12.*COSLD*(2.+3.*0.4*SINLD)*sqrt(1.-AOB**2)/pi)
+        else:
+            if AOB >  1.0: DAYL = 24.0
+            if AOB < -1.0: DAYL = 0.0
+            # integrals of sine of solar height
+            DSINB = 3600.*(DAYL*SINLD)
+            DSINBE = 3600.*(DAYL*(SINLD+0.4*(SINLD**2+COSLD**2*0.5)))
 
-    return DAYLP
+        # Calculate solution for base=-4 (ANGLE) degrees
+        AOB_CORR = (-sin(ANGLE*RAD)+SINLD)/COSLD
+        if abs(AOB_CORR) <= 1.0:
+            DAYLP = 12.0*(1.+2.*asin(AOB_CORR)/pi)
+        elif AOB_CORR > 1.0:
+            DAYLP = 24.0
+        elif AOB_CORR < -1.0:
+            DAYLP = 0.0
 
+        # extraterrestrial radiation
+        ANGOT = SC*DSINB
+        rows.append((DAYL, DAYLP, SINLD, COSLD, DSINBE, ANGOT, SC))
 
-def astro(day, latitude, radiation, _cache={}):
+    return rows
+
+
+@lru_cache(maxsize=ASTRO_TABLES_MAXSIZE)
+def astro_table(latitude):
+    """Returns the radiation independent results of `astro()` for day-of-year 1
+    to 366 at given latitude.
+
+    :param latitude:    latitude of location
+    :return: a namedtuple of read-only arrays (index 0 is for day-of-year 1)
+        with fields DAYL, DAYLP, SINLD, COSLD, DSINBE, ANGOT and SC (solar
+        constant).
+
+    The table does not depend on the year, so a single table serves all years
+    at a location. The last `ASTRO_TABLES_MAXSIZE` tables are kept.
+    """
+    columns = []
+    for column in zip(*_astro_rows(latitude)):
+        column = np.array(column, dtype=np.float64)
+        column.flags.writeable = False
+        columns.append(column)
+    return AstroTable(*columns)
+
+
+@lru_cache(maxsize=ASTRO_RESULTS_MAXSIZE)
+def astro(day, latitude, radiation):
     """python version of ASTRO routine by Daniel van Kraalingen.
 
     This subroutine calculates astronomic daylength, diurnal radiation
@@ -500,6 +616,10 @@ def astro(day, latitude, radiation, _cache={}):
         DSINBE    Daily total of effective solar height         s
         ANGOT     Angot radiation at top of atmosphere       J m-2 d-1
 
+    The radiation independent results are looked up in a table for the
+    location which is computed on first use, see `astro_table()`. The last
+    `ASTRO_TABLES_MAXSIZE` tables and `ASTRO_RESULTS_MAXSIZE` results are kept.
+
     Authors: Daniel van Kraalingen
     Date   : April 1991
 
@@ -512,7 +632,6 @@ def astro(day, latitude, radiation, _cache={}):
     if abs(latitude) > 90.:
         msg = "Latitude not between -90 and 90"
         raise RuntimeError(msg)
-    LAT = latitude
 
     # Determine day-of-year (IDAY) from day
     IDAY = doy(day)
@@ -520,57 +639,9 @@ def astro(day, latitude, radiation, _cache={}):
     # reassign radiation
     AVRAD = radiation
 
-    # Test if variables for given (day, latitude, radiation) were already calculated
-    # in a previous run. If not (e.g. KeyError) calculate the variables, store
-    # in cache and return the value.
-    try:
-        return _cache[(IDAY, LAT, AVRAD)]
-    except KeyError:
-        pass
-
-    # constants
-    RAD = radians(1.)
-    ANGLE = -4.
+    DAYL, DAYLP, SINLD, COSLD, DSINBE, ANGOT, SC = _astro_rows(latitude)[IDAY-1]
 
-    # Declination and solar constant for this day
-    DEC = -asin(sin(23.45*RAD)*cos(2.*pi*(float(IDAY)+10.)/365.))
-    SC  = 1370.*(1.+0.033*cos(2.*pi*float(IDAY)/365.))
-
-    # calculation of daylength from intermediate variables
-    # SINLD, COSLD and AOB
-    SINLD = sin(RAD*LAT)*sin(DEC)
-    COSLD = cos(RAD*LAT)*cos(DEC)
-    AOB = SINLD/COSLD
-
-    # For very high latitudes and days in summer and winter a limit is
-    # inserted to avoid math errors when daylength reaches 24 hours in
-    # summer or 0 hours in winter.
-
-    # Calculate solution for base=0 degrees
-    if abs(AOB) <= 1.0:
-        DAYL  = 12.0*(1.+2.*asin(AOB)/pi)
-        # integrals of sine of solar height
-        DSINB  = 3600.*(DAYL*SINLD+24.*COSLD*sqrt(1.-AOB**2)/pi)
-        DSINBE = 3600.*(DAYL*(SINLD+0.4*(SINLD**2+COSLD**2*0.5))+
-                 12.*COSLD*(2.+3.*0.4*SINLD)*sqrt(1.-AOB**2)/pi)
-    else:
-        if AOB >  1.0: DAYL = 24.0
-        if AOB < -1.0: DAYL = 0.0
-        # integrals of sine of solar height
-        DSINB = 3600.*(DAYL*SINLD)
-        DSINBE = 3600.*(DAYL*(SINLD+0.4*(SINLD**2+COSLD**2*0.5)))
-
-    # Calculate solution for base=-4 (ANGLE) degrees
-    AOB_CORR = (-sin(ANGLE*RAD)+SINLD)/COSLD
-    if abs(AOB_CORR) <= 1.0:
-        DAYLP = 12.0*(1.+2.*asin(AOB_CORR)/pi)
-    elif AOB_CORR > 1.0:
-        DAYLP = 24.0
-    elif AOB_CORR < -1.0:
-        DAYLP = 0.0
-
-    # extraterrestrial radiation and atmospheric transmission
-    ANGOT = SC*DSINB
+    # atmospheric transmission
     # Check for DAYL=0 as in that case the angot radiation is 0 as well
     if DAYL > 0.0:
         ATMTR = AVRAD/ANGOT
@@ -589,13 +660,7 @@ def astro(day, latitude, radiation, _cache={}):
 
     DIFPP = FRDIF*ATMTR*0.5*SC
 
-    # Pack return values in namedtuple, add to cache and return
-    astro_nt = namedtuple("AstroResults","DAYL, DAYLP, SINLD, COSLD, DIFPP, "
-                                         "ATMTR, DSINBE, ANGOT")
-    retvalue = astro_nt(DAYL, DAYLP, SINLD, COSLD, DIFPP, ATMTR, DSINBE, ANGOT)
-    _cache[(IDAY, LAT, AVRAD)] = retvalue
-
-    return retvalue
+    return AstroResults._make((DAYL, DAYLP, SINLD, COSLD, DIFPP, ATMTR, DSINBE, ANGOT))
 
 
 class Afgen(object):
@@ -608,7 +673,9 @@ class Afgen(object):
         defaults to None if Unum is not used.
 
     Returns the interpolated value provided with the
-    absicca value at which the interpolation should take place.
+    absicca value at which the interpolation should take place. When called
+    with a numpy array, all values are interpolated at once and an array
+    is returned.
 
     example::
 
@@ -624,6 +691,8 @@ class Afgen(object):
         10.0
         >>> f(-1)
         0.0
+        >>> f(np.array([0.5, 1.5, 6]))
+        array([ 0.5  ,  2.125, 10.   ])
     """
 
     def _check_x_ascending(self, tbl_xy):
@@ -671,12 +740,22 @@ class Afgen(object):
         intervals = list(zip(x_list, x_list[1:], y_list, y_list[1:]))
         self.slopes = [(y2 - y1)/(x2 - x1) for x1, x2, y1, y2 in intervals]
 
+        # bounds for the scalar path and arrays for the batched path
+        self.x_min, self.x_max = x_list[0], x_list[-1]
+        self.y_first, self.y_last = y_list[0], y_list[-1]
+        self.x_array = np.array(x_list)
+        self.y_array = np.array(y_list)
+        self.slopes_array = np.array(self.slopes)
+
     def __call__(self, x):
 
-        if x <= self.x_list[0]:
-            return self.y_list[0]
-        if x >= self.x_list[-1]:
-            return self.y_list[-1]
+        if isinstance(x, np.ndarray):
+            return self._interpolate_array(x)
+
+        if x <= self.x_min:
+            return self.y_first
+        if x >= self.x_max:
+            return self.y_last
 
         i = bisect_left(self.x_list, x) - 1
         v = self.y_list[i] + self.slopes[i] * (x - self.x_list[i])
@@ -687,6 +766,26 @@ class Afgen(object):
 
         return v
 
+    def _interpolate_array(self, x):
+        """Interpolates all values of array `x` at once, the results are equal
+        to calling the Afgen with each value of `x` separately.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if len(self.slopes) == 0:
+            return np.full(x.shape, self.y_first)
+
+        i = np.searchsorted(self.x_array, x, side="left") - 1
+        np.clip(i, 0, len(self.slopes) - 1, out=i)
+        v = self.y_array[i] + self.slopes_array[i] * (x - self.x_array[i])
+
+        # if a unum unit is defined, multiply with a unit
+        if self.unit is not None:
+            v = v * self.unit
+
+        v = np.where(x <= self.x_min, self.y_first, v)
+        v = np.where(x >= self.x_max, self.y_last, v)
+        return v
+
 
 class AfgenTrait(TraitType):
     """An AFGEN table trait"""
@@ -725,6 +824,13 @@ def merge_dict(d1, d2, overwrite=False):
     return td
 
 
+def _compile_config(fname):
+    """Compiles the configuration file `fname` into a code object.
+    """
+    with open(fname) as fp:
+        return compile(fp.read(), fname, 'exec')
+
+
 class ConfigurationLoader(object):
     """Class for loading the model configuration from a PCSE configuration files
 
@@ -765,7 +871,8 @@ class ConfigurationLoader(object):
         # Load file using execfile
         try:
             loc = {}
-            bytecode = compile(open(model_config_file).read(), model_config_file, 'exec')
+            bytecode = load_cached(model_config_file, "conf", _compile_config,
+                                   dumps=marshal.dumps, loads=marshal.loads)
             exec(bytecode, {}, loc)
         except Exception as e:
             msg = "Failed to load configuration from file '%s' due to: %s"
@@ -781,6 +888,7 @@ class ConfigurationLoader(object):
                     self.description += "\n"
 
         # Loop through the attributes in the configuration file
+        self.defined_attr = []
         for key, value in list(loc.items()):
             if key.isupper():
                 self.defined_attr.append(key)
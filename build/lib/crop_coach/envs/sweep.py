@@ -0,0 +1,403 @@
+# -- Importing dependencies :
+import os
+import json
+import itertools
+import multiprocessing
+import tempfile
+from typing import List, Tuple, Dict, Optional, Sequence
+
+import numpy as np
+
+from crop_coach.envs.models import Wofost
+from crop_coach.envs.actions import AgroActions
+from crop_coach.envs.reward import calculate_reward
+from crop_coach.envs.pcse.engine import Engine
+
+
+FORMAT_VERSION = 2
+MANIFEST_FILE = "sweep.json"
+GRID_FILE = "grid.npz"
+
+# -- Fields of a scenario, in the order of the grid
+GRID_DTYPE = [
+    ("irrigation_amount", np.float64),
+    ("N_amount", np.float64),
+    ("P_amount", np.float64),
+    ("K_amount", np.float64),
+    ("irrigation_freq", np.int64),
+    ("fertilization_freq", np.int64),
+    ("year", np.int64),
+    ("site", np.int64),
+]
+
+# -- Results of a scenario, stored before the output variables
+RESULT_COLUMNS = ["yield", "reward", "cost", "harvest_yield"]
+
+
+def make_scenario_grid(
+    irrigation_amounts: Sequence[float] = (0.,),
+    N_amounts: Sequence[float] = (0.,),
+    P_amounts: Sequence[float] = (0.,),
+    K_amounts: Sequence[float] = (0.,),
+    periods_irrigation: Sequence[int] = (0,),
+    periods_fertilization: Sequence[int] = (0,),
+    years: Sequence[int] = (2019,),
+    n_sites: int = 1,
+) -> np.ndarray:
+    """Build the cross product of amounts x frequencies x years x sites
+
+    The scenarios are ordered by site and year first, so that consecutive scenarios
+    (and the chunks of a sweep) share their weather data and parameters.
+
+    ---------------------------------------------------------------------
+    :param irrigation_amounts : irrigation amounts per application (cm)
+    :type irrigation_amounts : Sequence[float]
+    :param N_amounts : N amounts per application (kg/ha)
+    :type N_amounts : Sequence[float]
+    :param P_amounts : P amounts per application (kg/ha)
+    :type P_amounts : Sequence[float]
+    :param K_amounts : K amounts per application (kg/ha)
+    :type K_amounts : Sequence[float]
+    :param periods_irrigation : irrigation frequencies in days (0 : no irrigation), see AgroActions.create_actions
+    :type periods_irrigation : Sequence[int]
+    :param periods_fertilization : fertilization frequencies in days (0 : no fertilization)
+    :type periods_fertilization : Sequence[int]
+    :param years : years of the growing seasons
+    :type years : Sequence[int]
+    :param n_sites : number of sites, scenarios refer to a site by its index in the sites of the sweep
+    :type n_sites : int
+
+    ---------------------------------------------------------------------
+    :return grid : the scenarios, as a structured array with the fields of GRID_DTYPE
+    :rtype grid : np.ndarray
+    """
+    rows = [
+        (irr, N, P, K, p_irr, p_fert, year, site)
+        for site, year, p_irr, p_fert, irr, N, P, K in itertools.product(
+            range(n_sites), years, periods_irrigation, periods_fertilization,
+            irrigation_amounts, N_amounts, P_amounts, K_amounts,
+        )
+    ]
+    return np.array(rows, dtype=GRID_DTYPE)
+
+
+# -- Worker state : filled once per worker process by `_init_worker`
+_worker = None
+
+
+def _init_worker(grid, sites, Agromanager_dict, Costs_dict, Discount_factors_dict, output_vars):
+    """Pool initializer : keep the sweep description, the wofost parameters are loaded per site on first use
+
+    ---------------------------------------------------------------------
+    :param grid : the scenarios of the sweep
+    :type grid : np.ndarray
+    :param sites : keyword arguments of Wofost.init_wofost for each site
+    :type sites : List[dict]
+    :param Agromanager_dict : crop calendar description (see WofostEnv)
+    :type Agromanager_dict : dict
+    :param Costs_dict : costs of each action
+    :type Costs_dict : dict
+    :param Discount_factors_dict : discount factors of each action
+    :type Discount_factors_dict : dict
+    :param output_vars : output variables stored for each scenario
+    :type output_vars : List[str]
+    """
+    global _worker
+    _worker = {
+        "grid": grid,
+        "sites": sites,
+        "Agromanager_dict": Agromanager_dict,
+        "Costs_dict": Costs_dict,
+        "Discount_factors_dict": Discount_factors_dict,
+        "output_vars": output_vars,
+        # -- site index -> [params, wdp, config], shared by all scenarios of the site
+        "wofost_params": {},
+    }
+
+
+def _site_params(site: int) -> list:
+    """Return the wofost parameters of a site, loaded once per worker"""
+    wofost_params = _worker["wofost_params"]
+    if site not in wofost_params:
+        Agromanager_dict = _worker["Agromanager_dict"]
+        site_kwargs = dict({"files_paths": None}, **_worker["sites"][site])
+        params, wdp, config = Wofost.init_wofost(
+            Agromanager_dict["crop_name"], Agromanager_dict["crop_variety"], **site_kwargs
+        )
+        wofost_params[site] = [params, wdp, config]
+    return wofost_params[site]
+
+
+def _run_scenario(scenario) -> Tuple[float, float, float, float, List[float]]:
+    """Run the growing season of one scenario
+
+    ---------------------------------------------------------------------
+    :param scenario : a row of the grid
+    :type scenario : np.void
+
+    ---------------------------------------------------------------------
+    :return Yield : the yield, as rewarded by WofostEnv : TWSO on the last simulated day (see Wofost.season_yield)
+    :return reward : the reward of the season (see calculate_reward), as in WofostEnv
+    :return cost : the costs of the applied amounts in the reward
+    :return harvest_yield : the last available value of TWSO, which is the yield at harvest when the
+        season continues after the harvest (the yield is 0 then)
+    :return outputs : last value of each output variable during the season (NaN if never available)
+    """
+    params, wdp, config = _site_params(int(scenario["site"]))
+    amounts = [float(scenario[name]) for name in ("irrigation_amount", "N_amount", "P_amount", "K_amount")]
+    agromanagement, _ = AgroActions().generate_agromanagement(
+        {"irrigate": int(scenario["irrigation_freq"]), "fertilize": int(scenario["fertilization_freq"])},
+        *amounts,
+        year=int(scenario["year"]),
+        Agromanager_dict=_worker["Agromanager_dict"],
+    )
+
+    wofost = Engine(params, wdp, agromanagement, config)
+    wofost.run_till_terminate()
+    output = wofost.get_output(as_array=True)
+
+    # -- Last available value of each variable : the crop is removed from the engine at harvest,
+    # after which the season may continue until the last timed event
+    last_values = {}
+    for var in set(_worker["output_vars"]) | {"TWSO"}:
+        values = output[var]
+        finite = np.flatnonzero(~np.isnan(values))
+        last_values[var] = float(values[finite[-1]]) if len(finite) else np.nan
+
+    Yield = Wofost.season_yield(output)
+    harvest_yield = 0. if np.isnan(last_values["TWSO"]) else last_values["TWSO"]
+    reward = calculate_reward(
+        Yield, *amounts,
+        Costs_dict=_worker["Costs_dict"],
+        Discount_factors_dict=_worker["Discount_factors_dict"],
+    )
+    # -- The costs are the reward without yield
+    cost = 0. - calculate_reward(
+        0., *amounts,
+        Costs_dict=_worker["Costs_dict"],
+        Discount_factors_dict=_worker["Discount_factors_dict"],
+    )
+
+    return Yield, reward, cost, harvest_yield, [last_values[var] for var in _worker["output_vars"]]
+
+
+def _run_chunk(bounds: Tuple[int, int]) -> Tuple[int, Dict[str, np.ndarray]]:
+    """Run the scenarios [start, stop) of the grid in a worker
+
+    ---------------------------------------------------------------------
+    :param bounds : (start, stop) indices of the scenarios
+    :type bounds : tuple
+
+    ---------------------------------------------------------------------
+    :return start : index of the first scenario
+    :return columns : the results, one array per column
+    """
+    start, stop = bounds
+    output_vars = _worker["output_vars"]
+    n = stop - start
+    columns = {"index": np.arange(start, stop)}
+    columns.update({name: np.empty(n) for name in RESULT_COLUMNS + output_vars})
+    for i, scenario in enumerate(_worker["grid"][start:stop]):
+        Yield, reward, cost, harvest_yield, outputs = _run_scenario(scenario)
+        columns["yield"][i] = Yield
+        columns["reward"][i] = reward
+        columns["cost"][i] = cost
+        columns["harvest_yield"][i] = harvest_yield
+        for var, value in zip(output_vars, outputs):
+            columns[var][i] = value
+    return start, columns
+
+
+def _save_npz(fname: str, arrays: dict):
+    """Write the arrays through a temporary file, so that an interrupted sweep never leaves a partial file"""
+    fd, tmp_fname = tempfile.mkstemp(dir=os.path.dirname(fname), suffix=".tmp")
+    with os.fdopen(fd, "wb") as fp:
+        np.savez(fp, **arrays)
+    os.replace(tmp_fname, fname)
+
+
+class ScenarioSweep:
+    """Run a grid of scenarios (growing seasons) over a pool of worker processes, in chunks
+
+    Every worker loads the parameters and the weather data of a site once (through
+    Wofost.init_wofost) and keeps them for all the scenarios of that site. The results
+    of each chunk are written to the sweep directory as soon as the chunk is done, as a
+    columnar NPZ file : the yield, the reward and the cost, as in WofostEnv (see
+    Wofost.season_yield and calculate_reward), the yield at harvest (last available
+    value of TWSO) and the last value of each of the `output_vars` during the season. An interrupted sweep
+    continues with the chunks that are not yet done when it is run again.
+
+    example::
+
+        >>> grid = make_scenario_grid(irrigation_amounts=[0, 1, 2], N_amounts=[0, 50, 100],
+        ...                           periods_irrigation=[7, 14], periods_fertilization=[30],
+        ...                           years=[2019, 2020])
+        >>> sweep = ScenarioSweep("results/sweep", grid, output_vars=["TAGP", "LAI"])
+        >>> results = sweep.run(n_workers=8)
+        >>> results["yield"], results["cost"]
+    """
+
+    def __init__(
+        self,
+        path: str,
+        grid: np.ndarray,
+        sites: Optional[List[dict]] = None,
+        Agromanager_dict={
+            "crop_name": "wheat","crop_variety": "Winter_wheat_101","campaign_start_date": "-01-01","crop_start_type":"emergence","emergence_date": "-04-11","crop_end_type": "harvest","harvest_date": "-08-11", "max_duration": 100
+        },
+        Costs_dict={"Irrigation": 150, "N": 8,
+                    "P": 8.5, "K": 7, "Selling": 2.5},
+        Discount_factors_dict={"Irrigation": 1, "N": 1, "P": 1, "K": 1},
+        output_vars: Sequence[str] = ("TAGP", "LAI", "RD"),
+        chunk_size: int = 64,
+    ):
+        """
+        Initialization of the sweep : create the sweep directory, or check that it holds the same sweep
+
+        ---------------------------------------------------------------------
+        :param path : the sweep directory, holding the description of the sweep and the results
+        :type path : str
+        :param grid : the scenarios, see make_scenario_grid
+        :type grid : np.ndarray
+        :param sites : keyword arguments of Wofost.init_wofost for each site (eg. latitude,
+            longitude, files_paths, weather_path), default : one site with the defaults of init_wofost
+        :type sites : Optional[List[dict]]
+        :param output_vars : output variables (of the configuration) stored for each scenario
+        :type output_vars : Sequence[str]
+        :param chunk_size : number of scenarios per chunk, the unit of work of a worker and of resumption
+        :type chunk_size : int
+
+        The remaining parameters are the same as for WofostEnv.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size should be a positive integer")
+        grid = np.asarray(grid, dtype=GRID_DTYPE)
+        sites = [{}] if sites is None else list(sites)
+        if len(grid) and grid["site"].max() >= len(sites):
+            raise ValueError("The grid refers to site %i, but only %i sites are given"
+                             % (grid["site"].max(), len(sites)))
+
+        self.path = path
+        self.grid = grid
+        self.sites = sites
+        self.Agromanager_dict = Agromanager_dict
+        self.Costs_dict = Costs_dict
+        self.Discount_factors_dict = Discount_factors_dict
+        self.output_vars = list(output_vars)
+        self.chunk_size = chunk_size
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "sites": sites,
+            "Agromanager_dict": Agromanager_dict,
+            "Costs_dict": Costs_dict,
+            "Discount_factors_dict": Discount_factors_dict,
+            "output_vars": self.output_vars,
+            "chunk_size": chunk_size,
+        }
+        manifest_fname = os.path.join(path, MANIFEST_FILE)
+        if os.path.exists(manifest_fname):
+            # -- Resuming : the results on disk must come from the same sweep
+            with open(manifest_fname) as fp:
+                existing = json.load(fp)
+            with np.load(os.path.join(path, GRID_FILE)) as data:
+                existing_grid = data["grid"]
+            if existing != json.loads(json.dumps(manifest)) or not np.array_equal(existing_grid, grid):
+                raise ValueError("Directory '%s' holds the results of another sweep" % path)
+        else:
+            os.makedirs(path, exist_ok=True)
+            _save_npz(os.path.join(path, GRID_FILE), {"grid": grid})
+            with open(manifest_fname, "w") as fp:
+                json.dump(manifest, fp, indent=1)
+
+    def chunk_fname(self, start: int) -> str:
+        """Return the name of the result file of the chunk starting at scenario `start`"""
+        return os.path.join(self.path, "chunk_%09i.npz" % start)
+
+    def pending_chunks(self) -> List[Tuple[int, int]]:
+        """Return the (start, stop) indices of the chunks without result file"""
+        return [
+            (start, min(start + self.chunk_size, len(self.grid)))
+            for start in range(0, len(self.grid), self.chunk_size)
+            if not os.path.exists(self.chunk_fname(start))
+        ]
+
+    def run(
+        self,
+        n_workers: Optional[int] = None,
+        start_method: Optional[str] = None,
+        max_chunks: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Run the pending chunks of the sweep and return all the results
+
+        ---------------------------------------------------------------------
+        :param n_workers : number of worker processes (default : cpu_count, 0 : run in this process)
+        :type n_workers : Optional[int]
+        :param start_method : multiprocessing start method ("fork", "spawn", ...), None for the default
+        :type start_method : Optional[str]
+        :param max_chunks : run at most this number of chunks (None : all the pending chunks)
+        :type max_chunks : Optional[int]
+
+        ---------------------------------------------------------------------
+        :return results : the results of the done scenarios, see load_sweep
+        :rtype results : Dict[str, np.ndarray]
+        """
+        chunks = self.pending_chunks()[:max_chunks]
+        initargs = (self.grid, self.sites, self.Agromanager_dict, self.Costs_dict,
+                    self.Discount_factors_dict, self.output_vars)
+        if n_workers is None:
+            n_workers = multiprocessing.cpu_count()
+
+        if n_workers == 0:
+            _init_worker(*initargs)
+            for bounds in chunks:
+                start, columns = _run_chunk(bounds)
+                _save_npz(self.chunk_fname(start), columns)
+        elif chunks:
+            ctx = multiprocessing.get_context(start_method)
+            with ctx.Pool(processes=min(n_workers, len(chunks)), initializer=_init_worker,
+                          initargs=initargs) as pool:
+                # -- Chunks are written as they come in, in any order
+                for start, columns in pool.imap_unordered(_run_chunk, chunks):
+                    _save_npz(self.chunk_fname(start), columns)
+
+        return load_sweep(self.path)
+
+
+def load_sweep(path: str) -> Dict[str, np.ndarray]:
+    """Load the results of a (possibly unfinished) sweep
+
+    ---------------------------------------------------------------------
+    :param path : the sweep directory
+    :type path : str
+
+    ---------------------------------------------------------------------
+    :return results : one array per column, for the done scenarios in the order of the grid :
+        "index" (of the scenario in the grid), the fields of the grid, "yield", "reward",
+        "cost", "harvest_yield" and the output variables
+    :rtype results : Dict[str, np.ndarray]
+    """
+    with np.load(os.path.join(path, GRID_FILE)) as data:
+        grid = data["grid"]
+    chunks = []
+    for fname in sorted(os.listdir(path)):
+        if fname.startswith("chunk_") and fname.endswith(".npz"):
+            with np.load(os.path.join(path, fname)) as data:
+                chunks.append({name: data[name] for name in data.files})
+
+    if not chunks:
+        # -- No results yet : the same columns, without values
+        with open(os.path.join(path, MANIFEST_FILE)) as fp:
+            output_vars = json.load(fp)["output_vars"]
+        results = {"index": np.zeros(0, dtype=np.int64)}
+        results.update({name: grid[name][:0] for name in grid.dtype.names})
+        results.update({name: np.zeros(0) for name in RESULT_COLUMNS + output_vars})
+        return results
+
+    # -- The chunk files are sorted by their first scenario
+    results = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+    index = results["index"]
+    ordered = {"index": index}
+    ordered.update({name: grid[name][index] for name in grid.dtype.names})
+    ordered.update({name: values for name, values in results.items() if name != "index"})
+    return ordered
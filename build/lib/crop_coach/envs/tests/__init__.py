@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+""" Collection of tests for the crop_coach environments.
+"""
+import unittest
+from . import test_vec_env
+from . import test_models
+from . import test_daily_env
+from . import test_sweep
+
+def make_test_suite():
+    """Assemble test suite and return it
+    """
+    allsuites = unittest.TestSuite([test_vec_env.suite(),
+                                   test_models.suite(),
+                                   test_daily_env.suite(),
+                                   test_sweep.suite()])
+    return allsuites
+
+def test_all():
+    """Assemble test suite and run the test using the TextTestRunner
+    """
+    allsuites = make_test_suite()
+    unittest.TextTestRunner(verbosity=2).run(allsuites)
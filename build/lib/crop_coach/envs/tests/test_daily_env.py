@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for WofostDailyEnv.
+"""
+import os
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+
+import numpy as np
+
+from ..daily_env import WofostDailyEnv
+from ..reward import calculate_reward
+from ..wofost_env import denormalize_irrigation_action, denormalize_fertilization_action
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider
+
+
+class TestWofostDailyEnv(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        weather_path = SyntheticWeatherDataProvider().to_columnar(os.path.join(self.tmp_dir, "weather"))
+        self.env = WofostDailyEnv(step_days=30, sample_year=False, year=2019, weather_path=weather_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _episode(self, action, observations=None):
+        obs = self.env.reset()
+        rewards, done = [], False
+        while not done:
+            if observations is not None:
+                observations.append(obs)
+            obs, reward, done, _ = self.env.step(action)
+            rewards.append(reward)
+        if observations is not None:
+            observations.append(obs)
+        return rewards
+
+    def test_actions_change_the_season(self):
+        no_action = np.array([-1., -1., -1., -1.])
+        observations = []
+        self._episode(no_action, observations)
+        reference_yield = self.env.Yield
+        reference_SM = [obs[self.env.OUTPUT_VARS.index("SM")] for obs in observations]
+
+        # Fertilization with N, sent with Engine.schedule_signal, increases the yield
+        self._episode(np.array([-1., 0., -1., -1.]))
+        self.assertGreater(self.env.Yield, reference_yield)
+
+        # Irrigation increases the soil moisture
+        observations = []
+        self._episode(np.array([0., -1., -1., -1.]), observations)
+        SM = [obs[self.env.OUTPUT_VARS.index("SM")] for obs in observations]
+        self.assertEqual(len(SM), len(reference_SM))
+        self.assertTrue(all(sm >= ref for sm, ref in zip(SM, reference_SM)))
+        self.assertGreater(sum(SM), sum(reference_SM))
+
+    def test_observations_in_observation_space(self):
+        observations = []
+        self._episode(np.array([0.5, 0.5, 0.5, 0.5]), observations)
+        for obs in observations:
+            self.assertEqual(obs.shape, self.env.observation_space.shape)
+            self.assertTrue(self.env.observation_space.contains(obs), obs)
+        # The first observation is the day of the campaign start
+        self.assertEqual(observations[0][0], 0.)
+
+    def test_done_and_season_reward(self):
+        action = np.array([-0.8, -0.5, -1., -1.])
+        self.env.reset()
+        rewards, dones, days = [], [], []
+        while not dones or not dones[-1]:
+            _, reward, done, info = self.env.step(action)
+            rewards.append(reward)
+            dones.append(done)
+            days.append(info["day"])
+
+        # The crop finishes after max_duration days, before the harvest date
+        crop_calendar = self.env.get_agromanagement(2019)[0][dt.date(2019, 1, 1)]["CropCalendar"]
+        finish = crop_calendar["crop_start_date"] + dt.timedelta(days=crop_calendar["max_duration"])
+        self.assertEqual(days[-1], finish)
+        self.assertEqual(dones, [False] * (len(dones) - 1) + [True])
+        self.assertEqual(days[:-1], [dt.date(2019, 1, 1) + dt.timedelta(days=30 * (i + 1))
+                                     for i in range(len(days) - 1)])
+        self.assertTrue(self.env.engine.flag_terminate)
+
+        # The rewards add up to the gross margin of the season
+        amounts = (denormalize_irrigation_action(action[0]),) + \
+            tuple(denormalize_fertilization_action(a) for a in action[1:])
+        costs = calculate_reward(0., *amounts, Costs_dict=self.env.Costs_dict,
+                                 Discount_factors_dict=self.env.Discount_factors_dict)
+        season = self.env.Yield * self.env.Costs_dict["Selling"] + len(rewards) * costs
+        self.assertGreater(self.env.Yield, 0.)
+        self.assertAlmostEqual(sum(rewards), season, places=6)
+
+    def test_episodes_do_not_share_agromanagement(self):
+        action = np.array([-0.8, -0.5, -1., -1.])
+        reference = self._episode(action)
+        # Modifying the agromanagement of an episode does not affect the next episodes
+        self.assertIsNot(self.env.get_agromanagement(2019), self.env.get_agromanagement(2019))
+        self.env.get_agromanagement(2019)[0].clear()
+        self.assertEqual(self._episode(action), reference)
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestWofostDailyEnv("test_episodes_do_not_share_agromanagement"))
+    suite.addTest(TestWofostDailyEnv("test_actions_change_the_season"))
+    suite.addTest(TestWofostDailyEnv("test_observations_in_observation_space"))
+    suite.addTest(TestWofostDailyEnv("test_done_and_season_reward"))
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for the results cache of Wofost.run_wofost.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..models import Wofost, weather_key
+from ..actions import AgroActions
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider
+
+Agromanager_dict = {
+    "crop_name": "wheat", "crop_variety": "Winter_wheat_101", "campaign_start_date": "-01-01",
+    "crop_start_type": "emergence", "emergence_date": "-04-11", "crop_end_type": "harvest",
+    "harvest_date": "-08-11", "max_duration": 300,
+}
+
+
+class TestRunWofostCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        Wofost.results_cache.clear()
+        Wofost.prefix_cache.clear()
+        # Two weather data providers at the same location, without rain for the second one
+        self.weathers = [SyntheticWeatherDataProvider(), SyntheticWeatherDataProvider()]
+        for wdc in self.weathers[1].store.values():
+            wdc.RAIN = 0.
+        self.params, _, self.config = Wofost.init_wofost(
+            Agromanager_dict["crop_name"], Agromanager_dict["crop_variety"], None,
+            weather_path=self.weathers[0].to_columnar(os.path.join(self.tmp_dir, "weather")))
+        self.agromanagement, _ = AgroActions().generate_agromanagement(
+            {"irrigate": 0, "fertilize": 30}, 0, 50, 0, 0, 2019, Agromanager_dict)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        Wofost.results_cache.clear()
+        Wofost.prefix_cache.clear()
+
+    def _yields(self, weathers, use_cache):
+        return [Wofost.run_wofost(self.agromanagement, self.params, wdp, self.config, use_cache=use_cache)[1]
+                for wdp in weathers]
+
+    def test_same_location_in_memory(self):
+        reference = self._yields(self.weathers, use_cache=False)
+        self.assertNotEqual(reference[0], reference[1])
+        self.assertNotEqual(weather_key(self.weathers[0]), weather_key(self.weathers[1]))
+        self.assertEqual(self._yields(self.weathers, use_cache=True), reference)
+        # Cached results
+        self.assertEqual(self._yields(self.weathers, use_cache=True), reference)
+
+    def test_same_location_columnar(self):
+        weathers = [Wofost.init_wofost(
+            Agromanager_dict["crop_name"], Agromanager_dict["crop_variety"], None,
+            weather_path=wdp.to_columnar(os.path.join(self.tmp_dir, "weather%i" % i)))[1]
+            for i, wdp in enumerate(self.weathers)]
+        reference = self._yields(weathers, use_cache=False)
+        self.assertNotEqual(reference[0], reference[1])
+        self.assertEqual(self._yields(weathers, use_cache=True), reference)
+
+        # A store written again with other weather is not served from the cache, also when
+        # its meta.json has the same modification time and size
+        path = weathers[0].columnar_path
+        stat = os.stat(os.path.join(path, "meta.json"))
+        self.weathers[1].to_columnar(path)
+        os.utime(os.path.join(path, "meta.json"), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(os.stat(os.path.join(path, "meta.json")).st_size, stat.st_size)
+        rewritten = Wofost.init_wofost(
+            Agromanager_dict["crop_name"], Agromanager_dict["crop_variety"], None, weather_path=path)[1]
+        self.assertEqual(self._yields([rewritten], use_cache=True), reference[1:])
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestRunWofostCache("test_same_location_in_memory"))
+    suite.addTest(TestRunWofostCache("test_same_location_columnar"))
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for make_scenario_grid, ScenarioSweep and load_sweep.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from ..sweep import ScenarioSweep, make_scenario_grid, load_sweep, GRID_DTYPE
+from ..models import Wofost
+from ..actions import AgroActions
+from ..reward import calculate_reward
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider
+
+Agromanager_dict = {
+    "crop_name": "wheat", "crop_variety": "Winter_wheat_101", "campaign_start_date": "-01-01",
+    "crop_start_type": "emergence", "emergence_date": "-04-11", "crop_end_type": "harvest",
+    "harvest_date": "-08-11", "max_duration": 300,
+}
+Costs_dict = {"Irrigation": 150, "N": 8, "P": 8.5, "K": 7, "Selling": 2.5}
+Discount_factors_dict = {"Irrigation": 1, "N": 1, "P": 1, "K": 1}
+
+
+class TestMakeScenarioGrid(unittest.TestCase):
+
+    def runTest(self):
+        grid = make_scenario_grid(irrigation_amounts=[0., 2.], N_amounts=[0., 50., 100.],
+                                  periods_irrigation=[7, 14], years=[2019, 2020], n_sites=2)
+        self.assertEqual(grid.dtype, np.dtype(GRID_DTYPE))
+        self.assertEqual(len(grid), 2 * 3 * 2 * 2 * 2)
+        self.assertEqual(len(np.unique(grid)), len(grid))
+        # Ordered by site and year first
+        self.assertTrue((np.diff(grid["site"]) >= 0).all())
+        self.assertEqual(list(grid["year"][:len(grid) // 4]), [2019] * (len(grid) // 4))
+        self.assertEqual(set(grid["P_amount"]), {0.})
+        self.assertEqual(set(grid["fertilization_freq"]), {0})
+
+
+class TestScenarioSweep(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.weather_dir = tempfile.mkdtemp()
+        cls.sites = [{"weather_path": SyntheticWeatherDataProvider().to_columnar(
+            os.path.join(cls.weather_dir, "weather"))}]
+        cls.grid = make_scenario_grid(irrigation_amounts=[0., 2.], N_amounts=[0., 50.],
+                                      periods_irrigation=[0, 14], periods_fertilization=[30])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.weather_dir)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "sweep")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _sweep(self, path=None, grid=None, **kwargs):
+        kwargs.setdefault("chunk_size", 3)
+        return ScenarioSweep(path or self.path, self.grid if grid is None else grid, sites=self.sites,
+                             Agromanager_dict=Agromanager_dict, Costs_dict=Costs_dict,
+                             Discount_factors_dict=Discount_factors_dict, output_vars=["TAGP", "LAI"],
+                             **kwargs)
+
+    def test_results_match_run_wofost(self):
+        results = self._sweep().run(n_workers=0)
+        self.assertEqual(list(results["index"]), list(range(len(self.grid))))
+        for name in self.grid.dtype.names:
+            np.testing.assert_array_equal(results[name], self.grid[name])
+
+        # The yield and the reward are those of WofostEnv
+        params, wdp, config = Wofost.init_wofost(
+            Agromanager_dict["crop_name"], Agromanager_dict["crop_variety"], None, **self.sites[0])
+        for i, scenario in enumerate(self.grid):
+            amounts = [float(scenario[name]) for name in ("irrigation_amount", "N_amount", "P_amount", "K_amount")]
+            agromanagement, _ = AgroActions().generate_agromanagement(
+                {"irrigate": int(scenario["irrigation_freq"]), "fertilize": int(scenario["fertilization_freq"])},
+                *amounts, year=int(scenario["year"]), Agromanager_dict=Agromanager_dict)
+            _, Yield = Wofost.run_wofost(agromanagement, params, wdp, config, use_cache=False)
+            self.assertEqual(results["yield"][i], Yield)
+            self.assertEqual(results["reward"][i], calculate_reward(
+                Yield, *amounts, Costs_dict=Costs_dict, Discount_factors_dict=Discount_factors_dict))
+            self.assertEqual(results["cost"][i], Yield * Costs_dict["Selling"] - results["reward"][i])
+        self.assertTrue((results["yield"] > 0).any())
+        self.assertTrue((results["harvest_yield"] >= results["yield"]).all())
+        self.assertTrue((results["TAGP"] > 0).all())
+
+    def test_resume(self):
+        reference = self._sweep(path=os.path.join(self.tmp_dir, "reference")).run(n_workers=0)
+
+        partial = self._sweep().run(n_workers=0, max_chunks=2)
+        self.assertEqual(list(partial["index"]), list(range(6)))
+        self.assertEqual(list(load_sweep(self.path)["index"]), list(range(6)))
+        chunk_fname = self._sweep().chunk_fname(0)
+        mtime = os.stat(chunk_fname).st_mtime_ns
+
+        # A new sweep on the same directory only runs the pending chunks
+        sweep = self._sweep()
+        self.assertEqual(sweep.pending_chunks(), [(6, 8)])
+        results = sweep.run(n_workers=0)
+        self.assertEqual(os.stat(chunk_fname).st_mtime_ns, mtime)
+        self.assertEqual(sweep.pending_chunks(), [])
+        self.assertEqual(sorted(results), sorted(reference))
+        for name, values in reference.items():
+            np.testing.assert_array_equal(results[name], values, err_msg=name)
+
+    def test_no_results(self):
+        reference = self._sweep(path=os.path.join(self.tmp_dir, "reference")).run(n_workers=0, max_chunks=1)
+        # Without any finished chunk, every column is there without values
+        results = self._sweep().run(n_workers=0, max_chunks=0)
+        self.assertEqual(list(results), list(reference))
+        for name, values in results.items():
+            self.assertEqual(len(values), 0, name)
+            self.assertEqual(values.dtype, reference[name].dtype, name)
+        self.assertEqual(list(load_sweep(self.path)), list(reference))
+
+    def test_mismatch(self):
+        self._sweep().run(n_workers=0, max_chunks=1)
+        # The grid, the chunks or the outputs of the sweep can not change between runs
+        with self.assertRaises(ValueError):
+            self._sweep(grid=self.grid[:-1])
+        grid = self.grid.copy()
+        grid["N_amount"][0] = 25.
+        with self.assertRaises(ValueError):
+            self._sweep(grid=grid)
+        with self.assertRaises(ValueError):
+            self._sweep(chunk_size=4)
+        self.assertEqual(self._sweep().pending_chunks(), [(3, 6), (6, 8)])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            self._sweep(chunk_size=0)
+        with self.assertRaises(ValueError):
+            self._sweep(grid=make_scenario_grid(n_sites=2))
+        self.assertFalse(os.path.exists(self.path))
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestMakeScenarioGrid())
+    suite.addTest(TestScenarioSweep("test_results_match_run_wofost"))
+    suite.addTest(TestScenarioSweep("test_resume"))
+    suite.addTest(TestScenarioSweep("test_no_results"))
+    suite.addTest(TestScenarioSweep("test_mismatch"))
+    suite.addTest(TestScenarioSweep("test_invalid_arguments"))
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
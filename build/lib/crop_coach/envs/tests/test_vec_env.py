@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Module defines unittests for WofostVecEnv.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from ..vec_env import WofostVecEnv
+from crop_coach.benchmarks.fixtures import SyntheticWeatherDataProvider
+
+
+class TestWofostVecEnv(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.weather_path = SyntheticWeatherDataProvider().to_columnar(os.path.join(cls.tmp_dir, "weather"))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def setUp(self):
+        self.env = WofostVecEnv(n_envs=2, n_workers=1, years_count=2, sample_year=False, year=2019,
+                                weather_path=self.weather_path)
+        self.actions = np.array([[0.5, 0.5, 0., 0., -0.5, 0.], [-1., -1., -1., -1., -1., -1.]])
+
+    def tearDown(self):
+        self.env.close()
+
+    def test_step(self):
+        obs = self.env.reset()
+        self.assertEqual(obs.shape, (2, self.env.n_obs))
+        self.assertEqual(obs.dtype, self.env.observation_space.dtype)
+
+        obs, rewards, dones, infos = self.env.step(self.actions)
+        self.assertEqual(obs.shape, (2, self.env.n_obs))
+        self.assertEqual(obs.dtype, self.env.observation_space.dtype)
+        self.assertTrue(self.env.observation_space.contains(obs[0]))
+        self.assertEqual(rewards.shape, (2,))
+        self.assertFalse(dones.any())
+        self.assertEqual(infos, [{}, {}])
+        # The same action gives the same reward
+        _, rewards_again, _, _ = self.env.step(self.actions[[0, 0]])
+        self.assertEqual(rewards_again[0], rewards_again[1])
+        self.assertEqual(rewards_again[0], rewards[0])
+
+        with self.assertRaises(ValueError):
+            self.env.step(self.actions[:1])
+
+    def test_auto_reset(self):
+        self.env.reset()
+        self.env.step(self.actions)
+        obs, _, dones, infos = self.env.step(self.actions)
+        self.assertTrue(dones.all())
+        # The finished environments are reset, their last observation is kept in the infos
+        np.testing.assert_array_equal(obs, np.zeros_like(obs))
+        for info in infos:
+            terminal = info["terminal_observation"]
+            self.assertEqual(terminal.dtype, self.env.observation_space.dtype)
+            self.assertTrue(self.env.observation_space.contains(terminal))
+        self.assertTrue((self.env.years_count == self.env.years_count_max).all())
+        _, _, dones, _ = self.env.step(self.actions)
+        self.assertFalse(dones.any())
+
+    def test_close(self):
+        self.env.close()
+        self.assertIsNone(self.env.pool)
+        # Closing twice is allowed
+        self.env.close()
+        with WofostVecEnv(n_envs=1, n_workers=1, sample_year=False, weather_path=self.weather_path) as env:
+            pool = env.pool
+        self.assertIsNone(env.pool)
+        with self.assertRaises(ValueError):
+            pool.map(abs, [1])
+
+
+def suite():
+    """ This defines all the tests of a module"""
+    suite = unittest.TestSuite()
+    suite.addTest(TestWofostVecEnv("test_step"))
+    suite.addTest(TestWofostVecEnv("test_auto_reset"))
+    suite.addTest(TestWofostVecEnv("test_close"))
+    return suite
+
+if __name__ == '__main__':
+   unittest.TextTestRunner(verbosity=2).run(suite())
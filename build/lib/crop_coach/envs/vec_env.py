@@ -0,0 +1,249 @@
+# -- Importing dependencies :
+import multiprocessing
+import datetime
+from typing import List, Tuple, Optional
+
+import numpy as np
+from gym import spaces
+
+from crop_coach.envs.models import Wofost
+from crop_coach.envs.wofost_env import WofostEnv, OUTPUT_VARS, run_season
+
+
+# -- Worker state : filled once per worker process by `_init_worker`
+_worker_wofost_params = None
+
+
+def _init_worker(crop_name, crop_variety, files_paths, latitude, longitude, kwargs):
+    """Pool initializer : load the parameters, weather data provider and config once per worker
+
+    ---------------------------------------------------------------------
+    :param crop_name : the crop name
+    :type crop_name : str
+    :param crop_variety : the crop variety
+    :type crop_variety : str
+    :param files_paths : paths of the soil, site and crop cabo files (None for the defaults)
+    :type files_paths : dict
+    :param latitude : latitude of the site
+    :type latitude : float
+    :param longitude : longitude of the site
+    :type longitude : float
+    :param kwargs : extra keyword arguments passed to Wofost.init_wofost
+    :type kwargs : dict
+    """
+    global _worker_wofost_params
+    params, wdp, config = Wofost.init_wofost(
+        crop_name, crop_variety, files_paths, latitude, longitude, **kwargs
+    )
+    _worker_wofost_params = [params, wdp, config]
+
+
+def _observation(state, year: int, Agromanager_dict: dict) -> np.ndarray:
+    """Convert the observations of run_season to the float vector of the observation space
+
+    The day is observed as the number of days since the campaign start (as in WofostDailyEnv),
+    variables without value (None) are observed as 0.
+
+    ---------------------------------------------------------------------
+    :param state : the observations ndarray (day followed by the OUTPUT_VARS values)
+    :type state : np.ndarray
+    :param year : the year of the growing season
+    :type year : int
+    :param Agromanager_dict : crop calendar description (see WofostEnv)
+    :type Agromanager_dict : dict
+
+    ---------------------------------------------------------------------
+    :return obs : the observations, shape (n_obs,)
+    :rtype obs : np.ndarray
+    """
+    _, month, day = Agromanager_dict["campaign_start_date"].split("-")
+    campaign_start = datetime.date(year, int(month), int(day))
+    values = [(v - campaign_start).days if isinstance(v, datetime.date) else v for v in state]
+    return np.array([0. if v is None else v for v in values], dtype=np.float32)
+
+
+def _worker_step(task):
+    """Run one growing season in a worker, with the worker's persistent wofost parameters
+
+    ---------------------------------------------------------------------
+    :param task : (action, year, tot_days, Agromanager_dict, Costs_dict, Discount_factors_dict)
+    :type task : tuple
+
+    ---------------------------------------------------------------------
+    :return obs : the observations, as a float vector (see _observation)
+    :return reward : the reward of the growing season
+    """
+    action, year, tot_days, Agromanager_dict, Costs_dict, Discount_factors_dict = task
+    state, reward = run_season(
+        action,
+        year,
+        tot_days,
+        Agromanager_dict,
+        _worker_wofost_params,
+        Costs_dict,
+        Discount_factors_dict,
+    )
+    return _observation(state, year, Agromanager_dict), reward
+
+
+class WofostVecEnv:
+    """Vectorized WofostEnv : runs `n_envs` environments over a persistent pool of worker processes
+
+    Each worker loads the ParameterProvider, the weather data provider and the
+    configuration once (through Wofost.init_wofost) and keeps them for its whole
+    lifetime, so a step only costs the growing season simulations themselves.
+    Environments that are done are reset automatically, their last observation
+    is available in infos[i]["terminal_observation"].
+
+    example::
+
+        >>> env = WofostVecEnv(n_envs=4, sample_year=False, year=2019)
+        >>> obs = env.reset()
+        >>> actions = np.stack([env.action_space.sample() for _ in range(env.n_envs)])
+        >>> obs, rewards, dones, infos = env.step(actions)
+        >>> env.close()
+    """
+
+    def __init__(
+        self,
+        n_envs: int = 4,
+        n_workers: Optional[int] = None,
+        start_method: Optional[str] = None,
+        files_paths=None,
+        Agromanager_dict={
+            "crop_name": "wheat","crop_variety": "Winter_wheat_101","campaign_start_date": "-01-01","crop_start_type":"emergence","emergence_date": "-04-11","crop_end_type": "harvest","harvest_date": "-08-11", "max_duration": 100
+        },
+        years_count=2,
+        Costs_dict={"Irrigation": 150, "N": 8,
+                    "P": 8.5, "K": 7, "Selling": 2.5},
+        Discount_factors_dict={"Irrigation": 1, "N": 1, "P": 1, "K": 1},
+        year=2019,
+        sample_year=True,
+        latitude: float = 51.97,
+        longitude: float = 5.67,
+        **kwargs
+    ):
+        """
+        Initialization of the vectorized env : spaces, per env bookkeeping and the worker pool
+
+        ---------------------------------------------------------------------
+        :param n_envs : number of environments
+        :type n_envs : int
+        :param n_workers : number of worker processes (default : min(n_envs, cpu_count))
+        :type n_workers : Optional[int]
+        :param start_method : multiprocessing start method ("fork", "spawn", ...), None for the default
+        :type start_method : Optional[str]
+
+        The remaining parameters are the same as for WofostEnv.
+        """
+        if n_envs < 1:
+            raise ValueError("n_envs should be a positive integer")
+        if n_workers is None:
+            n_workers = min(n_envs, multiprocessing.cpu_count())
+
+        self.n_envs = n_envs
+        self.n_workers = n_workers
+        self.Agromanager_dict = Agromanager_dict
+        self.Costs_dict = Costs_dict
+        self.Discount_factors_dict = Discount_factors_dict
+        self.year = year
+        self.sample_year = sample_year
+        self.years_count_max = years_count
+        self.years_count = np.full(n_envs, years_count)
+
+        # -- Spaces are the same as those of a single WofostEnv :
+        self.n_actions = 6
+        self.n_obs = len(OUTPUT_VARS)
+        self.action_space = spaces.Box(
+            low=np.array([-1, -1, -1, -1, -1, -1]),
+            high=np.array([1, 1, 1, 1, 1, 1]),
+            shape=(self.n_actions,),
+            dtype="float32",
+        )
+        self.observation_space = spaces.Box(
+            low=0.0, high=np.inf, shape=(self.n_obs,), dtype="float32"
+        )
+
+        # -- The frequencies are denormalized with the number of days of the campaign :
+        self.tot_days = WofostEnv.calculate_days(
+            Agromanager_dict["campaign_start_date"], Agromanager_dict["harvest_date"], year
+        )
+
+        # -- Persistent worker pool : every worker runs Wofost.init_wofost once
+        ctx = multiprocessing.get_context(start_method)
+        self.pool = ctx.Pool(
+            processes=n_workers,
+            initializer=_init_worker,
+            initargs=(
+                Agromanager_dict["crop_name"],
+                Agromanager_dict["crop_variety"],
+                files_paths,
+                latitude,
+                longitude,
+                kwargs,
+            ),
+        )
+
+    def _sample_years(self) -> List[int]:
+        """Sample a year for each environment (or use the fixed year)"""
+        if self.sample_year:
+            return [WofostEnv.sample_random_year() for _ in range(self.n_envs)]
+        return [self.year] * self.n_envs
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[dict]]:
+        """Run one growing season for every environment, in parallel over the worker pool
+
+        ---------------------------------------------------------------------
+        :param actions : batch of normalized actions, shape (n_envs, 6)
+        :type actions : np.ndarray
+
+        ---------------------------------------------------------------------
+        :return obs : stacked observations, shape (n_envs, n_obs), dtype of the observation space
+        :return rewards : rewards, shape (n_envs,)
+        :return dones : done flags, shape (n_envs,)
+        :return infos : one info dict per environment
+        """
+        actions = np.asarray(actions)
+        if len(actions) != self.n_envs:
+            msg = "Expected a batch of %i actions, got %i" % (self.n_envs, len(actions))
+            raise ValueError(msg)
+
+        tasks = [
+            (action, year, self.tot_days, self.Agromanager_dict,
+             self.Costs_dict, self.Discount_factors_dict)
+            for action, year in zip(actions, self._sample_years())
+        ]
+        chunksize = max(1, self.n_envs // self.n_workers)
+        results = self.pool.map(_worker_step, tasks, chunksize=chunksize)
+
+        obs = np.stack([state for state, _ in results]).astype(self.observation_space.dtype, copy=False)
+        rewards = np.array([reward for _, reward in results], dtype=np.float64)
+
+        # -- Done logic, with automatic reset of the finished environments :
+        self.years_count -= 1
+        dones = self.years_count == 0
+        infos = [{} for _ in range(self.n_envs)]
+        for i in np.flatnonzero(dones):
+            infos[i]["terminal_observation"] = obs[i].copy()
+            obs[i] = 0
+            self.years_count[i] = self.years_count_max
+
+        return obs, rewards, dones, infos
+
+    def reset(self) -> np.ndarray:
+        """Reset all the environments and return the stacked initial observations"""
+        self.years_count[:] = self.years_count_max
+        return np.zeros((self.n_envs, self.n_obs), dtype=self.observation_space.dtype)
+
+    def close(self):
+        """Close the worker pool"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -120,6 +120,78 @@ def calculate_days(start_date, end_date, year):
     return delta.days
 
 
+# -- Observed variables : the day followed by the OUTPUT_VARS of the configuration file
+OUTPUT_VARS = [    'day',    'DVS',    'LAI',    'TAGP',    'TWSO',    'TWLV',    'TWST',    'TWRT',    'TRA',    'RD',    'SM',    'WWLOW',    'NNI',    'KNI',    'PNI',    'NPKI',    'NSOIL',    'PSOIL',    'KSOIL',    'NAVAIL',    'PAVAIL',    'KAVAIL',    'NDEMLV',    'NDEMRT',    'NDEMSO',    'NDEMST',    'PDEMLV',    'PDEMRT',    'PDEMSO',    'PDEMST',    'KDEMLV',    'KDEMRT',    'KDEMSO',    'KDEMST',    'RNUPTAKE',    'RPUPTAKE',    'RKUPTAKE',    'RNFIX',    'NTRANSLOCATABLE',    'PTRANSLOCATABLE',    'KTRANSLOCATABLE']
+
+
+def run_season(
+    action,
+    year,
+    tot_days,
+    Agromanager_dict,
+    wofost_params,
+    Costs_dict,
+    Discount_factors_dict,
+):
+    """Run one growing season for a given (normalized) action and compute its reward
+
+    ---------------------------------------------------------------------
+    :param action : normalized action, in [-1, 1] (irrigation, N, P, K, irrigation freq, fertilization freq)
+    :type action : np.ndarray
+    :param year : the year of the growing season
+    :type year : int
+    :param tot_days : number of days used to denormalize the frequencies
+    :type tot_days : int
+    :param Agromanager_dict : crop calendar description (see WofostEnv)
+    :type Agromanager_dict : dict
+    :param wofost_params : [params, wdp, config] as returned by Wofost.init_wofost
+    :type wofost_params : list
+    :param Costs_dict : costs of each action
+    :type Costs_dict : dict
+    :param Discount_factors_dict : discount factors of each action
+    :type Discount_factors_dict : dict
+
+    ---------------------------------------------------------------------
+    :return state : the observations ndarray
+    :rtype state : np.ndarray
+    :return reward : the reward of the growing season
+    :rtype reward : float
+    """
+    # -- Create the action :
+    irrigation_action = denormalize_irrigation_action(action[0])
+    N_amount = denormalize_fertilization_action(action[1])
+    P_amount = denormalize_fertilization_action(action[2])
+    K_amount = denormalize_fertilization_action(action[3])
+    irrigation_freq = denormalize_frequencies_action(action[4], tot_days)
+    fertilization_freq = denormalize_frequencies_action(action[5], tot_days)
+
+    actions, _ = AgroActions().create_actions(
+        [irrigation_freq],
+        [fertilization_freq],
+        irrigation_amount=irrigation_action,
+        N_amount=N_amount,
+        P_amount=P_amount,
+        K_amount=K_amount,
+        year=year,
+        Agromanager_dict=Agromanager_dict
+    )
+
+    # -- Run Wofost to obtain yield for the action : ** one action for now **
+    state, Yield = Wofost.run_wofost(actions[0], *wofost_params)
+
+    reward = calculate_reward(
+        Yield,
+        irrigation_action,
+        N_amount,
+        P_amount,
+        K_amount,
+        Costs_dict=Costs_dict,
+        Discount_factors_dict=Discount_factors_dict,
+    )
+
+    return state, reward
+
+
 class WofostEnv(gym.Env):
     """Custom Environment that follows gym interface"""
 
@@ -180,7 +252,7 @@ class WofostEnv(gym.Env):
         #     "DVS","LAI","TAGP", "TWSO", "TWLV", "TWST",
         #     "TWRT", "TRA", "RD", "SM", "WWLOW"
         # ]
-        self.OUTPUT_VARS = [    'day',    'DVS',    'LAI',    'TAGP',    'TWSO',    'TWLV',    'TWST',    'TWRT',    'TRA',    'RD',    'SM',    'WWLOW',    'NNI',    'KNI',    'PNI',    'NPKI',    'NSOIL',    'PSOIL',    'KSOIL',    'NAVAIL',    'PAVAIL',    'KAVAIL',    'NDEMLV',    'NDEMRT',    'NDEMSO',    'NDEMST',    'PDEMLV',    'PDEMRT',    'PDEMSO',    'PDEMST',    'KDEMLV',    'KDEMRT',    'KDEMSO',    'KDEMST',    'RNUPTAKE',    'RPUPTAKE',    'RKUPTAKE',    'RNFIX',    'NTRANSLOCATABLE',    'PTRANSLOCATABLE',    'KTRANSLOCATABLE']
+        self.OUTPUT_VARS = list(OUTPUT_VARS)
 
 
         # -- Mono-Action for now :
@@ -251,49 +323,16 @@ class WofostEnv(gym.Env):
 
         self.years_count -= 1
 
-        # -- Create the action :
-        irrigation_action = denormalize_irrigation_action(action[0])
-        N_amount = denormalize_fertilization_action(action[1])
-        P_amount = denormalize_fertilization_action(action[2])
-        K_amount = denormalize_fertilization_action(action[3])
-        irrigation_freq = denormalize_frequencies_action(action[4], self.calculate_days(self.Agromanager_dict["campaign_start_date"],self.Agromanager_dict["harvest_date"], self.year))
-        fertilization_freq = denormalize_frequencies_action(action[5], self.calculate_days(self.Agromanager_dict["campaign_start_date"],self.Agromanager_dict["harvest_date"], self.year))
-
-        # de_action = action
-        # print(
-        #     f"----------- de action in step : -------------\n{[irrigation_action, N_amount, P_amount, K_amount, irrigation_freq, fertilization_freq]}\n"
-        # )
-        # Add a parameter here that specifies the irrigation amount : our solo action for now
-        # print(type(de_action[0]))
-        self.actions, _ = AgroActions().create_actions(
-            [irrigation_freq],
-            [fertilization_freq],
-            irrigation_amount=irrigation_action,
-            N_amount=N_amount,
-            P_amount=P_amount,
-            K_amount=K_amount,
-            year=year,
-            Agromanager_dict=self.Agromanager_dict
-        )
-
-        # Run Wofost to obtain yield for each action : ** one action for now **
-        # print(f"----------- action in run : {self.actions[0]} -------------\n")
-        # print(f"----------- action in run : {demoralize_actions(self.actions[0])} -------------\n")
-        # pprint(f"----------- len actions : {len(self.actions)} -------------\n")
-
-        self.state, Yield = Wofost.run_wofost(
-            self.actions[0], *self.wofost_params)
-
-        # -- Modification Date and Hour : 30.08.2022 : 4.03
-        # -- The Problem that needs a deep solution :
-        self.reward = calculate_reward(
-            Yield,
-            irrigation_action,
-            N_amount,
-            P_amount,
-            K_amount,
-            Costs_dict=self.Costs_dict,
-            Discount_factors_dict=self.Discount_factors_dict,
+        # -- Run the growing season for the action and compute its reward :
+        tot_days = self.calculate_days(self.Agromanager_dict["campaign_start_date"],self.Agromanager_dict["harvest_date"], self.year)
+        self.state, self.reward = run_season(
+            action,
+            year,
+            tot_days,
+            self.Agromanager_dict,
+            self.wofost_params,
+            self.Costs_dict,
+            self.Discount_factors_dict,
         )
 
         # pprint(f"----------- state in run : {self.state} -------------\n")